@@ -4,8 +4,12 @@ Interface web para converter HTML para Markdown
 """
 
 import streamlit as st
-import io
-from converter import convert
+from htmltomd.converter import Converter
+from htmltomd.ui.components import start_file_conversion, show_conversion, show_markdown_file
+from htmltomd.ui.jobs import UPLOAD_LIMITS
+
+# Conversor com limites de tamanho, nós, profundidade e tempo por envio
+converter = Converter(limits=UPLOAD_LIMITS)
 
 def main():
     """Função principal da aplicação Streamlit"""
@@ -32,32 +36,25 @@ def main():
     
     if uploaded_file is not None:
         # Verificar tamanho do arquivo (limite de 50 MB)
-        file_size = len(uploaded_file.getvalue()) / (1024 * 1024)  # Tamanho em MB
+        file_size = uploaded_file.size / (1024 * 1024)  # Tamanho em MB
         
         if file_size > 50:
             st.error("O arquivo é muito grande. O tamanho máximo permitido é 50 MB.")
-        else:
-            # Ler o conteúdo do arquivo
-            html_content = uploaded_file.getvalue().decode("utf-8")
-            
-            # Converter HTML para Markdown
-            try:
-                markdown_content = convert(html_content)
-                
-                # Exibir prévia do Markdown
-                with st.expander("Prévia do Markdown", expanded=True):
-                    st.text_area("", markdown_content, height=300)
-                
-                # Botão para download do arquivo Markdown
-                st.download_button(
-                    label="Baixar arquivo Markdown",
-                    data=markdown_content,
-                    file_name=uploaded_file.name.replace(".html", ".md").replace(".htm", ".md"),
-                    mime="text/markdown",
-                )
-                
-            except Exception as e:
-                st.error(f"Erro ao converter o arquivo: {str(e)}")
+        elif st.button("Converter"):
+            # O envio é gravado em disco e convertido em fluxo no pool
+            # compartilhado; a codificação é detectada pelo BOM, pelo
+            # <meta charset> ou pelo conteúdo
+            start_file_conversion(
+                uploaded_file, converter,
+                filename=uploaded_file.name.replace(".html", ".md").replace(".htm", ".md"),
+            )
+    
+    result = show_conversion()
+    if result is not None:
+        markdown_path, filename = result
+        
+        # Prévia do início do Markdown e download lido do disco
+        show_markdown_file(markdown_path, filename)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos backends de parsing
+
+Mede o tempo de parse_html para cada backend instalado sobre o mesmo
+documento e compara com o backend padrão 'html.parser'.
+
+Uso:
+    python benchmarks/bench_backends.py [arquivo.html] [--repeat N] [--copies N]
+    python benchmarks/bench_backends.py --size 10M
+
+Sem arquivo de entrada, usa um livro sintético do gerador de corpus.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import CorpusGenerator
+from run_benchmarks import parse_size
+from htmltomd.parser import parse_html, available_backends
+
+def time_backend(html, backend, repeat):
+    """Retorna o menor tempo de parsing entre as repetições."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_html(html, backend)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    """Executa o benchmark e imprime a tabela de resultados."""
+    parser = argparse.ArgumentParser(description="Compara o tempo de parsing por backend")
+    parser.add_argument('input', nargs='?', help="Arquivo HTML de entrada")
+    parser.add_argument('--repeat', type=int, default=5, help="Repetições por backend")
+    parser.add_argument('--copies', type=int, default=200,
+                        help="Quantas vezes o corpo do arquivo é repetido")
+    parser.add_argument('--size', default='1M', help="Tamanho do livro sintético (ex.: 512K, 10M)")
+    args = parser.parse_args()
+    
+    if args.input:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            html = f.read() * args.copies
+    else:
+        html = CorpusGenerator().generate(parse_size(args.size))
+    
+    print(f"Entrada: {len(html) / 1024:.0f} KB, {args.repeat} repetições")
+    results = {backend: time_backend(html, backend, args.repeat) for backend in available_backends()}
+    baseline = results.get('html.parser')
+    
+    for backend, elapsed in results.items():
+        speedup = f"{baseline / elapsed:.2f}x" if baseline else "-"
+        print(f"{backend:<12} {elapsed * 1000:10.1f} ms  {speedup}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Gerador de corpus sintético
+
+Gera documentos HTML determinísticos no formato das exportações de livros
+didáticos: seções aninhadas, spans p-Pagina, imagens, vídeos, áudios, links,
+listas e cabeçalhos de todos os níveis.
+"""
+
+import random
+
+WORDS = (
+    "aluno professor livro capítulo exercício conceito exemplo atividade "
+    "leitura escrita número fração geometria história ciência energia "
+    "planeta célula texto questão resposta análise projeto pesquisa"
+).split()
+
+def _sentence(rng, min_words=6, max_words=18):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return ' '.join(words).capitalize() + '.'
+
+def _paragraph(rng):
+    parts = []
+    for _ in range(rng.randint(2, 5)):
+        sentence = _sentence(rng)
+        roll = rng.random()
+        if roll < 0.25:
+            word = rng.choice(WORDS)
+            sentence = sentence.replace(word, f'<a href="#{word}">{word}</a>', 1)
+        elif roll < 0.40:
+            word = rng.choice(WORDS)
+            sentence = sentence.replace(word, f'<strong>{word}</strong>', 1)
+        elif roll < 0.50:
+            sentence += f' <img src="img/{rng.randint(1, 999)}.png" alt="figura">'
+        parts.append(sentence)
+    return '<p>' + ' '.join(parts) + '</p>'
+
+def _block(rng, depth):
+    roll = rng.random()
+    if roll < 0.55:
+        return _paragraph(rng)
+    if roll < 0.65:
+        items = ''.join(f'<li>{_sentence(rng, 3, 8)}</li>' for _ in range(rng.randint(2, 5)))
+        return f'<ul>{items}</ul>'
+    if roll < 0.72:
+        return f'<figure><img src="fig/{rng.randint(1, 999)}.jpg"><figcaption>{_sentence(rng, 3, 6)}</figcaption></figure>'
+    if roll < 0.76:
+        return '<video controls><source src="video.mp4">Seu navegador não suporta vídeo.</video>'
+    if roll < 0.79:
+        return '<audio controls><source src="audio.mp3"></audio>'
+    level = min(6, depth + rng.randint(1, 2))
+    return f'<h{level}>{_sentence(rng, 2, 6)}</h{level}>'
+
+class CorpusGenerator:
+    """
+    Gera livros HTML sintéticos e reprodutíveis.
+
+    O mesmo ``seed`` produz sempre o mesmo documento, o que permite comparar
+    medições entre execuções e entre versões do código.
+    """
+
+    def __init__(self, seed: int = 0):
+        """
+        Args:
+            seed (int): Semente do gerador pseudoaleatório
+        """
+        self.seed = seed
+
+    def iter_html(self, target_bytes: int):
+        """
+        Gera o documento em pedaços até atingir o tamanho aproximado.
+
+        Args:
+            target_bytes (int): Tamanho desejado do documento em bytes
+
+        Yields:
+            str: Pedaços consecutivos do documento
+        """
+        rng = random.Random(self.seed)
+        yield ('<!DOCTYPE html>\n<html>\n<head><meta charset="UTF-8"><title>Livro</title></head>\n'
+               '<body>\n<div class="livro">\n')
+        size = 0
+        page = 1
+        chapter = 1
+        while size < target_bytes:
+            parts = [f'<section class="capitulo"><h1>Capítulo {chapter}: {_sentence(rng, 2, 5)}</h1>\n']
+            for section in range(rng.randint(2, 4)):
+                parts.append(f'<section><h2>Seção {chapter}.{section + 1}</h2>\n')
+                for depth in range(2, rng.randint(3, 6)):
+                    for _ in range(rng.randint(2, 6)):
+                        parts.append(_block(rng, depth) + '\n')
+                    if rng.random() < 0.5:
+                        label = f'{page} e {page + 1}' if rng.random() < 0.2 else str(page)
+                        parts.append(f'<span class="_20-asap-bold numero_text p-Pagina">{label}</span>\n')
+                        page += 2 if ' e ' in label else 1
+                parts.append('</section>\n')
+            parts.append('</section>\n')
+            chunk = ''.join(parts)
+            size += len(chunk.encode('utf-8'))
+            chapter += 1
+            yield chunk
+        yield '</div>\n</body>\n</html>\n'
+
+    def generate(self, target_bytes: int) -> str:
+        """
+        Gera um documento completo.
+
+        Args:
+            target_bytes (int): Tamanho desejado do documento em bytes
+
+        Returns:
+            str: Documento HTML
+        """
+        return ''.join(self.iter_html(target_bytes))
+
+    def write(self, path: str, target_bytes: int) -> None:
+        """
+        Grava um documento em disco sem montá-lo inteiro na memória.
+
+        Args:
+            path (str): Caminho do arquivo de saída
+            target_bytes (int): Tamanho desejado do documento em bytes
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            for chunk in self.iter_html(target_bytes):
+                f.write(chunk)
+
+def generate_book(target_bytes: int, seed: int = 0) -> str:
+    """
+    Atalho para gerar um documento com CorpusGenerator.
+
+    Args:
+        target_bytes (int): Tamanho desejado do documento em bytes
+        seed (int): Semente do gerador pseudoaleatório
+
+    Returns:
+        str: Documento HTML
+    """
+    return CorpusGenerator(seed).generate(target_bytes)
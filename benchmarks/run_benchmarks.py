@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Suíte de benchmarks dos motores de conversão
+
+Gera livros sintéticos de tamanhos crescentes e mede, para cada motor e
+cada etapa, o tempo de execução e (opcionalmente) o pico de memória.
+
+Motores comparados:
+- converter: converter.convert
+- htmltomd: pipeline do pacote com html2text (parse, transforms, render, clean)
+- htmltomd-native: o mesmo pipeline com o emissor nativo
+- htmltomd-stream: conversão em fluxo do pacote
+- htmltomd-parallel: documento cortado nas páginas e convertido em vários processos
+- regex: regras de html_to_md_converter.py aplicadas em sequência
+- regex-single-pass: as mesmas regras em uma única varredura (convert_html)
+
+Uso:
+    python benchmarks/run_benchmarks.py --sizes 1K,100K,1M --memory --json resultados.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import CorpusGenerator
+
+UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+DEFAULT_SIZES = '1K,10K,100K,1M'
+
+def parse_size(text):
+    """Converte textos como '512K' ou '100M' em bytes."""
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+def format_size(size):
+    """Formata um tamanho em bytes de forma legível."""
+    for unit in ('G', 'M', 'K'):
+        if size >= UNITS[unit]:
+            return f"{size / UNITS[unit]:g}{unit}"
+    return f"{size}B"
+
+def build_engines():
+    """
+    Monta os motores como listas de etapas (nome, função).
+
+    Cada etapa recebe o resultado da anterior; a primeira recebe o HTML.
+    """
+    from converter import convert
+    from html_to_md_converter import (
+        mark_page_breaks, remove_media_and_links, remove_page_number_spans, convert_headers,
+        convert_html,
+    )
+    from htmltomd.parser import parse_html, apply_transforms
+    from htmltomd.converter import convert_stream, convert_parallel
+    from htmltomd.converter.md_converter import render_markdown, clean_markdown
+
+    return {
+        'converter': [('convert', convert)],
+        'htmltomd': [
+            ('parse', parse_html),
+            ('transforms', apply_transforms),
+            ('render', render_markdown),
+            ('clean', clean_markdown),
+        ],
+        'htmltomd-native': [
+            ('parse', parse_html),
+            ('transforms', apply_transforms),
+            ('render', lambda soup: render_markdown(soup, 'native')),
+            ('clean', clean_markdown),
+        ],
+        'htmltomd-stream': [('stream', lambda html: ''.join(convert_stream([html])))],
+        'htmltomd-parallel': [('parallel', convert_parallel)],
+        'regex': [
+            ('page_marks', mark_page_breaks),
+            ('media_links', remove_media_and_links),
+            ('page_spans', remove_page_number_spans),
+            ('headers', convert_headers),
+        ],
+        'regex-single-pass': [('convert', convert_html)],
+    }
+
+def run_stages(stages, html, memory):
+    """
+    Executa as etapas de um motor, medindo cada uma.
+
+    Args:
+        stages (list): Etapas (nome, função)
+        html (str): Documento de entrada
+        memory (bool): Mede o pico de memória com tracemalloc
+
+    Returns:
+        dict: Por etapa, 'seconds' e (se medido) 'peak_bytes'
+    """
+    results = {}
+    value = html
+    gc.collect()
+    for name, function in stages:
+        if memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        value = function(value)
+        elapsed = time.perf_counter() - start
+        results[name] = {'seconds': elapsed}
+        if memory:
+            results[name]['peak_bytes'] = tracemalloc.get_traced_memory()[1] - baseline
+    return results
+
+def benchmark(sizes, engines, repeat=3, memory=False, seed=0):
+    """
+    Executa a varredura de tamanhos para os motores escolhidos.
+
+    O tempo é o menor entre as repetições, medido sem tracemalloc; a memória
+    é medida em uma execução separada, pois o rastreamento deixa o código
+    mais lento.
+
+    Returns:
+        list: Um registro por combinação de tamanho e motor
+    """
+    available = build_engines()
+    generator = CorpusGenerator(seed)
+    records = []
+
+    for size in sizes:
+        html = generator.generate(size)
+        for engine in engines:
+            stages = available[engine]
+            best = None
+            for _ in range(repeat):
+                timing = run_stages(stages, html, memory=False)
+                if best is None or sum(s['seconds'] for s in timing.values()) < sum(
+                        s['seconds'] for s in best.values()):
+                    best = timing
+            if memory:
+                tracemalloc.start()
+                peaks = run_stages(stages, html, memory=True)
+                tracemalloc.stop()
+                for name, stage in peaks.items():
+                    best[name]['peak_bytes'] = stage['peak_bytes']
+            records.append({
+                'size': size,
+                'input_bytes': len(html.encode('utf-8')),
+                'engine': engine,
+                'stages': best,
+                'seconds': sum(s['seconds'] for s in best.values()),
+                'peak_bytes': max((s.get('peak_bytes', 0) for s in best.values()), default=0),
+            })
+    return records
+
+def print_report(records, memory):
+    """Imprime os resultados em forma de tabela."""
+    header = f"{'tamanho':>8} {'motor':<16} {'total (ms)':>11} {'MB/s':>7}"
+    if memory:
+        header += f" {'pico (MB)':>10}"
+    print(header + "  etapas (ms)")
+    for record in records:
+        seconds = record['seconds']
+        throughput = record['input_bytes'] / UNITS['M'] / seconds if seconds else 0
+        line = f"{format_size(record['size']):>8} {record['engine']:<16} {seconds * 1000:>11.1f} {throughput:>7.2f}"
+        if memory:
+            line += f" {record['peak_bytes'] / UNITS['M']:>10.1f}"
+        stages = ', '.join(f"{name}={stage['seconds'] * 1000:.1f}" for name, stage in record['stages'].items())
+        print(f"{line}  {stages}")
+
+def main():
+    """Processa os argumentos e executa a suíte."""
+    parser = argparse.ArgumentParser(description="Benchmarks dos motores de conversão HTML para Markdown")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f"Tamanhos separados por vírgula (padrão: {DEFAULT_SIZES})")
+    parser.add_argument('--engines', default=None,
+                        help="Motores separados por vírgula (padrão: todos)")
+    parser.add_argument('--repeat', type=int, default=3, help="Repetições por medição")
+    parser.add_argument('--memory', action='store_true', help="Mede o pico de memória por etapa")
+    parser.add_argument('--seed', type=int, default=0, help="Semente do corpus sintético")
+    parser.add_argument('--json', dest='json_path', help="Grava os resultados em JSON")
+    args = parser.parse_args()
+
+    engines = args.engines.split(',') if args.engines else list(build_engines())
+    unknown = set(engines) - set(build_engines())
+    if unknown:
+        parser.error(f"Motores desconhecidos: {', '.join(sorted(unknown))}")
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+
+    records = benchmark(sizes, engines, args.repeat, args.memory, args.seed)
+    print_report(records, args.memory)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2)
+
+if __name__ == "__main__":
+    main()
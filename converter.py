@@ -5,142 +5,69 @@ HTML to Markdown Converter Module
 Este módulo fornece uma função para converter HTML em Markdown,
 aplicando transformações como limpeza, formatação de cabeçalhos
 e marcação de páginas.
+
+A conversão é feita pelo Converter do pacote htmltomd; as instâncias são
+reaproveitadas entre chamadas com as mesmas opções.
 """
 
-import re
-from bs4 import BeautifulSoup
-import html2text
+import threading
+from typing import Optional
 
-def convert(html: str) -> str:
-    """
-    Converte HTML para Markdown aplicando transformações necessárias.
-    
-    Args:
-        html (str): Conteúdo HTML a ser convertido
-        
-    Returns:
-        str: Conteúdo convertido para Markdown
-    """
-    # Passo 1: Parsear o HTML com BeautifulSoup
-    soup = BeautifulSoup(html, 'html.parser')
-    
-    # Passo 2: Aplicar transformações
-    
-    # 2.1: Inserir marcadores de página
-    _mark_page_breaks(soup)
-    
-    # 2.2: Remover mídia (imagens, vídeos, áudios)
-    _remove_media(soup)
-    
-    # 2.3: Substituir links por seu texto
-    _process_links(soup)
-    
-    # 2.4: Processar cabeçalhos diretamente no HTML
-    _process_headers(soup)
-    
-    # Passo 3: Converter para Markdown usando html2text
-    h = html2text.HTML2Text()
-    h.ignore_links = True  # Já processamos os links
-    h.body_width = 0  # Não quebrar linhas
-    h.ignore_images = True
-    h.unicode_snob = True  # Preservar caracteres Unicode
-    
-    # Obter o HTML modificado e converter para Markdown
-    modified_html = str(soup)
-    markdown = h.handle(modified_html)
-    
-    # Passo 4: Limpeza final do Markdown
-    markdown = _clean_markdown(markdown)
-    
-    return markdown
+from htmltomd.converter import Converter
+from htmltomd.encoding import decode_html
 
-def _mark_page_breaks(soup):
-    """
-    Detecta elementos com a classe p-Pagina e insere marcadores de página.
-    
-    Args:
-        soup (BeautifulSoup): Objeto BeautifulSoup do documento HTML
-    """
-    page_elements = soup.find_all(class_=lambda c: c and 'p-Pagina' in c.split())
-    
-    for element in page_elements:
-        page_number = element.get_text().strip()
-        # Inserir comentário de página antes do elemento
-        comment = soup.new_string(f'<!-- Página {page_number} -->')
-        element.insert_before(comment)
+# Conversores já configurados, por backend
+_converters = {}
+_converters_lock = threading.Lock()
 
-def _remove_media(soup):
+def _get_converter(backend: str) -> Converter:
     """
-    Remove tags de mídia (img, video, audio) do documento.
+    Retorna o conversor compartilhado para o backend informado.
     
     Args:
-        soup (BeautifulSoup): Objeto BeautifulSoup do documento HTML
-    """
-    # Remover imagens
-    for img in soup.find_all('img'):
-        img.decompose()
-    
-    # Remover vídeos
-    for video in soup.find_all('video'):
-        video.decompose()
-    
-    # Remover áudios
-    for audio in soup.find_all('audio'):
-        audio.decompose()
-
-def _process_links(soup):
-    """
-    Substitui links por seu texto.
-    
-    Args:
-        soup (BeautifulSoup): Objeto BeautifulSoup do documento HTML
+        backend (str): Backend de parsing
+        
+    Returns:
+        Converter: Conversor pré-configurado
     """
-    for link in soup.find_all('a'):
-        link.replace_with(link.get_text())
+    converter = _converters.get(backend)
+    if converter is None:
+        with _converters_lock:
+            converter = _converters.get(backend)
+            if converter is None:
+                converter = _converters[backend] = Converter(backend=backend)
+    return converter
 
-def _process_headers(soup):
+def convert(html: str, backend: str = 'html.parser', cache=None) -> str:
     """
-    Processa cabeçalhos diretamente no HTML para garantir formatação correta no Markdown.
+    Converte HTML para Markdown aplicando transformações necessárias.
     
     Args:
-        soup (BeautifulSoup): Objeto BeautifulSoup do documento HTML
+        html (str): Conteúdo HTML a ser convertido
+        backend (str): Backend de parsing ('html.parser', 'lxml', 'html5lib'
+            ou 'auto' para o mais rápido disponível)
+        cache (ConversionCache, optional): Cache de conversões já realizadas
+        
+    Returns:
+        str: Conteúdo convertido para Markdown
     """
-    # Substituir h1 por texto simples com prefixo Markdown
-    for h1 in soup.find_all('h1'):
-        text = h1.get_text().strip()
-        new_tag = soup.new_tag('p')
-        new_tag.string = f"# {text}"
-        h1.replace_with(new_tag)
-    
-    # Substituir h2 por texto simples com prefixo Markdown
-    for h2 in soup.find_all('h2'):
-        text = h2.get_text().strip()
-        new_tag = soup.new_tag('p')
-        new_tag.string = f"## {text}"
-        h2.replace_with(new_tag)
-    
-    # Substituir h3-h6 por texto simples com prefixo Markdown
-    for i in range(3, 7):
-        for h in soup.find_all(f'h{i}'):
-            text = h.get_text().strip()
-            new_tag = soup.new_tag('p')
-            new_tag.string = f"### {text}"
-            h.replace_with(new_tag)
+    converter = _get_converter(backend)
+    if cache is not None:
+        return cache.get_or_convert(html, converter.options, lambda: converter.convert(html))
+    return converter.convert(html)
 
-def _clean_markdown(markdown):
+def convert_bytes(data, encoding: Optional[str] = None, backend: str = 'html.parser', cache=None) -> str:
     """
-    Realiza limpeza final no Markdown gerado.
+    Converte HTML recebido em bytes, detectando a codificação.
     
     Args:
-        markdown (str): Conteúdo Markdown a ser limpo
+        data (bytes): Documento; bytearray e memoryview são lidos sem cópia
+        encoding (str, optional): Codificação conhecida; detectada pelo BOM,
+            pelo <meta charset> ou pelo conteúdo quando omitida
+        backend (str): Backend de parsing
+        cache (ConversionCache, optional): Cache de conversões já realizadas
         
     Returns:
-        str: Conteúdo Markdown limpo
+        str: Conteúdo convertido para Markdown
     """
-    # Remover linhas em branco extras
-    markdown = re.sub(r'\n{3,}', '\n\n', markdown)
-    
-    # Remover spans de número de página (mantendo os comentários)
-    markdown = re.sub(r'`?<span[^>]*class=["\'](?:[^"\']*\s)?p-Pagina(?:\s[^"\']*)?["\'][^>]*>.*?</span>`?', '', markdown)
-    
-    return markdown.strip()
\ No newline at end of file
+    return convert(decode_html(data, encoding), backend, cache)
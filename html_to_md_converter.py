@@ -18,9 +18,25 @@ Delimitação de Páginas:
 - Remove os elementos <span> após inserir os comentários
 """
 
+import argparse
+import glob
 import re
 import sys
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from htmltomd.encoding import decode_html
+from htmltomd.output import atomic_writer, write_markdown
+
+# Extensões reconhecidas ao percorrer diretórios
+HTML_EXTENSIONS = ('.html', '.htm')
+
+# Trechos acumulados antes de cada gravação na saída
+FLUSH_PIECES = 4096
+
+# Quantidade padrão de arquivos enviados a cada tarefa do pool de processos
+DEFAULT_BATCH_SIZE = 50
 
 def mark_page_breaks(html_content):
     """
@@ -112,6 +128,221 @@ def remove_page_number_spans(html_content):
     
     return html_content
 
+# Tags relevantes para as regras: elementos p-Pagina (grupo page), mídia,
+# links e cabeçalhos (grupo name, com fechamento no grupo close). As demais
+# tags são copiadas sem passar por código Python.
+TOKEN_PATTERN = re.compile(
+    r'<(?:(?P<page>[a-zA-Z][a-zA-Z0-9]*)'
+    r'(?=[^>]*class=["\'](?:[^"\']*\s)?p-Pagina(?:\s[^"\']*)?["\'])[^>]*>'
+    r'|(?P<close>/)?(?P<name>a|img|video|audio|h[1-6])(?=[\s/>])[^>]*>)',
+    re.IGNORECASE,
+)
+
+# Primeira tag de fechamento, que encerra o conteúdo de um elemento p-Pagina
+ANY_CLOSING_PATTERN = re.compile(r'</\w+>')
+
+# Tags removidas junto com o conteúdo
+SKIPPED_TAGS = ('video', 'audio')
+
+# Tags substituídas pelo conteúdo, com o prefixo Markdown correspondente
+UNWRAPPED_TAGS = {
+    'a': '',
+    'h1': '# ',
+    'h2': '## ',
+    'h3': '### ',
+    'h4': '### ',
+    'h5': '### ',
+    'h6': '### ',
+}
+
+CLOSING_PATTERNS = {
+    name: re.compile(f'</{name}>', re.IGNORECASE)
+    for name in SKIPPED_TAGS + tuple(UNWRAPPED_TAGS)
+}
+
+class SinglePassConverter:
+    """
+    Aplica todas as regras de conversão em uma única varredura do HTML.
+    
+    Percorre o documento uma só vez. Cada tag de abertura procura a sua
+    tag de fechamento à frente; essas buscas são memorizadas por nome, de
+    modo que o documento é lido um número constante de vezes,
+    independentemente da quantidade de regras.
+    
+    O resultado é igual ao da sequência mark_page_breaks,
+    remove_media_and_links, remove_page_number_spans e convert_headers para
+    marcação bem formada em que os elementos p-Pagina contêm só texto e
+    nenhum a, h1-h6, video ou audio está dentro de outro de mesmo nome. Fora
+    disso os resultados podem divergir: um elemento p-Pagina com tags
+    dentro é encerrado na primeira tag de fechamento e mantido, e tags
+    sobrepostas ou aninhadas com o mesmo nome são pareadas de outra forma.
+    
+    O ganho está no pior caso: tags sem fechamento não fazem as buscas
+    voltarem atrás, e o tempo cresce linearmente com o documento. Em HTML
+    comum, com muitas tags relevantes, a varredura é cerca de 1,8 vez mais
+    lenta que as quatro expressões regulares.
+    """
+    
+    def __init__(self, html_content):
+        """
+        Args:
+            html_content (str): Conteúdo HTML a ser convertido
+        """
+        self.html = html_content
+        self._claimed = set()
+        self._found = {}
+    
+    def _search(self, key, pattern, pos):
+        """
+        Busca a próxima ocorrência do padrão a partir de pos, reaproveitando
+        a busca anterior enquanto ela continuar à frente.
+        """
+        cached = self._found.get(key)
+        if cached is not None:
+            start, match = cached
+            if match is None and start <= pos:
+                return None
+            if match is not None and match.start() >= pos:
+                return match
+        match = pattern.search(self.html, pos)
+        self._found[key] = (pos, match)
+        return match
+    
+    def convert(self):
+        """
+        Converte o documento.
+        
+        Returns:
+            str: Conteúdo convertido para Markdown
+        """
+        return ''.join(self.iter_chunks())
+    
+    def iter_chunks(self):
+        """
+        Converte o documento entregando o resultado em pedaços.
+        
+        Yields:
+            str: Pedaços consecutivos do Markdown, de até FLUSH_PIECES trechos
+        """
+        html = self.html
+        out = []
+        pos = 0
+        while True:
+            match = TOKEN_PATTERN.search(html, pos)
+            if match is None:
+                break
+            out.append(html[pos:match.start()])
+            pos = self._handle_tag(match, out)
+            if len(out) >= FLUSH_PIECES:
+                yield ''.join(out)
+                out.clear()
+        out.append(html[pos:])
+        yield ''.join(out)
+    
+    def write(self, target, encoding='utf-8'):
+        """
+        Converte o documento gravando o resultado à medida que é produzido.
+        
+        Args:
+            target: Destino de texto ou de bytes: arquivo, socket,
+                io.BufferedWriter (veja htmltomd.output.open_sink)
+            encoding (str): Codificação usada em destinos de bytes
+            
+        Returns:
+            int: Quantidade de caracteres gravados
+        """
+        return write_markdown(self.iter_chunks(), target, encoding)
+    
+    def _handle_tag(self, match, out):
+        """Processa uma tag e retorna a posição onde a varredura continua."""
+        if match.group('close'):
+            # Fechamento já consumido pela tag de abertura correspondente
+            if match.start() in self._claimed:
+                self._claimed.discard(match.start())
+            else:
+                out.append(match.group())
+            return match.end()
+        
+        page = match.group('page')
+        if page:
+            closing = self._search('*', ANY_CLOSING_PATTERN, match.end())
+            if closing is not None:
+                return self._handle_page(match, page.lower(), closing, out)
+            return self._handle_opening(match, page.lower(), out)
+        return self._handle_opening(match, match.group('name').lower(), out)
+    
+    def _handle_page(self, match, name, closing, out):
+        """Insere o marcador de página e remove o span p-Pagina."""
+        content = self.html[match.end():closing.start()].strip()
+        if '<' in content:
+            content = SinglePassConverter(content).convert()
+        out.append(f'<!-- Página {content} -->\n')
+        
+        if name == 'span' and closing.group().lower() == '</span>':
+            return closing.end()
+        
+        # Outros elementos permanecem, com o conteúdo sem espaços nas bordas
+        pos = self._handle_opening(match, name, out)
+        if pos != match.end():
+            return pos
+        out.append(content)
+        return closing.start()
+    
+    def _handle_opening(self, match, name, out):
+        """Aplica as regras de mídia, links e cabeçalhos a uma tag de abertura."""
+        if name == 'img':
+            return match.end()
+        
+        if name in SKIPPED_TAGS:
+            closing = self._search(name, CLOSING_PATTERNS[name], match.end())
+            if closing is not None:
+                return closing.end()
+        elif name in UNWRAPPED_TAGS:
+            closing = self._search(name, CLOSING_PATTERNS[name], match.end())
+            if closing is not None and closing.start() not in self._claimed:
+                self._claimed.add(closing.start())
+                out.append(UNWRAPPED_TAGS[name])
+                return match.end()
+        
+        out.append(match.group())
+        return match.end()
+
+def convert_html(html_content):
+    """
+    Converte o conteúdo HTML para Markdown aplicando todas as regras.
+    
+    As regras são aplicadas em uma única varredura por SinglePassConverter;
+    para marcação bem formada, o resultado é igual ao da aplicação em
+    sequência de mark_page_breaks, remove_media_and_links,
+    remove_page_number_spans e convert_headers (as exceções estão
+    descritas em SinglePassConverter).
+    
+    Args:
+        html_content (str): Conteúdo HTML a ser convertido
+        
+    Returns:
+        str: Conteúdo convertido para Markdown
+    """
+    return SinglePassConverter(html_content).convert()
+
+def convert_file(input_file, output_file):
+    """
+    Converte um arquivo HTML para Markdown, propagando qualquer erro.
+    
+    O Markdown é gravado em pedaços, sem montar o documento inteiro, em um
+    arquivo temporário que só substitui a saída ao final da conversão.
+    
+    Args:
+        input_file (str): Caminho para o arquivo HTML de entrada
+        output_file (str): Caminho para o arquivo Markdown de saída
+    """
+    # Lido em bytes; a codificação é detectada antes de uma única decodificação
+    with open(input_file, 'rb') as f:
+        html_content = decode_html(f.read())
+    
+    with atomic_writer(output_file) as f:
+        SinglePassConverter(html_content).write(f)
+
 def process_file(input_file, output_file=None):
     """
     Processa um arquivo HTML e converte para Markdown.
@@ -127,26 +358,7 @@ def process_file(input_file, output_file=None):
         output_file = f"{base_name}.md"
     
     try:
-        # Ler o arquivo HTML
-        with open(input_file, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
-        # Inserir marcadores de página
-        html_content = mark_page_breaks(html_content)
-        
-        # Remover mídia e links
-        html_content = remove_media_and_links(html_content)
-        
-        # Remover os spans de número de página (mantendo os comentários)
-        html_content = remove_page_number_spans(html_content)
-        
-        # Converter cabeçalhos
-        md_content = convert_headers(html_content)
-        
-        # Escrever o resultado no arquivo de saída
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(md_content)
-            
+        convert_file(input_file, output_file)
         print(f"Conversão concluída: {input_file} -> {output_file}")
         return True
         
@@ -154,10 +366,178 @@ def process_file(input_file, output_file=None):
         print(f"Erro ao processar o arquivo {input_file}: {str(e)}")
         return False
 
+def collect_files(inputs):
+    """
+    Expande diretórios e padrões glob nos arquivos HTML a converter.
+    
+    Args:
+        inputs (list): Arquivos, diretórios ou padrões glob
+        
+    Returns:
+        list: Pares (arquivo, diretório base) em ordem estável; o diretório
+            base é usado para espelhar a árvore na saída
+    """
+    files = []
+    seen = set()
+    
+    def add(path, root):
+        path = os.path.normpath(path)
+        if path not in seen:
+            seen.add(path)
+            files.append((path, root))
+    
+    for item in inputs:
+        if os.path.isdir(item):
+            for dirpath, dirnames, filenames in os.walk(item):
+                dirnames.sort()
+                for name in sorted(filenames):
+                    if name.lower().endswith(HTML_EXTENSIONS):
+                        add(os.path.join(dirpath, name), item)
+        elif os.path.isfile(item):
+            add(item, os.path.dirname(item))
+        else:
+            # Padrão glob: a parte fixa do padrão é a base da árvore
+            root = item.split('*', 1)[0].split('?', 1)[0].split('[', 1)[0]
+            root = root if root.endswith(os.sep) else os.path.dirname(root)
+            for path in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(path):
+                    add(path, root)
+    
+    return files
+
+def output_path_for(input_file, root, output_dir):
+    """
+    Calcula o caminho de saída espelhando a árvore de entrada.
+    
+    Args:
+        input_file (str): Caminho do arquivo HTML
+        root (str): Diretório base da entrada
+        output_dir (str): Diretório de saída
+        
+    Returns:
+        str: Caminho do arquivo Markdown correspondente
+    """
+    relative = os.path.relpath(input_file, root or os.curdir)
+    return os.path.join(output_dir, os.path.splitext(relative)[0] + '.md')
+
+def _convert_batch(tasks):
+    """
+    Converte um lote de arquivos dentro de um processo do pool.
+    
+    Args:
+        tasks (list): Pares (entrada, saída)
+        
+    Returns:
+        list: Pares (entrada, mensagem de erro ou None)
+    """
+    results = []
+    for input_file, output_file in tasks:
+        try:
+            os.makedirs(os.path.dirname(output_file) or os.curdir, exist_ok=True)
+            convert_file(input_file, output_file)
+            results.append((input_file, None))
+        except Exception as e:
+            results.append((input_file, str(e)))
+    return results
+
+def process_batch(inputs, output_dir, workers=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Converte vários arquivos em paralelo, espelhando a árvore na saída.
+    
+    Os arquivos são agrupados em lotes para reduzir a comunicação entre
+    processos. Falhas em arquivos individuais não interrompem a conversão.
+    
+    Args:
+        inputs (list): Arquivos, diretórios ou padrões glob
+        output_dir (str): Diretório de saída
+        workers (int, optional): Número de processos; None usa todos os
+            núcleos e 1 converte no processo atual
+        batch_size (int): Quantidade de arquivos por tarefa
+        
+    Returns:
+        dict: Resumo com 'total', 'converted', 'failed', 'errors' e 'elapsed';
+            arquivos cuja saída coincide com a de um arquivo anterior não são
+            convertidos e entram como falhas
+        
+    Raises:
+        ValueError: Se batch_size ou workers for menor que 1
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size deve ser pelo menos 1, recebido {batch_size}")
+    if workers is not None and workers < 1:
+        raise ValueError(f"workers deve ser pelo menos 1, recebido {workers}")
+    start = time.perf_counter()
+    files = collect_files(inputs)
+    
+    # Duas entradas com a mesma saída (a/index.html e b/index.html passados
+    # como arquivos, por exemplo) não podem sobrescrever uma à outra
+    tasks = []
+    results = []
+    targets = {}
+    for path, root in files:
+        output_file = output_path_for(path, root, output_dir)
+        key = os.path.normcase(os.path.abspath(output_file))
+        if key in targets:
+            results.append((path, f"saída {output_file} já gerada a partir de {targets[key]}"))
+            continue
+        targets[key] = path
+        tasks.append((path, output_file))
+    batches = [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+    
+    if workers == 1 or len(batches) <= 1:
+        for batch in batches:
+            results.extend(_convert_batch(batch))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_convert_batch, batch) for batch in batches]
+            for future in as_completed(futures):
+                results.extend(future.result())
+    
+    errors = sorted((path, error) for path, error in results if error is not None)
+    return {
+        'total': len(files),
+        'converted': len(files) - len(errors),
+        'failed': len(errors),
+        'errors': errors,
+        'elapsed': time.perf_counter() - start,
+    }
+
+def print_summary(summary):
+    """Imprime o resumo de uma conversão em lote."""
+    for path, error in summary['errors']:
+        print(f"Erro ao processar o arquivo {path}: {error}")
+    print(f"Arquivos: {summary['total']} | Convertidos: {summary['converted']} | "
+          f"Falhas: {summary['failed']} | Tempo: {summary['elapsed']:.2f}s")
+
+def positive_int(value):
+    """Tipo do argparse para inteiros maiores que zero."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"deve ser pelo menos 1, recebido {value}")
+    return number
+
 def main():
     """Função principal que processa os argumentos da linha de comando."""
+    if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+        parser = argparse.ArgumentParser(
+            prog="html_to_md_converter.py --batch",
+            description="Converte diretórios ou padrões glob em paralelo",
+        )
+        parser.add_argument('inputs', nargs='+', help="Arquivos, diretórios ou padrões glob")
+        parser.add_argument('-o', '--output', required=True, help="Diretório de saída")
+        parser.add_argument('-j', '--jobs', type=positive_int, default=None,
+                            help="Número de processos (padrão: todos os núcleos)")
+        parser.add_argument('--batch-size', type=positive_int, default=DEFAULT_BATCH_SIZE,
+                            help="Arquivos por tarefa enviada a cada processo")
+        args = parser.parse_args(sys.argv[2:])
+        
+        summary = process_batch(args.inputs, args.output, args.jobs, args.batch_size)
+        print_summary(summary)
+        sys.exit(0 if summary['failed'] == 0 else 1)
+    
     if len(sys.argv) < 2:
         print("Uso: python html_to_md_converter.py arquivo.html [arquivo_saida.md]")
+        print("     python html_to_md_converter.py --batch entradas... -o diretorio_saida [-j N]")
         sys.exit(1)
     
     input_file = sys.argv[1]
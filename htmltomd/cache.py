@@ -0,0 +1,344 @@
+"""
+Cache de conversões
+
+Este módulo guarda em disco o Markdown de conversões já realizadas,
+endereçado pelo hash do HTML de entrada, das opções efetivas e das versões
+das bibliotecas envolvidas. O armazenamento usa SQLite, que permite acesso
+simultâneo por vários processos, e descarta as entradas usadas há mais
+tempo quando o tamanho máximo é ultrapassado.
+
+O FragmentCache é a contraparte em memória para trechos de documentos:
+guarda o Markdown de cada grupo de blocos convertido, para que trechos
+repetidos dentro de um documento ou entre os documentos de um lote não
+sejam convertidos de novo.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Union
+
+import bs4
+import html2text
+
+from htmltomd import __version__
+
+# Tamanho máximo padrão do cache em disco
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Tamanho máximo padrão do cache de fragmentos, em caracteres
+DEFAULT_FRAGMENT_MAX_SIZE = 32 * 1024 * 1024
+
+# Tamanho mínimo padrão dos fragmentos, em caracteres de HTML
+DEFAULT_FRAGMENT_SIZE = 2 * 1024
+
+# Tempo máximo de espera por um bloqueio de outro processo, em segundos
+LOCK_TIMEOUT = 30.0
+
+def default_cache_path() -> str:
+    """
+    Retorna o caminho padrão do banco do cache.
+
+    Usa a variável de ambiente HTMLTOMD_CACHE_DIR quando definida, ou
+    ~/.cache/htmltomd caso contrário.
+
+    Returns:
+        str: Caminho do arquivo SQLite
+    """
+    directory = os.environ.get('HTMLTOMD_CACHE_DIR') or os.path.join(
+        os.path.expanduser('~'), '.cache', 'htmltomd')
+    return os.path.join(directory, 'conversions.sqlite3')
+
+def _library_versions() -> str:
+    """Identifica as versões que influenciam o resultado da conversão."""
+    return f"htmltomd={__version__};bs4={bs4.__version__};html2text={html2text.__version__}"
+
+class ConversionCache:
+    """
+    Cache em disco de conversões HTML para Markdown com descarte LRU.
+
+    A mesma instância pode ser usada por várias threads; processos
+    diferentes podem abrir o mesmo arquivo ao mesmo tempo.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            path (str, optional): Arquivo SQLite do cache; usa
+                default_cache_path() quando omitido
+            max_bytes (int): Tamanho máximo do conteúdo armazenado
+        """
+        self.path = path or default_cache_path()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Abre a conexão, reabrindo-a em processos filhos após um fork."""
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                ' key TEXT PRIMARY KEY,'
+                ' markdown TEXT NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' last_access REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)')
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    @staticmethod
+    def make_key(html: Union[str, bytes], options: Optional[dict] = None) -> str:
+        """
+        Calcula a chave de uma conversão.
+
+        Args:
+            html (Union[str, bytes]): Conteúdo HTML de entrada
+            options (dict, optional): Opções efetivas da conversão
+
+        Returns:
+            str: Hash SHA-256 hexadecimal
+        """
+        if isinstance(html, str):
+            html = html.encode('utf-8', 'surrogatepass')
+        digest = hashlib.sha256()
+        digest.update(_library_versions().encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(json.dumps(options or {}, sort_keys=True, default=str).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(html)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Busca uma conversão no cache e marca a entrada como usada.
+
+        Args:
+            key (str): Chave calculada por make_key
+
+        Returns:
+            Optional[str]: Markdown armazenado ou None
+        """
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute('SELECT markdown FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute('UPDATE entries SET last_access = ? WHERE key = ?', (time.time(), key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, markdown: str) -> None:
+        """
+        Armazena uma conversão e descarta as entradas mais antigas se preciso.
+
+        Args:
+            key (str): Chave calculada por make_key
+            markdown (str): Markdown a ser armazenado
+        """
+        size = len(markdown.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO entries (key, markdown, size, last_access) VALUES (?, ?, ?, ?)',
+                    (key, markdown, size, time.time()),
+                )
+                self._evict(conn)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Remove as entradas usadas há mais tempo até caber no limite."""
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for key, size in conn.execute('SELECT key, size FROM entries ORDER BY last_access'):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany('DELETE FROM entries WHERE key = ?', victims)
+
+    def get_or_convert(self, html: Union[str, bytes], options: Optional[dict],
+                       convert: Callable[[], str]) -> str:
+        """
+        Retorna a conversão do cache ou a executa e armazena o resultado.
+
+        Args:
+            html (Union[str, bytes]): Conteúdo HTML de entrada
+            options (dict, optional): Opções efetivas da conversão
+            convert (Callable[[], str]): Função que realiza a conversão
+
+        Returns:
+            str: Conteúdo em Markdown
+        """
+        key = self.make_key(html, options)
+        markdown = self.get(key)
+        if markdown is None:
+            markdown = convert()
+            self.put(key, markdown)
+        return markdown
+
+    def stats(self) -> dict:
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            dict: 'hits' e 'misses' desta instância, 'entries' e 'bytes'
+                armazenados no disco
+        """
+        with self._lock:
+            entries, size = self._connection().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': size}
+
+    def clear(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._connection().execute('DELETE FROM entries')
+
+    def close(self) -> None:
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class FragmentCache:
+    """
+    Cache em memória do Markdown de fragmentos de documentos, com descarte LRU.
+
+    Os fragmentos são grupos de blocos cortados por conteúdo (veja
+    BlockSplitter), de modo que o mesmo trecho de HTML gera o mesmo
+    fragmento em qualquer documento. A instância pode ser compartilhada
+    entre threads e entre os documentos de um lote.
+
+    Uso:
+        converter = Converter(fragment_cache=FragmentCache())
+        for html in documentos:
+            markdown = converter.convert(html)
+    """
+
+    def __init__(self, max_size: int = DEFAULT_FRAGMENT_MAX_SIZE,
+                 block_size: int = DEFAULT_FRAGMENT_SIZE):
+        """
+        Args:
+            max_size (int): Tamanho máximo do Markdown armazenado, em caracteres
+            block_size (int): Tamanho mínimo de cada fragmento, em caracteres
+                de HTML; fragmentos menores são reaproveitados com mais
+                frequência, mas cada conversão tem um custo fixo maior
+        """
+        self.max_size = max_size
+        self.block_size = block_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Busca um fragmento e marca a entrada como usada.
+
+        Args:
+            key (str): Chave calculada por ConversionCache.make_key
+
+        Returns:
+            Optional[str]: Markdown armazenado ou None
+        """
+        with self._lock:
+            markdown = self._entries.get(key)
+            if markdown is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return markdown
+
+    def put(self, key: str, markdown: str) -> None:
+        """
+        Armazena um fragmento e descarta os usados há mais tempo se preciso.
+
+        Args:
+            key (str): Chave calculada por ConversionCache.make_key
+            markdown (str): Markdown do fragmento
+        """
+        size = len(markdown)
+        if size > self.max_size:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = markdown
+            self._size += size
+            while self._size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_or_convert(self, fragment: str, options: Optional[dict],
+                       convert: Callable[[], str]) -> str:
+        """
+        Retorna o Markdown do fragmento ou o converte e armazena.
+
+        Args:
+            fragment (str): HTML do fragmento, com os contêineres que o envolvem
+            options (dict, optional): Opções efetivas da conversão
+            convert (Callable[[], str]): Função que realiza a conversão
+
+        Returns:
+            str: Markdown do fragmento
+        """
+        key = ConversionCache.make_key(fragment, options)
+        markdown = self.get(key)
+        if markdown is None:
+            markdown = convert()
+            self.put(key, markdown)
+        return markdown
+
+    def stats(self) -> dict:
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            dict: 'hits', 'misses', 'entries' e 'size' (caracteres armazenados)
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'entries': len(self._entries), 'size': self._size}
+
+    def clear(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
@@ -0,0 +1,255 @@
+"""
+Interface de linha de comando
+
+Este módulo implementa o comando ``htmltomd``. A conversão não depende do
+Streamlit e as bibliotecas de parsing só são carregadas quando há algo a
+converter, para que o comando inicie rápido mesmo quando é chamado uma vez
+por arquivo em pipelines de shell. A interface web fica no subcomando
+``ui``, disponível com o extra ``ui``.
+
+Uso:
+    htmltomd convert livro.html -o livro.md
+    cat livro.html | htmltomd convert > livro.md
+    htmltomd convert capitulos/*.html --output-dir markdown/
+    htmltomd ui
+"""
+
+import argparse
+import io
+import os
+import sys
+from typing import List, Optional
+
+from htmltomd.limits import BudgetExceeded, add_limit_arguments, limits_from_args
+from htmltomd.output import atomic_writer
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Monta o parser de argumentos com os subcomandos."""
+    parser = argparse.ArgumentParser(prog='htmltomd', description="Conversor de HTML para Markdown")
+    parser.add_argument('--version', action='store_true', help="Exibe a versão e sai")
+    subparsers = parser.add_subparsers(dest='command', metavar='comando')
+
+    convert = subparsers.add_parser(
+        'convert', help="Converte HTML para Markdown",
+        description="Converte arquivos HTML (ou a entrada padrão) para Markdown",
+    )
+    convert.add_argument('inputs', nargs='*', metavar='entrada',
+                         help="Arquivos HTML; '-' ou nenhum lê da entrada padrão")
+    output = convert.add_mutually_exclusive_group()
+    output.add_argument('-o', '--output', help="Arquivo de saída (padrão: saída padrão)")
+    output.add_argument('-d', '--output-dir', help="Diretório de saída, um .md por entrada")
+    convert.add_argument('--emitter', choices=('html2text', 'native'), default='html2text',
+                         help="Emissor de Markdown (padrão: html2text)")
+    convert.add_argument('--backend', default='html.parser',
+                         help="Backend de parsing: html.parser, lxml, html5lib ou auto "
+                              "(padrão: html.parser)")
+    convert.add_argument('--encoding', default=None,
+                         help="Codificação das entradas (padrão: detectada pelo BOM, pelo "
+                              "<meta charset> ou pelo conteúdo)")
+    convert.add_argument('--stream', action='store_true',
+                         help="Converte em fluxo, com memória limitada para arquivos grandes")
+    convert.add_argument('--incremental', action='store_true',
+                         help="Converte de novo só as páginas alteradas desde a última conversão, "
+                              "usando a saída anterior e o sidecar .pages.json ao lado dela")
+    convert.add_argument('--fragment-cache', action='store_true',
+                         help="Reaproveita o Markdown de trechos repetidos dentro de cada entrada "
+                              "e entre as entradas")
+    add_limit_arguments(convert)
+    convert.add_argument('--stats', metavar='ARQUIVO',
+                         help="Grava em JSON o tempo, a CPU e os nós de cada etapa por documento "
+                              "('-' para a saída de erros)")
+    convert.add_argument('--stats-memory', action='store_true',
+                         help="Inclui em --stats o pico de memória de cada etapa (mais lento)")
+
+    ui = subparsers.add_parser(
+        'ui', help="Inicia a interface web (requer o extra 'ui')",
+        description="Inicia a interface web com o Streamlit",
+    )
+    ui.add_argument('streamlit_args', nargs=argparse.REMAINDER,
+                    help="Argumentos repassados ao 'streamlit run'")
+    return parser
+
+def _output_path(input_path: str, output_dir: str) -> str:
+    """Caminho do Markdown de uma entrada dentro do diretório de saída."""
+    name = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir, name + '.md')
+
+def _open_input(path: str):
+    """Abre uma entrada em bytes; '-' representa a entrada padrão."""
+    if path == '-':
+        return open(sys.stdin.fileno(), 'rb', closefd=False)
+    return open(path, 'rb')
+
+def _text_stream(raw, encoding: Optional[str]):
+    """Decodifica uma entrada em fluxo, detectando a codificação pelo início."""
+    if encoding is None:
+        from htmltomd.encoding import SNIFF_SIZE, sniff_encoding
+        encoding = sniff_encoding(raw.peek(SNIFF_SIZE))
+    return io.TextIOWrapper(raw, encoding=encoding, errors='replace')
+
+def _open_output(path: Optional[str]):
+    """
+    Abre a saída como texto UTF-8; None representa a saída padrão.
+
+    Arquivos são gravados em um temporário renomeado ao final, para que uma
+    falha no meio da conversão não deixe uma saída incompleta.
+    """
+    if path is None:
+        sys.stdout.flush()
+        return open(sys.stdout.fileno(), 'w', encoding='utf-8', closefd=False)
+    return atomic_writer(path)
+
+def _convert_one(converter, input_path: str, output_path: Optional[str],
+                 encoding: Optional[str], stream: bool) -> None:
+    """Converte uma entrada e grava o resultado."""
+    with _open_input(input_path) as raw:
+        if stream:
+            source = _text_stream(raw, encoding)
+            with _open_output(output_path) as target:
+                converter.convert_to(source, target)
+            source.detach()
+            return
+        markdown = converter.convert_bytes(raw.read(), encoding)
+    with _open_output(output_path) as target:
+        target.write(markdown)
+
+def convert_command(args: argparse.Namespace) -> int:
+    """
+    Executa o subcomando ``convert``.
+
+    Args:
+        args (argparse.Namespace): Argumentos do subcomando
+
+    Returns:
+        int: Código de saída (0 em caso de sucesso, 1 se alguma entrada falhou)
+    """
+    inputs = args.inputs or ['-']
+    if len(inputs) > 1 and args.output_dir is None:
+        print("htmltomd: erro: várias entradas exigem --output-dir", file=sys.stderr)
+        return 2
+    if args.output_dir is not None and '-' in inputs:
+        print("htmltomd: erro: a entrada padrão não pode ser usada com --output-dir", file=sys.stderr)
+        return 2
+
+    if args.incremental and (args.stream or (args.output is None and args.output_dir is None)
+                             or '-' in inputs):
+        print("htmltomd: erro: --incremental exige arquivos de entrada e -o ou --output-dir, "
+              "sem --stream", file=sys.stderr)
+        return 2
+    if args.incremental and (args.fragment_cache or args.stats is not None
+                             or limits_from_args(args) is not None):
+        # A conversão incremental não passa pelo Converter configurado
+        print("htmltomd: erro: --incremental não pode ser combinado com --fragment-cache, "
+              "--stats, --max-* ou --timeout", file=sys.stderr)
+        return 2
+
+    if args.output_dir is not None:
+        targets = {}
+        for input_path in inputs:
+            key = os.path.normcase(os.path.abspath(_output_path(input_path, args.output_dir)))
+            if key in targets:
+                print(f"htmltomd: erro: {targets[key]} e {input_path} gerariam o mesmo arquivo "
+                      f"em {args.output_dir}", file=sys.stderr)
+                return 2
+            targets[key] = input_path
+
+    # Importado só aqui: o parsing é o que domina o tempo de início
+    from htmltomd.converter.pipeline import Converter
+    instrumentation = None
+    if args.stats is not None:
+        from htmltomd.instrumentation import Instrumentation
+        instrumentation = Instrumentation(memory=args.stats_memory)
+    fragment_cache = None
+    if args.fragment_cache:
+        from htmltomd.cache import FragmentCache
+        fragment_cache = FragmentCache()
+    try:
+        converter = Converter(emitter=args.emitter, backend=args.backend,
+                              instrumentation=instrumentation, limits=limits_from_args(args),
+                              fragment_cache=fragment_cache)
+    except ValueError as e:
+        print(f"htmltomd: erro: {e}", file=sys.stderr)
+        return 2
+
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    failed = 0
+    for input_path in inputs:
+        output_path = args.output
+        if args.output_dir is not None:
+            output_path = _output_path(input_path, args.output_dir)
+        try:
+            if args.incremental:
+                from htmltomd.converter.incremental import convert_file_incremental
+                convert_file_incremental(input_path, output_path, emitter=converter.emitter,
+                                         backend=converter.backend, encoding=args.encoding)
+            elif instrumentation is None:
+                _convert_one(converter, input_path, output_path, args.encoding, args.stream)
+            else:
+                with instrumentation.document(name=input_path):
+                    _convert_one(converter, input_path, output_path, args.encoding, args.stream)
+        except (OSError, LookupError, BudgetExceeded) as e:
+            print(f"htmltomd: erro em {input_path}: {e}", file=sys.stderr)
+            failed += 1
+
+    if instrumentation is not None:
+        _write_stats(instrumentation, args.stats)
+    return 1 if failed else 0
+
+def _write_stats(instrumentation, path: str) -> None:
+    """Grava as medições em JSON no arquivo ou na saída de erros ('-')."""
+    if path == '-':
+        print(instrumentation.to_json(indent=2), file=sys.stderr)
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(instrumentation.to_json(indent=2))
+
+def ui_command(args: argparse.Namespace) -> int:
+    """
+    Executa o subcomando ``ui``, iniciando a interface Streamlit.
+
+    Args:
+        args (argparse.Namespace): Argumentos do subcomando
+
+    Returns:
+        int: Código de saída do Streamlit
+    """
+    try:
+        from streamlit.web import cli as stcli
+    except ImportError:
+        print("htmltomd: erro: a interface web requer o extra 'ui': pip install htmltomd[ui]",
+              file=sys.stderr)
+        return 1
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ui', 'app.py')
+    sys.argv = ['streamlit', 'run', app_path, *args.streamlit_args]
+    return stcli.main()
+
+COMMANDS = {
+    'convert': convert_command,
+    'ui': ui_command,
+}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Processa os argumentos da linha de comando e executa o subcomando.
+
+    Args:
+        argv (List[str], optional): Argumentos; usa sys.argv quando omitido
+
+    Returns:
+        int: Código de saída
+    """
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.version:
+        from htmltomd import __version__
+        print(f"htmltomd {__version__}")
+        return 0
+    if args.command is None:
+        parser.print_help(sys.stderr)
+        return 2
+    return COMMANDS[args.command](args)
+
+if __name__ == "__main__":
+    sys.exit(main())
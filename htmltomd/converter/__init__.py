@@ -4,6 +4,18 @@ Módulo de conversão para Markdown
 Este módulo é responsável por converter HTML parseado para Markdown.
 """
 
-from .md_converter import convert_to_markdown, clean_markdown
+from .md_converter import convert_to_markdown, convert_bytes, clean_markdown, EMITTERS
+from .cleaner import MarkdownCleaner
+from .emitter import MarkdownEmitter
+from .streaming import StreamingConverter, convert_stream, convert_file_stream
+from .pages import PageSplitter, split_pages, iter_pages, write_pages, convert_file_pages
+from .parallel import convert_parallel
+from .incremental import convert_incremental, convert_file_incremental
+from .pipeline import Converter
 
-__all__ = ['convert_to_markdown', 'clean_markdown']
\ No newline at end of file
+__all__ = [
+    'convert_to_markdown', 'convert_bytes', 'clean_markdown', 'EMITTERS', 'MarkdownCleaner', 'MarkdownEmitter',
+    'StreamingConverter', 'convert_stream', 'convert_file_stream', 'PageSplitter',
+    'split_pages', 'iter_pages', 'write_pages', 'convert_file_pages', 'convert_parallel',
+    'convert_incremental', 'convert_file_incremental', 'Converter'
+]
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""
+Limpeza do Markdown
+
+Este módulo contém a limpeza final do Markdown gerado (colapso de linhas em
+branco e remoção dos spans p-Pagina) em tempo linear, tanto para o
+documento inteiro quanto de forma incremental, para saídas em fluxo.
+"""
+
+import re
+from typing import List
+
+# Linhas em branco consecutivas, reduzidas a uma só
+BLANK_LINES = re.compile(r'\n{3,}')
+
+# Atributo class contendo p-Pagina, procurado apenas dentro da tag <span>
+PAGE_CLASS = re.compile(r'class=["\'](?:[^"\']*\s)?p-Pagina(?:\s[^"\']*)?["\']')
+
+SPAN_OPEN = '<span'
+SPAN_CLOSE = '</span>'
+
+def remove_page_spans(markdown: str) -> str:
+    """
+    Remove os spans p-Pagina que sobraram no Markdown.
+
+    Cada span (com crases opcionais ao redor) é removido até o primeiro
+    </span> da mesma linha. As buscas pelo próximo fechamento e pela próxima
+    quebra de linha só avançam, por isso o custo é linear mesmo com muitos
+    spans sem fechamento.
+
+    Args:
+        markdown (str): Conteúdo Markdown
+
+    Returns:
+        str: Conteúdo sem os spans de número de página
+    """
+    if 'p-Pagina' not in markdown:
+        return markdown
+
+    out = []
+    pos = 0
+    close = newline = -1
+    start = markdown.find(SPAN_OPEN)
+    while start != -1:
+        tag_end = markdown.find('>', start)
+        if tag_end == -1:
+            break
+        if PAGE_CLASS.search(markdown, start, tag_end):
+            if close <= tag_end:
+                close = markdown.find(SPAN_CLOSE, tag_end + 1)
+                if close == -1:
+                    # Nenhum span pode ser fechado daqui em diante
+                    break
+            if newline <= tag_end:
+                newline = markdown.find('\n', tag_end + 1)
+                if newline == -1:
+                    newline = len(markdown)
+            if close < newline:
+                begin = start - 1 if start > pos and markdown[start - 1] == '`' else start
+                end = close + len(SPAN_CLOSE)
+                if markdown.startswith('`', end):
+                    end += 1
+                out.append(markdown[pos:begin])
+                pos = end
+                start = markdown.find(SPAN_OPEN, end)
+                continue
+        start = markdown.find(SPAN_OPEN, start + 1)
+
+    out.append(markdown[pos:])
+    return ''.join(out)
+
+def _newlines(count: int) -> str:
+    """Quebras de linha de uma sequência, com as linhas em branco colapsadas."""
+    return '\n\n' if count >= 3 else '\n' * count
+
+class MarkdownCleaner:
+    """
+    Limpeza incremental do Markdown.
+
+    Recebe o Markdown em pedaços arbitrários e devolve o texto limpo assim
+    que as linhas são concluídas. A concatenação de tudo o que ``feed`` e
+    ``close`` devolvem é igual a clean_markdown aplicado ao documento
+    inteiro. Apenas a última linha incompleta, a sequência atual de quebras
+    de linha e (com ``strip``) os espaços no final ficam retidos.
+
+    Uso:
+        cleaner = MarkdownCleaner()
+        for chunk in chunks:
+            output.write(cleaner.feed(chunk))
+        output.write(cleaner.close())
+    """
+
+    def __init__(self, strip: bool = True):
+        """
+        Args:
+            strip (bool): Remove os espaços em branco nas bordas do documento
+        """
+        self.strip = strip
+        self._partial: List[str] = []
+        self._newlines = 0
+        self._started = False
+        self._trailing: List[str] = []
+
+    def feed(self, markdown: str) -> str:
+        """
+        Alimenta a limpeza com mais um pedaço de Markdown.
+
+        Args:
+            markdown (str): Pedaço de Markdown
+
+        Returns:
+            str: Markdown limpo das linhas concluídas
+        """
+        cut = markdown.rfind('\n')
+        if cut == -1:
+            self._partial.append(markdown)
+            return ''
+        self._partial.append(markdown[:cut + 1])
+        lines = ''.join(self._partial)
+        self._partial = [markdown[cut + 1:]]
+        # Tags <span> ainda abertas podem continuar nas próximas linhas: as
+        # linhas a partir da primeira delas ficam retidas
+        split = len(lines)
+        while True:
+            tag = lines.find(SPAN_OPEN, lines.rfind('>', 0, split) + 1, split)
+            if tag == -1:
+                break
+            split = lines.rfind('\n', 0, tag) + 1
+        if split < len(lines):
+            self._partial.insert(0, lines[split:])
+            lines = lines[:split]
+        return self._clean(lines)
+
+    def close(self) -> str:
+        """
+        Finaliza a limpeza.
+
+        Returns:
+            str: Markdown limpo restante
+        """
+        lines = ''.join(self._partial)
+        self._partial = []
+        pieces = self._clean(lines)
+        pieces += self._write(_newlines(self._newlines), final=True)
+        self._newlines = 0
+        return pieces
+
+    def _clean(self, lines: str) -> str:
+        body = lines.lstrip('\n')
+        self._newlines += len(lines) - len(body)
+        if not body:
+            return ''
+        text = body.rstrip('\n')
+        prefix = _newlines(self._newlines)
+        self._newlines = len(body) - len(text)
+        return self._write(prefix + remove_page_spans(BLANK_LINES.sub('\n\n', text)))
+
+    def _write(self, text: str, final: bool = False) -> str:
+        """Aplica a remoção dos espaços nas bordas ao texto já limpo."""
+        if not self.strip:
+            return text
+        if final:
+            self._trailing = []
+            return ''
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return ''
+            self._started = True
+        content = text.rstrip()
+        if not content:
+            self._trailing.append(text)
+            return ''
+        pending = ''.join(self._trailing)
+        self._trailing = [text[len(content):]]
+        return pending + content
@@ -0,0 +1,456 @@
+"""
+Emissor nativo de Markdown
+
+Este módulo gera Markdown diretamente a partir da árvore do BeautifulSoup,
+sem serializar o documento de volta para HTML e sem uma segunda tokenização
+pelo html2text.
+
+O emissor reproduz o comportamento do html2text para as opções usadas pelo
+projeto (links e imagens ignorados, sem quebra de linhas, Unicode preservado).
+Os eventos de abertura, fechamento e texto são gerados a partir dos nós da
+árvore na mesma ordem em que o html2text os veria ao tokenizar ``str(soup)``.
+"""
+
+import re
+import string
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+from bs4.element import NavigableString, Tag, Comment, CData, Declaration, Doctype, ProcessingInstruction
+from html2text.utils import escape_md_section, hn, list_numbering_start
+
+# Nós de texto que viram comentários ou declarações quando serializados e
+# que o html2text ignora
+IGNORED_STRING_TYPES = (Comment, CData, Declaration, Doctype, ProcessingInstruction)
+
+# Tags cujo conteúdo é serializado sem escapar entidades
+CDATA_TAGS = frozenset(['script', 'style'])
+
+# Caracteres que a serialização transforma em entidades
+ENTITY_CHARS = re.compile(r'([&<>])')
+
+WHITESPACE = re.compile(r'\s+')
+STRESSED_NEXT = re.compile(r'[^][(){}\s.!?]')
+
+
+class _ListElement:
+    """Estado de uma lista aberta (ul ou ol)."""
+
+    __slots__ = ('name', 'num')
+
+    def __init__(self, name: str, num: int):
+        self.name = name
+        self.num = num
+
+
+class MarkdownEmitter:
+    """
+    Converte uma árvore BeautifulSoup em Markdown em uma única passagem.
+
+    A instância guarda o estado da conversão e pode ser reutilizada: cada
+    chamada a ``emit`` começa de um estado limpo. A mesma instância não deve
+    ser usada por duas threads ao mesmo tempo.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Restaura o estado inicial do emissor."""
+        self.outtextlist: List[str] = []
+        self.quiet = 0
+        self.p_p = 0
+        self.start = True
+        self.space = False
+        self.list: List[_ListElement] = []
+        self.blockquote = 0
+        self.pre = False
+        self.startpre = False
+        self.list_code_indent = ""
+        self.code = False
+        self.quote = False
+        self.br_toggle = ""
+        self.last_was_nl = False
+        self.last_was_list = False
+        self.inheader = False
+        self.abbr_title: Optional[str] = None
+        self.abbr_data: Optional[str] = None
+        self.abbr_list: Dict[str, str] = {}
+        self.stressed = False
+        self.preceding_stressed = False
+        self.preceding_data = ""
+        self.current_tag = ""
+        self.split_next_td = False
+        self.td_count = 0
+        self.table_start = False
+
+    def emit(self, soup: BeautifulSoup) -> str:
+        """
+        Gera o Markdown de uma árvore (ou subárvore) do BeautifulSoup.
+
+        Args:
+            soup (BeautifulSoup): Documento ou tag a ser convertido
+
+        Returns:
+            str: Conteúdo em Markdown, sem a limpeza final
+        """
+        self.reset()
+        self.walk(soup)
+        return self.finish()
+
+    def walk(self, root: Tag) -> None:
+        """
+        Percorre a árvore gerando eventos de abertura, texto e fechamento.
+
+        Nós de texto adjacentes são agrupados, como aconteceria após a
+        serialização, e comentários ou declarações apenas separam os grupos.
+
+        Args:
+            root (Tag): Nó cujos descendentes serão emitidos
+        """
+        pending: List[str] = []
+        stack = [(child, False) for child in reversed(root.contents)]
+
+        while stack:
+            node, leaving = stack.pop()
+
+            if isinstance(node, NavigableString):
+                if isinstance(node, IGNORED_STRING_TYPES):
+                    self._flush_text(pending)
+                elif node.parent is not None and node.parent.name in CDATA_TAGS:
+                    self._flush_text(pending)
+                    self.handle_data(str(node))
+                else:
+                    pending.append(node)
+                continue
+
+            self._flush_text(pending)
+
+            if leaving:
+                self.handle_tag(node.name, {}, False)
+                continue
+
+            self.handle_tag(node.name, node.attrs, True)
+            stack.append((node, True))
+            for child in reversed(node.contents):
+                stack.append((child, False))
+
+        self._flush_text(pending)
+
+    def _flush_text(self, pending: List[str]) -> None:
+        """Emite o texto acumulado, separando os caracteres que viram entidades."""
+        if not pending:
+            return
+        text = ''.join(pending)
+        pending.clear()
+        for index, piece in enumerate(ENTITY_CHARS.split(text)):
+            if index % 2:
+                self.handle_data(piece, True)
+            elif piece:
+                self.handle_data(piece)
+
+    def finish(self) -> str:
+        """
+        Encerra a conversão e retorna o Markdown gerado.
+
+        Returns:
+            str: Conteúdo em Markdown
+        """
+        self.pbr()
+        self.o("", force="end")
+        outtext = "".join(self.outtextlist)
+        self.outtextlist = []
+        return outtext
+
+    def out(self, s: str) -> None:
+        """Acrescenta um trecho à saída."""
+        self.outtextlist.append(s)
+        if s:
+            self.last_was_nl = s[-1] == "\n"
+
+    def pbr(self) -> None:
+        """Solicita ao menos uma quebra de linha antes da próxima saída."""
+        if self.p_p == 0:
+            self.p_p = 1
+
+    def p(self) -> None:
+        """Solicita uma quebra de parágrafo antes da próxima saída."""
+        self.p_p = 2
+
+    def soft_br(self) -> None:
+        """Solicita uma quebra de linha com dois espaços."""
+        self.pbr()
+        self.br_toggle = "  "
+
+    def handle_tag(self, tag: str, attrs: Dict, start: bool) -> None:
+        """
+        Processa a abertura ou o fechamento de uma tag.
+
+        Args:
+            tag (str): Nome da tag
+            attrs (dict): Atributos da tag (vazio no fechamento)
+            start (bool): True na abertura, False no fechamento
+        """
+        self.current_tag = tag
+
+        if hn(tag):
+            self.p()
+            if start:
+                self.inheader = True
+                self.o(hn(tag) * "#" + " ")
+            else:
+                self.inheader = False
+                return
+
+        if tag in ("p", "div") and not self.split_next_td:
+            self.p()
+
+        if tag == "br" and start:
+            if self.blockquote > 0:
+                self.o("  \n> ")
+            else:
+                self.o("  \n")
+
+        if tag == "hr" and start:
+            self.p()
+            self.o("* * *")
+            self.p()
+
+        if tag in ("head", "style", "script"):
+            if start:
+                self.quiet += 1
+            else:
+                self.quiet -= 1
+
+        if tag == "body":
+            self.quiet = 0
+
+        if tag == "blockquote":
+            if start:
+                self.p()
+                self.o("> ", force=True)
+                self.start = True
+                self.blockquote += 1
+            else:
+                self.blockquote -= 1
+                self.p()
+
+        if tag in ("em", "i", "u"):
+            if (
+                start
+                and self.preceding_data
+                and self.preceding_data[-1] not in string.whitespace
+                and self.preceding_data[-1] not in string.punctuation
+            ):
+                emphasis = " _"
+                self.preceding_data += " "
+            else:
+                emphasis = "_"
+            self.o(emphasis)
+            if start:
+                self.stressed = True
+
+        if tag in ("strong", "b"):
+            if start and self.preceding_data and self.preceding_data[-1] == "*":
+                strong = " **"
+                self.preceding_data += " "
+            else:
+                strong = "**"
+            self.o(strong)
+            if start:
+                self.stressed = True
+
+        if tag in ("del", "strike", "s"):
+            if start and self.preceding_data and self.preceding_data[-1] == "~":
+                strike = " ~~"
+                self.preceding_data += " "
+            else:
+                strike = "~~"
+            self.o(strike)
+            if start:
+                self.stressed = True
+
+        if tag in ("kbd", "code", "tt") and not self.pre:
+            self.o("`")
+            self.code = not self.code
+
+        if tag == "abbr":
+            if start:
+                self.abbr_title = attrs.get("title")
+                self.abbr_data = ""
+            else:
+                if self.abbr_title is not None:
+                    self.abbr_list[self.abbr_data] = self.abbr_title
+                    self.abbr_title = None
+                self.abbr_data = None
+
+        if tag == "q":
+            self.o('"')
+            self.quote = not self.quote
+
+        if tag == "dl" and start:
+            self.p()
+        if tag == "dt" and not start:
+            self.pbr()
+        if tag == "dd" and start:
+            self.o("    ")
+        if tag == "dd" and not start:
+            self.pbr()
+
+        if tag in ("ol", "ul"):
+            if not self.list and not self.last_was_list:
+                self.p()
+            if start:
+                self.list.append(_ListElement(tag, list_numbering_start(attrs)))
+            elif self.list:
+                self.list.pop()
+                if not self.list:
+                    self.o("\n")
+            self.last_was_list = True
+        else:
+            self.last_was_list = False
+
+        if tag == "li":
+            self.list_code_indent = ""
+            self.pbr()
+            if start:
+                li = self.list[-1] if self.list else _ListElement("ul", 0)
+                # Dois espaços por nível, três para listas dentro de ol
+                parent_list = None
+                for item in self.list:
+                    self.list_code_indent += "   " if parent_list == "ol" else "  "
+                    parent_list = item.name
+                self.o(self.list_code_indent)
+
+                if li.name == "ul":
+                    self.list_code_indent += "  "
+                    self.o("* ")
+                elif li.name == "ol":
+                    li.num += 1
+                    self.list_code_indent += "   "
+                    self.o(str(li.num) + ". ")
+                self.start = True
+
+        if tag in ("td", "th") and start:
+            if self.split_next_td:
+                self.o("| ")
+            self.split_next_td = True
+        if tag == "table" and start:
+            self.table_start = True
+        if tag == "tr" and start:
+            self.td_count = 0
+        if tag == "tr" and not start:
+            self.split_next_td = False
+            self.soft_br()
+            if self.table_start:
+                # Sublinhar o cabeçalho da tabela
+                self.o("|".join(["---"] * self.td_count))
+                self.soft_br()
+                self.table_start = False
+        if tag in ("td", "th") and start:
+            self.td_count += 1
+
+        if tag == "pre":
+            if start:
+                self.startpre = True
+                self.pre = True
+            else:
+                self.pre = False
+            self.p()
+
+    def o(self, data: str, puredata: bool = False, force=False) -> None:
+        """
+        Escreve um trecho aplicando recuo, quebras pendentes e espaços.
+
+        Args:
+            data (str): Trecho a ser escrito
+            puredata (bool): True quando o trecho é texto do documento
+            force: True para escrever mesmo vazio, "end" ao finalizar
+        """
+        if self.abbr_data is not None:
+            self.abbr_data += data
+
+        if self.quiet:
+            return
+
+        if puredata and not self.pre:
+            data = WHITESPACE.sub(" ", data)
+            if data and data[0] == " ":
+                self.space = True
+                data = data[1:]
+        if not data and not force:
+            return
+
+        if self.startpre and not data.startswith("\n") and not data.startswith("\r\n"):
+            data = "\n" + data
+
+        bq = ">" * self.blockquote
+        if not (force and data and data[0] == ">") and self.blockquote:
+            bq += " "
+
+        if self.pre:
+            if self.list:
+                bq += self.list_code_indent
+            bq += "    "
+            data = data.replace("\n", "\n" + bq)
+
+        if self.startpre:
+            self.startpre = False
+            if self.list:
+                data = data.lstrip("\n" + bq)
+
+        if self.start:
+            self.space = False
+            self.p_p = 0
+            self.start = False
+
+        if force == "end":
+            self.p_p = 0
+            self.out("\n")
+            self.space = False
+
+        if self.p_p:
+            self.out((self.br_toggle + "\n" + bq) * self.p_p)
+            self.space = False
+            self.br_toggle = ""
+
+        if self.space:
+            if not self.last_was_nl:
+                self.out(" ")
+            self.space = False
+
+        if self.abbr_list and force == "end":
+            for abbr, definition in self.abbr_list.items():
+                self.out("  *[" + abbr + "]: " + definition + "\n")
+
+        self.p_p = 0
+        self.out(data)
+
+    def handle_data(self, data: str, entity_char: bool = False) -> None:
+        """
+        Processa um trecho de texto do documento.
+
+        Args:
+            data (str): Texto a ser escrito
+            entity_char (bool): True quando o texto veio de uma entidade HTML
+        """
+        if not data:
+            return
+
+        if self.stressed:
+            data = data.strip()
+            self.stressed = False
+            self.preceding_stressed = True
+        elif self.preceding_stressed:
+            if (
+                STRESSED_NEXT.match(data[0])
+                and not hn(self.current_tag)
+                and self.current_tag not in ("a", "code", "pre")
+            ):
+                data = " " + data
+            self.preceding_stressed = False
+
+        if not self.code and not self.pre and not entity_char:
+            data = escape_md_section(data)
+        self.preceding_data = data
+        self.o(data, puredata=True)
@@ -0,0 +1,218 @@
+"""
+Reconversão incremental por página
+
+Este módulo corta o documento em um trecho por elemento p-Pagina e guarda,
+em um arquivo auxiliar (sidecar), a impressão digital de cada trecho e a
+posição do seu Markdown na saída. Na conversão seguinte, só os trechos
+cujas impressões digitais mudaram são convertidos de novo; os demais são
+copiados da saída anterior.
+
+Uso:
+    markdown, sidecar = convert_incremental(html)
+    ...
+    markdown, sidecar = convert_incremental(html_editado, markdown, sidecar)
+"""
+
+import hashlib
+import json
+import os
+from typing import List, Optional, Tuple
+
+from htmltomd import __version__
+from htmltomd.encoding import decode_html
+from htmltomd.output import atomic_writer
+from htmltomd.parser import resolve_backend
+from htmltomd.parser.chunker import split_at_pages
+from .md_converter import EMITTERS
+from .pages import PAGE_MARKER
+from .streaming import StreamingConverter
+
+# Versão do formato do sidecar
+SIDECAR_VERSION = 1
+
+# Sufixo do sidecar gravado ao lado do arquivo Markdown
+SIDECAR_SUFFIX = '.pages.json'
+
+def fingerprint(segment: str) -> str:
+    """
+    Calcula a impressão digital de um trecho de HTML.
+
+    Args:
+        segment (str): Trecho, incluindo os contêineres que o envolvem
+
+    Returns:
+        str: Hash SHA-256 em hexadecimal
+    """
+    return hashlib.sha256(segment.encode('utf-8', 'surrogatepass')).hexdigest()
+
+def _output_hash(markdown: str) -> str:
+    return hashlib.sha256(markdown.encode('utf-8', 'surrogatepass')).hexdigest()
+
+def _layout(blocks: List[str]) -> Tuple[str, List[Optional[dict]]]:
+    """
+    Junta os blocos como join_blocks, registrando onde cada um ficou.
+
+    Returns:
+        Tuple[str, List[Optional[dict]]]: Documento e, para cada bloco, a
+            posição na saída e os espaços removidos das bordas do documento,
+            ou None para blocos vazios
+    """
+    kept = [i for i, block in enumerate(blocks) if block.strip()]
+    entries: List[Optional[dict]] = [None] * len(blocks)
+    parts = []
+    pos = 0
+    for n, i in enumerate(kept):
+        block = blocks[i]
+        lead = trail = ''
+        if n == 0:
+            stripped = block.lstrip()
+            lead, block = block[:len(block) - len(stripped)], stripped
+        if n == len(kept) - 1:
+            stripped = block.rstrip()
+            trail, block = block[len(stripped):], stripped
+        if n:
+            parts.append('\n\n')
+            pos += 2
+        parts.append(block)
+        entries[i] = {'start': pos, 'end': pos + len(block), 'lead': lead, 'trail': trail}
+        pos += len(block)
+    return ''.join(parts), entries
+
+def _previous_blocks(previous_markdown: Optional[str], sidecar: Optional[dict],
+                     options: dict) -> dict:
+    """Markdown de cada trecho da conversão anterior, por impressão digital."""
+    if previous_markdown is None or not sidecar:
+        return {}
+    if (sidecar.get('version') != SIDECAR_VERSION or sidecar.get('options') != options
+            or sidecar.get('output') != _output_hash(previous_markdown)):
+        # Opções diferentes ou saída editada desde então: nada é reaproveitado
+        return {}
+    blocks = {}
+    for segment in sidecar['segments']:
+        if segment['start'] is None:
+            blocks[segment['fingerprint']] = ''
+        else:
+            blocks[segment['fingerprint']] = (
+                segment['lead'] + previous_markdown[segment['start']:segment['end']] + segment['trail'])
+    return blocks
+
+def convert_incremental(html: str, previous_markdown: Optional[str] = None,
+                        sidecar: Optional[dict] = None, emitter: str = 'html2text',
+                        backend: str = 'html.parser', rules=None,
+                        parse_filter=None) -> Tuple[str, dict]:
+    """
+    Converte um documento reaproveitando as páginas que não mudaram.
+
+    O documento é cortado em um trecho por elemento de página (veja
+    split_at_pages). Os trechos cuja impressão digital consta do sidecar
+    têm o Markdown copiado da saída anterior; os demais são convertidos.
+    Páginas inseridas, removidas ou reordenadas são tratadas, já que a
+    correspondência é feita pela impressão digital e não pela posição. Sem
+    saída ou sidecar anteriores válidos, o documento inteiro é convertido.
+
+    Como na conversão paralela, o resultado é igual ao da conversão do
+    documento inteiro, exceto por espaços em linhas vazias que o html2text
+    às vezes mantém entre blocos.
+
+    Args:
+        html (str): Conteúdo HTML atual
+        previous_markdown (str, optional): Markdown da conversão anterior
+        sidecar (dict, optional): Sidecar devolvido pela conversão anterior
+        emitter (str): Emissor de Markdown ('html2text' ou 'native')
+        backend (str): Backend de parsing
+        rules (RuleSet, optional): Tabela de transformações; as regras
+            padrão quando omitida. Uma tabela sem chave estável (funções
+            sem ``key``, veja Rule) converte sempre o documento inteiro
+        parse_filter (ParseFilter, optional): Elementos descartados já no
+            parsing; None monta a árvore completa
+
+    Returns:
+        Tuple[str, dict]: Markdown e o novo sidecar; o sidecar informa em
+            'converted' e 'reused' quantos trechos foram convertidos e
+            reaproveitados
+    """
+    if emitter not in EMITTERS:
+        raise ValueError(f"Emissor desconhecido: {emitter!r}. Use um de {EMITTERS}")
+    options = {'emitter': emitter, 'backend': resolve_backend(backend), 'htmltomd': __version__}
+    if rules is not None:
+        options['rules'] = rules.key
+    if parse_filter is not None:
+        options['parse_filter'] = parse_filter.key
+    # Sem chave estável das regras, nada da conversão anterior é reaproveitado
+    previous = {}
+    if rules is None or rules.key is not None:
+        previous = _previous_blocks(previous_markdown, sidecar, options)
+
+    segments = split_at_pages(html)
+    fingerprints = [fingerprint(segment) for segment in segments]
+    converter = None
+    blocks = []
+    converted = 0
+    for segment, digest in zip(segments, fingerprints):
+        block = previous.get(digest)
+        if block is None:
+            if converter is None:
+                converter = StreamingConverter(emitter=emitter, backend=options['backend'], rules=rules,
+                                               parse_filter=parse_filter)
+            block = converter.convert_block(segment)
+            converted += 1
+        blocks.append(block)
+
+    markdown, entries = _layout(blocks)
+    records = []
+    for digest, block, entry in zip(fingerprints, blocks, entries):
+        marker = PAGE_MARKER.search(block)
+        record = {'fingerprint': digest, 'label': marker.group(1).strip() if marker else None}
+        record.update(entry or {'start': None, 'end': None, 'lead': '', 'trail': ''})
+        records.append(record)
+    return markdown, {
+        'version': SIDECAR_VERSION,
+        'options': options,
+        'output': _output_hash(markdown),
+        'converted': converted,
+        'reused': len(segments) - converted,
+        'segments': records,
+    }
+
+def convert_file_incremental(input_file: str, output_file: str, sidecar_file: Optional[str] = None,
+                             emitter: str = 'html2text', backend: str = 'html.parser',
+                             encoding: Optional[str] = None) -> dict:
+    """
+    Converte um arquivo reaproveitando a saída e o sidecar da vez anterior.
+
+    Args:
+        input_file (str): Caminho do arquivo HTML de entrada
+        output_file (str): Caminho do arquivo Markdown, lido se já existir
+        sidecar_file (str, optional): Caminho do sidecar; usa o arquivo de
+            saída com o sufixo .pages.json quando omitido
+        emitter (str): Emissor de Markdown ('html2text' ou 'native')
+        backend (str): Backend de parsing
+        encoding (str, optional): Codificação da entrada; detectada quando
+            omitida
+
+    Returns:
+        dict: Sidecar gravado
+    """
+    if sidecar_file is None:
+        sidecar_file = output_file + SIDECAR_SUFFIX
+    previous_markdown = sidecar = None
+    if os.path.exists(output_file) and os.path.exists(sidecar_file):
+        with open(output_file, 'r', encoding='utf-8', newline='') as f:
+            previous_markdown = f.read()
+        with open(sidecar_file, 'r', encoding='utf-8') as f:
+            try:
+                sidecar = json.load(f)
+            except ValueError:
+                sidecar = None
+
+    with open(input_file, 'rb') as f:
+        html = decode_html(f.read(), encoding)
+    markdown, sidecar = convert_incremental(html, previous_markdown, sidecar, emitter, backend)
+
+    # O sidecar guarda o hash da saída: se só um dos dois for gravado, a
+    # próxima conversão apenas deixa de reaproveitar
+    with atomic_writer(output_file, newline='') as f:
+        f.write(markdown)
+    with atomic_writer(sidecar_file) as f:
+        json.dump(sidecar, f, ensure_ascii=False)
+    return sidecar
@@ -4,25 +4,85 @@ Conversor para Markdown
 Este módulo contém funções para converter HTML parseado para Markdown.
 """
 
-import re
 import html2text
 from bs4 import BeautifulSoup
-from typing import Union
+from typing import Optional, Union
 
-def convert_to_markdown(soup: Union[BeautifulSoup, str]) -> str:
+from htmltomd.encoding import Buffer, decode_html
+from .cleaner import BLANK_LINES, remove_page_spans
+from .emitter import MarkdownEmitter
+
+# Emissores de Markdown disponíveis
+EMITTERS = ('html2text', 'native')
+
+def convert_to_markdown(soup: Union[BeautifulSoup, str], emitter: str = 'html2text',
+                        backend: str = 'html.parser', cache=None) -> str:
     """
     Converte HTML parseado para Markdown.
     
     Args:
         soup (Union[BeautifulSoup, str]): Objeto BeautifulSoup ou string HTML
+        emitter (str): 'html2text' serializa a árvore e a converte com o
+            html2text; 'native' gera o Markdown diretamente da árvore
+        backend (str): Backend de parsing usado quando soup é uma string
+        cache (ConversionCache, optional): Cache consultado quando soup é
+            uma string
         
     Returns:
         str: Conteúdo convertido para Markdown
     """
+    if emitter not in EMITTERS:
+        raise ValueError(f"Emissor desconhecido: {emitter!r}. Use um de {EMITTERS}")
+    
     # Se for uma string, parsear como HTML
     if isinstance(soup, str):
-        from htmltomd.parser import parse_html
-        soup = parse_html(soup)
+        from htmltomd.parser import parse_html, resolve_backend
+        if cache is not None:
+            html = soup
+            options = {'pipeline': 'convert_to_markdown', 'emitter': emitter,
+                       'backend': resolve_backend(backend)}
+            return cache.get_or_convert(html, options,
+                                        lambda: convert_to_markdown(html, emitter, backend))
+        soup = parse_html(soup, backend)
+    
+    # Limpar o Markdown gerado
+    return clean_markdown(render_markdown(soup, emitter))
+
+def convert_bytes(data: Buffer, encoding: Optional[str] = None, emitter: str = 'html2text',
+                  backend: str = 'html.parser', cache=None) -> str:
+    """
+    Converte HTML recebido em bytes, detectando a codificação.
+    
+    A codificação vem do BOM, do <meta charset> nos primeiros kilobytes ou,
+    na falta de declaração, do próprio conteúdo (UTF-8 ou Windows-1252), e
+    o documento é decodificado uma única vez.
+    
+    Args:
+        data (bytes): Documento; bytearray e memoryview são lidos sem cópia
+        encoding (str, optional): Codificação conhecida, dispensando a detecção
+        emitter (str): Emissor de Markdown ('html2text' ou 'native')
+        backend (str): Backend de parsing
+        cache (ConversionCache, optional): Cache de conversões
+        
+    Returns:
+        str: Conteúdo convertido para Markdown
+    """
+    return convert_to_markdown(decode_html(data, encoding), emitter, backend, cache)
+
+def render_markdown(soup: BeautifulSoup, emitter: str = 'html2text') -> str:
+    """
+    Gera o Markdown bruto de uma árvore, sem a limpeza final.
+    
+    Args:
+        soup (BeautifulSoup): Objeto BeautifulSoup do documento HTML
+        emitter (str): Emissor de Markdown ('html2text' ou 'native')
+        
+    Returns:
+        str: Markdown gerado pelo emissor
+    """
+    # Gerar o Markdown direto da árvore, sem a volta por str(soup)
+    if emitter == 'native':
+        return MarkdownEmitter().emit(soup)
     
     # Configurar o conversor html2text
     h = html2text.HTML2Text()
@@ -32,25 +92,26 @@ def convert_to_markdown(soup: Union[BeautifulSoup, str]) -> str:
     h.unicode_snob = True  # Preservar caracteres Unicode
     
     # Converter para Markdown
-    markdown = h.handle(str(soup))
-    
-    # Limpar o Markdown gerado
-    return clean_markdown(markdown)
+    return h.handle(str(soup))
 
-def clean_markdown(markdown: str) -> str:
+def clean_markdown(markdown: str, strip: bool = True) -> str:
     """
     Realiza limpeza final no Markdown gerado.
     
+    O custo é linear no tamanho do Markdown; para saídas em fluxo, use
+    MarkdownCleaner, que produz o mesmo resultado de forma incremental.
+    
     Args:
         markdown (str): Conteúdo Markdown a ser limpo
+        strip (bool): Remove os espaços em branco nas bordas do documento
         
     Returns:
         str: Conteúdo Markdown limpo
     """
     # Remover linhas em branco extras
-    markdown = re.sub(r'\n{3,}', '\n\n', markdown)
+    markdown = BLANK_LINES.sub('\n\n', markdown)
     
     # Remover spans de número de página (mantendo os comentários)
-    markdown = re.sub(r'`?<span[^>]*class=["\'](?:[^"\']*\s)?p-Pagina(?:\s[^"\']*)?["\'][^>]*>.*?</span>`?', '', markdown)
+    markdown = remove_page_spans(markdown)
     
-    return markdown.strip()
\ No newline at end of file
+    return markdown.strip() if strip else markdown
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""
+Divisão do Markdown por página
+
+Este módulo divide o Markdown nos marcadores <!-- Página N --> inseridos por
+mark_page_breaks, entregando uma unidade por página à medida que a conversão
+avança, e grava as páginas em arquivos separados com um manifesto.
+"""
+
+import io
+import json
+import mmap
+import os
+import re
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from htmltomd.encoding import sniff_encoding
+from htmltomd.output import atomic_writer
+from .streaming import convert_stream, DEFAULT_CHUNK_SIZE
+
+# Marcador de página no Markdown gerado
+PAGE_MARKER = re.compile(r'<!-- Página ([^\n]*?) -->')
+
+# Tamanho máximo de um marcador; o final de cada pedaço retido para que um
+# marcador dividido entre dois pedaços seja encontrado
+MAX_MARKER_LENGTH = 256
+
+# Nome do manifesto gravado junto com as páginas
+MANIFEST_NAME = 'manifest.json'
+
+Page = Tuple[Optional[str], str]
+
+def page_numbers(label: str) -> List[int]:
+    """
+    Extrai os números de página de um rótulo.
+
+    Args:
+        label (str): Rótulo da página, como '12' ou '12 e 13'
+
+    Returns:
+        List[int]: Números contidos no rótulo, na ordem em que aparecem
+    """
+    return [int(number) for number in re.findall(r'\d+', label or '')]
+
+class PageSplitter:
+    """
+    Divide o Markdown em páginas de forma incremental.
+
+    Cada página começa no seu marcador e vai até o marcador seguinte; o
+    conteúdo anterior ao primeiro marcador, se houver, é entregue com rótulo
+    None. A concatenação das páginas é igual ao Markdown recebido. Uma
+    página só é entregue quando o marcador seguinte chega (ou em ``close``),
+    por isso apenas a página atual fica em memória.
+
+    Uso:
+        splitter = PageSplitter()
+        for piece in pieces:
+            for label, markdown in splitter.feed(piece):
+                ...
+        for label, markdown in splitter.close():
+            ...
+    """
+
+    def __init__(self):
+        self._label: Optional[str] = None
+        self._current: List[str] = []
+        self._tail = ''
+
+    def feed(self, markdown: str) -> List[Page]:
+        """
+        Alimenta o divisor com mais um trecho de Markdown.
+
+        Args:
+            markdown (str): Trecho de Markdown
+
+        Returns:
+            List[Page]: Páginas concluídas, como pares (rótulo, Markdown)
+        """
+        data = self._tail + markdown
+        pages = []
+        pos = end = 0
+        for match in PAGE_MARKER.finditer(data):
+            self._current.append(data[pos:match.start()])
+            pages.extend(self._finish())
+            self._label = match.group(1).strip()
+            pos = match.start()
+            end = match.end()
+        keep = max(end, len(data) - MAX_MARKER_LENGTH)
+        self._current.append(data[pos:keep])
+        self._tail = data[keep:]
+        return pages
+
+    def close(self) -> List[Page]:
+        """
+        Finaliza a divisão e entrega a última página.
+
+        Returns:
+            List[Page]: Última página, se houver conteúdo
+        """
+        self._current.append(self._tail)
+        self._tail = ''
+        return self._finish()
+
+    def _finish(self) -> List[Page]:
+        markdown = ''.join(self._current)
+        self._current = []
+        if self._label is None and not markdown.strip():
+            return []
+        return [(self._label, markdown)]
+
+def split_pages(markdown: str) -> List[Page]:
+    """
+    Divide um documento Markdown completo em páginas.
+
+    Args:
+        markdown (str): Conteúdo Markdown com marcadores de página
+
+    Returns:
+        List[Page]: Páginas como pares (rótulo, Markdown)
+    """
+    splitter = PageSplitter()
+    return splitter.feed(markdown) + splitter.close()
+
+def iter_pages(source: Union[TextIO, Iterable[str]], chunk_size: int = DEFAULT_CHUNK_SIZE,
+               emitter: str = 'html2text', backend: str = 'html.parser') -> Iterator[Page]:
+    """
+    Converte HTML para Markdown em fluxo, entregando uma página por vez.
+
+    Args:
+        source: Arquivo de texto (com ``read``) ou iterável de strings
+        chunk_size (int): Tamanho de cada leitura em caracteres
+        emitter (str): Emissor de Markdown ('html2text' ou 'native')
+        backend (str): Backend de parsing usado em cada bloco
+
+    Yields:
+        Page: Pares (rótulo, Markdown), na ordem do documento
+    """
+    splitter = PageSplitter()
+    for piece in convert_stream(source, chunk_size, emitter=emitter, backend=backend):
+        yield from splitter.feed(piece)
+    yield from splitter.close()
+
+def write_pages(pages: Iterable[Page], output_dir: str) -> dict:
+    """
+    Grava cada página em um arquivo e o manifesto que as relaciona.
+
+    Os arquivos são numerados na ordem do documento (pagina-0001.md, ...).
+    O manifesto (manifest.json) lista, para cada arquivo, o rótulo da página
+    e os números que ele contém, de modo que '12 e 13' aponta para um único
+    arquivo com as duas páginas. Cada arquivo é gravado em um temporário
+    renomeado ao final, e o manifesto por último, de modo que uma falha no
+    meio não deixa páginas truncadas nem um manifesto desatualizado.
+
+    Args:
+        pages (Iterable[Page]): Páginas como pares (rótulo, Markdown)
+        output_dir (str): Diretório de saída
+
+    Returns:
+        dict: Manifesto gravado
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    entries = []
+    for index, (label, markdown) in enumerate(pages, start=1):
+        file_name = f'pagina-{index:04d}.md'
+        with atomic_writer(os.path.join(output_dir, file_name)) as f:
+            f.write(markdown.strip() + '\n')
+        entries.append({'label': label, 'numbers': page_numbers(label), 'file': file_name})
+
+    manifest = {'pages': entries}
+    with atomic_writer(os.path.join(output_dir, MANIFEST_NAME)) as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+def convert_file_pages(input_file: str, output_dir: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       emitter: str = 'html2text', backend: str = 'html.parser',
+                       encoding: Optional[str] = None) -> dict:
+    """
+    Converte um arquivo HTML em um arquivo Markdown por página.
+
+    Args:
+        input_file (str): Caminho do arquivo HTML de entrada
+        output_dir (str): Diretório onde as páginas e o manifesto são gravados
+        chunk_size (int): Tamanho de cada leitura em caracteres
+        emitter (str): Emissor de Markdown ('html2text' ou 'native')
+        backend (str): Backend de parsing usado em cada bloco
+        encoding (str, optional): Codificação da entrada; detectada como em
+            decode_html quando omitida
+
+    Returns:
+        dict: Manifesto gravado
+    """
+    with open(input_file, 'rb') as raw:
+        if encoding is None:
+            if os.fstat(raw.fileno()).st_size == 0:
+                encoding = 'utf-8'
+            else:
+                # Detectada no arquivo mapeado; a entrada continua lida em pedaços
+                with mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    encoding = sniff_encoding(data)
+        with io.TextIOWrapper(raw, encoding=encoding, errors='replace') as f:
+            return write_pages(iter_pages(f, chunk_size, emitter, backend), output_dir)
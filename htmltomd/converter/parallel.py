@@ -0,0 +1,99 @@
+"""
+Conversão paralela de um único documento
+
+Este módulo corta um documento grande nos elementos de página, converte os
+trechos em um pool de processos e junta o Markdown na ordem original.
+"""
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import Iterable, Optional
+
+from htmltomd.parser import resolve_backend
+from htmltomd.parser.chunker import split_document
+from .md_converter import EMITTERS
+from .streaming import StreamingConverter
+
+# Tamanho mínimo de cada trecho; documentos menores não compensam o pool
+DEFAULT_MIN_CHUNK_SIZE = 256 * 1024
+
+# Trechos por processo, para equilibrar a carga entre trechos desiguais
+CHUNKS_PER_WORKER = 4
+
+def _convert_chunk(chunk: str, emitter: str, backend: str, rules=None,
+                   parse_filter=None) -> str:
+    """Converte um trecho no processo de trabalho."""
+    converter = StreamingConverter(emitter=emitter, backend=backend, rules=rules,
+                                   parse_filter=parse_filter)
+    return converter.convert_block(chunk)
+
+def join_blocks(blocks: Iterable[str]) -> str:
+    """
+    Junta o Markdown de blocos convertidos separadamente.
+
+    Usa as mesmas regras do StreamingConverter: blocos vazios são
+    descartados, os demais são separados por uma linha em branco e os
+    espaços nas bordas do documento são removidos.
+
+    Args:
+        blocks (Iterable[str]): Markdown de cada bloco, na ordem do documento
+
+    Returns:
+        str: Documento Markdown
+    """
+    pieces = [block for block in blocks if block.strip()]
+    if not pieces:
+        return ''
+    pieces[0] = pieces[0].lstrip()
+    pieces[-1] = pieces[-1].rstrip()
+    return '\n\n'.join(pieces)
+
+def convert_parallel(html: str, workers: Optional[int] = None, emitter: str = 'html2text',
+                     backend: str = 'html.parser', executor: Optional[Executor] = None,
+                     min_chunk_size: int = DEFAULT_MIN_CHUNK_SIZE, rules=None,
+                     parse_filter=None) -> str:
+    """
+    Converte um documento grande usando vários processos.
+
+    O documento é cortado nos elementos de página em trechos de tamanho
+    equilibrado (veja split_document), e cada trecho é convertido em um
+    processo. Como na conversão em fluxo, o resultado é igual ao da
+    conversão serial, exceto por espaços em linhas vazias que o html2text
+    às vezes mantém entre blocos.
+
+    Args:
+        html (str): Conteúdo HTML a ser convertido
+        workers (int, optional): Quantidade de processos, que também define
+            em quantos trechos o documento é cortado; usa a quantidade de
+            CPUs quando omitido
+        emitter (str): Emissor de Markdown ('html2text' ou 'native')
+        backend (str): Backend de parsing ('html.parser', 'lxml', 'html5lib'
+            ou 'auto')
+        executor (Executor, optional): Pool já existente, reaproveitado
+            entre chamadas; quando omitido, um pool é criado e encerrado
+        min_chunk_size (int): Tamanho mínimo de cada trecho
+        rules (RuleSet, optional): Tabela de transformações; precisa poder
+            ser enviada aos processos, então funções de regras devem ser
+            definidas no nível do módulo
+        parse_filter (ParseFilter, optional): Elementos descartados já no
+            parsing; None monta a árvore completa
+
+    Returns:
+        str: Conteúdo convertido para Markdown
+    """
+    if emitter not in EMITTERS:
+        raise ValueError(f"Emissor desconhecido: {emitter!r}. Use um de {EMITTERS}")
+    backend = resolve_backend(backend)
+    workers = workers or os.cpu_count() or 1
+    count = min(workers * CHUNKS_PER_WORKER, len(html) // max(min_chunk_size, 1))
+    chunks = split_document(html, count)
+    convert = partial(_convert_chunk, emitter=emitter, backend=backend, rules=rules,
+                      parse_filter=parse_filter)
+
+    if len(chunks) == 1:
+        return join_blocks([convert(chunks[0])])
+    if executor is not None:
+        return join_blocks(executor.map(convert, chunks))
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        return join_blocks(pool.map(convert, chunks))
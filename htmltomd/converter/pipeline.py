@@ -0,0 +1,331 @@
+"""
+Conversor reutilizável
+
+Este módulo define o Converter, que recebe as opções de conversão uma única
+vez e executa o pipeline completo (parsing, transformações, geração do
+Markdown e limpeza) a cada chamada.
+"""
+
+import threading
+from concurrent.futures import Executor
+from contextlib import nullcontext
+from typing import Iterable, Iterator, Optional, TextIO, Tuple, Union
+
+from htmltomd.encoding import Buffer, decode_html
+from htmltomd.instrumentation import count_nodes
+from htmltomd.output import write_markdown
+from htmltomd.parser import parse_html, apply_transforms, resolve_backend
+from .emitter import MarkdownEmitter
+from .md_converter import render_markdown, clean_markdown, EMITTERS
+from .pages import PageSplitter, Page
+from .incremental import convert_incremental
+from .parallel import convert_parallel, join_blocks
+from .streaming import StreamingConverter, iter_chunks, new_splitter, DEFAULT_CHUNK_SIZE
+
+def _untracked_stage(name: str):
+    """Etapa sem coletor de medições."""
+    return nullcontext({})
+
+
+class Converter:
+    """
+    Conversor de HTML para Markdown com opções pré-configuradas.
+
+    As opções são validadas e resolvidas na criação (o backend 'auto' é
+    resolvido uma única vez). A instância pode ser compartilhada entre
+    threads: cada thread recebe automaticamente o seu próprio emissor nativo,
+    que é reaproveitado entre as conversões. O html2text não volta ao estado
+    inicial entre documentos, por isso uma instância nova é criada a cada
+    conversão quando ele é o emissor.
+
+    Uso:
+        converter = Converter(emitter='native', backend='auto')
+        markdown = converter.convert(html)
+    """
+
+    def __init__(self, emitter: str = 'html2text', backend: str = 'html.parser', cache=None,
+                 instrumentation=None, limits=None, fragment_cache=None, rules=None,
+                 parse_filter=None):
+        """
+        Args:
+            emitter (str): Emissor de Markdown ('html2text' ou 'native')
+            backend (str): Backend de parsing ('html.parser', 'lxml',
+                'html5lib' ou 'auto')
+            cache (ConversionCache, optional): Cache de conversões
+            instrumentation (Instrumentation, optional): Coletor que mede
+                cada etapa das conversões
+            limits (Limits, optional): Orçamento de recursos de cada
+                conversão; ultrapassá-lo levanta BudgetExceeded
+            fragment_cache (FragmentCache, optional): Cache em memória de
+                fragmentos; com ele, o documento é convertido em fragmentos
+                e os já vistos, neste ou em outros documentos, são
+                reaproveitados
+            rules (RuleSet, optional): Tabela de transformações; as regras
+                padrão quando omitida (veja htmltomd.parser.rules)
+            parse_filter (ParseFilter, optional): Elementos descartados já
+                no parsing, como script, style e comentários; sem ele, a
+                árvore é montada completa (veja htmltomd.parser.filters)
+
+        Raises:
+            ValueError: Se o emissor ou o backend forem inválidos
+        """
+        if emitter not in EMITTERS:
+            raise ValueError(f"Emissor desconhecido: {emitter!r}. Use um de {EMITTERS}")
+        self.emitter = emitter
+        self.backend = resolve_backend(backend)
+        self.cache = cache
+        self.instrumentation = instrumentation
+        self.limits = limits
+        self.fragment_cache = fragment_cache
+        self.rules = rules
+        self.parse_filter = parse_filter
+        self._local = threading.local()
+
+    @property
+    def options(self) -> Optional[dict]:
+        """
+        Opções efetivas da conversão, usadas também como chave do cache;
+        None quando a tabela de regras não tem chave estável, e então as
+        conversões não passam pelos caches.
+        """
+        options = {'pipeline': 'Converter', 'emitter': self.emitter, 'backend': self.backend}
+        if self.rules is not None:
+            if self.rules.key is None:
+                return None
+            options['rules'] = self.rules.key
+        if self.parse_filter is not None:
+            options['parse_filter'] = self.parse_filter.key
+        return options
+
+    def _emitter(self) -> MarkdownEmitter:
+        """Retorna o emissor nativo da thread atual."""
+        emitter = getattr(self._local, 'emitter', None)
+        if emitter is None:
+            emitter = self._local.emitter = MarkdownEmitter()
+        return emitter
+
+    def convert(self, html: str) -> str:
+        """
+        Converte HTML para Markdown aplicando todas as transformações.
+
+        Args:
+            html (str): Conteúdo HTML a ser convertido
+
+        Returns:
+            str: Conteúdo convertido para Markdown
+        """
+        options = self.options
+        if self.cache is not None and options is not None:
+            return self.cache.get_or_convert(html, options, lambda: self._convert(html))
+        return self._convert(html)
+
+    def convert_bytes(self, data: Buffer, encoding: Optional[str] = None) -> str:
+        """
+        Converte HTML recebido em bytes, detectando a codificação.
+
+        Args:
+            data (bytes): Documento; bytearray e memoryview são lidos sem cópia
+            encoding (str, optional): Codificação conhecida; detectada pelo
+                BOM, pelo <meta charset> ou pelo conteúdo quando omitida
+
+        Returns:
+            str: Conteúdo convertido para Markdown
+        """
+        if self.limits is not None:
+            self.limits.check_input(len(data))
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return self.convert(decode_html(data, encoding))
+        with instrumentation.document(size=len(data)):
+            with instrumentation.stage('decode'):
+                html = decode_html(data, encoding)
+            return self.convert(html)
+
+    def _convert(self, html: str) -> str:
+        if self.fragment_cache is not None:
+            return self._convert_fragments(html)
+        if self.instrumentation is not None or self.limits is not None:
+            return self._convert_staged(html)
+        soup = parse_html(html, self.backend, parse_filter=self.parse_filter)
+        soup = apply_transforms(soup, self.rules)
+        return clean_markdown(self._render(soup))
+
+    def _render(self, soup) -> str:
+        if self.emitter == 'native':
+            return self._emitter().emit(soup)
+        return render_markdown(soup, self.emitter)
+
+    def _convert_staged(self, html: str) -> str:
+        """
+        Executa _convert etapa por etapa, registrando as medições no coletor
+        e verificando o orçamento entre as etapas.
+        """
+        instrumentation = self.instrumentation
+        budget = None
+        if self.limits is not None:
+            self.limits.check_input(len(html))
+            budget = self.limits.start()
+
+        def checkpoint(stage: str) -> None:
+            if budget is not None:
+                budget.check_deadline(stage)
+
+        if instrumentation is None:
+            document, stage = nullcontext(), _untracked_stage
+        else:
+            document, stage = instrumentation.document(size=len(html)), instrumentation.stage
+
+        with document:
+            with stage('parse') as record:
+                soup = parse_html(html, self.backend, budget, self.parse_filter)
+            if instrumentation is not None:
+                record['nodes'] = count_nodes(soup)
+            checkpoint('transform')
+            with stage('transform') as record:
+                soup = apply_transforms(soup, self.rules)
+            if instrumentation is not None:
+                record['nodes'] = count_nodes(soup)
+            checkpoint('emit')
+            with stage('emit'):
+                markdown = self._render(soup)
+            checkpoint('clean')
+            with stage('clean'):
+                return clean_markdown(markdown)
+
+    def _convert_fragments(self, html: str) -> str:
+        """
+        Converte o documento fragmento por fragmento, pelo cache de fragmentos.
+
+        Como na conversão em fluxo, o resultado é igual ao da conversão do
+        documento inteiro, exceto por espaços em linhas vazias que o
+        html2text às vezes mantém entre blocos.
+        """
+        instrumentation = self.instrumentation
+        budget = None
+        if self.limits is not None:
+            self.limits.check_input(len(html))
+            budget = self.limits.start()
+
+        if instrumentation is None:
+            document, stage = nullcontext(), _untracked_stage
+        else:
+            document, stage = instrumentation.document(size=len(html)), instrumentation.stage
+
+        streaming = StreamingConverter(emitter=self.emitter, backend=self.backend,
+                                       fragment_cache=self.fragment_cache, rules=self.rules,
+                                       parse_filter=self.parse_filter)
+        with document:
+            with stage('split') as record:
+                splitter = new_splitter(fragment_cache=self.fragment_cache)
+                fragments = splitter.feed(html) + splitter.close()
+                record['fragments'] = len(fragments)
+            with stage('convert'):
+                blocks = []
+                for fragment in fragments:
+                    if budget is not None:
+                        budget.check_deadline('convert')
+                    blocks.append(streaming.convert_block(fragment, budget))
+            return join_blocks(blocks)
+
+    def convert_parallel(self, html: str, workers: Optional[int] = None,
+                         executor: Optional[Executor] = None) -> str:
+        """
+        Converte um documento grande em vários processos com as mesmas opções.
+        
+        Args:
+            html (str): Conteúdo HTML a ser convertido
+            workers (int, optional): Quantidade de processos
+            executor (Executor, optional): Pool já existente a reaproveitar
+            
+        Returns:
+            str: Conteúdo convertido para Markdown
+        """
+        return convert_parallel(html, workers, self.emitter, self.backend, executor=executor,
+                                rules=self.rules, parse_filter=self.parse_filter)
+    
+    def convert_incremental(self, html: str, previous_markdown: Optional[str] = None,
+                            sidecar: Optional[dict] = None) -> Tuple[str, dict]:
+        """
+        Converte de novo só as páginas que mudaram desde a conversão anterior.
+
+        Args:
+            html (str): Conteúdo HTML atual
+            previous_markdown (str, optional): Markdown da conversão anterior
+            sidecar (dict, optional): Sidecar devolvido pela conversão anterior
+
+        Returns:
+            Tuple[str, dict]: Markdown e o novo sidecar
+        """
+        return convert_incremental(html, previous_markdown, sidecar, self.emitter, self.backend,
+                                   self.rules, self.parse_filter)
+
+    def convert_stream(self, source: Union[TextIO, Iterable[str]],
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        """
+        Converte HTML para Markdown em fluxo com as mesmas opções.
+
+        Args:
+            source: Arquivo de texto (com ``read``) ou iterável de strings
+            chunk_size (int): Tamanho de cada leitura em caracteres
+
+        Yields:
+            str: Trechos de Markdown, na ordem do documento
+
+        Raises:
+            BudgetExceeded: Se a entrada ou o prazo ultrapassarem os limites;
+                nós e profundidade não são verificados em fluxo
+        """
+        streaming = StreamingConverter(emitter=self.emitter, backend=self.backend,
+                                       fragment_cache=self.fragment_cache, rules=self.rules,
+                                       parse_filter=self.parse_filter)
+        budget = self.limits.start() if self.limits is not None else None
+        size = 0
+        for chunk in iter_chunks(source, chunk_size):
+            if budget is not None:
+                size += len(chunk)
+                self.limits.check_input(size)
+                budget.check_deadline('stream')
+            yield from streaming.feed(chunk)
+        yield from streaming.close()
+    
+    def convert_to(self, source: Union[str, TextIO, Iterable[str]], target,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = 'utf-8') -> int:
+        """
+        Converte HTML gravando o Markdown no destino à medida que os blocos
+        são concluídos.
+
+        Nem a árvore do documento inteiro nem o Markdown completo ficam na
+        memória; o resultado é o mesmo de convert_stream.
+
+        Args:
+            source: Documento inteiro, arquivo de texto (com ``read``) ou
+                iterável de strings
+            target: Destino de texto ou de bytes: arquivo, socket,
+                io.BufferedWriter (veja htmltomd.output.open_sink)
+            chunk_size (int): Tamanho de cada leitura em caracteres
+            encoding (str): Codificação usada em destinos de bytes
+
+        Returns:
+            int: Quantidade de caracteres de Markdown gravados
+        """
+        if isinstance(source, str):
+            html = source
+            source = (html[i:i + chunk_size] for i in range(0, len(html), chunk_size))
+        return write_markdown(self.convert_stream(source, chunk_size), target, encoding)
+
+    def convert_pages(self, source: Union[TextIO, Iterable[str]],
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Page]:
+        """
+        Converte HTML para Markdown em fluxo, entregando uma página por vez.
+        
+        Args:
+            source: Arquivo de texto (com ``read``) ou iterável de strings
+            chunk_size (int): Tamanho de cada leitura em caracteres
+            
+        Yields:
+            Page: Pares (rótulo, Markdown), na ordem do documento
+        """
+        splitter = PageSplitter()
+        for piece in self.convert_stream(source, chunk_size):
+            yield from splitter.feed(piece)
+        yield from splitter.close()
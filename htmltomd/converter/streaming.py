@@ -0,0 +1,223 @@
+"""
+Conversão em fluxo
+
+Este módulo converte HTML para Markdown lendo a entrada em pedaços e
+entregando o Markdown de cada bloco assim que ele é fechado, com consumo
+de memória limitado pelo maior bloco do documento.
+"""
+
+from typing import Iterable, Iterator, List, Optional, Union, TextIO
+
+from htmltomd.output import atomic_writer
+from htmltomd.parser import parse_html, apply_transforms, resolve_backend
+from htmltomd.parser.block_splitter import BlockSplitter
+from .md_converter import render_markdown, clean_markdown, EMITTERS
+
+# Tamanho padrão dos pedaços lidos da entrada
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Tamanho mínimo dos blocos convertidos de uma vez
+DEFAULT_BLOCK_SIZE = 32 * 1024
+
+# Com cache de fragmentos, em média um bloco a cada FRAGMENT_ANCHOR_DIVISOR
+# pode encerrar um fragmento
+FRAGMENT_ANCHOR_DIVISOR = 4
+
+class StreamingConverter:
+    """
+    Conversor incremental de HTML para Markdown.
+    
+    Recebe o HTML em pedaços com ``feed`` e devolve os trechos de Markdown
+    já concluídos. A concatenação de todos os trechos devolvidos por ``feed``
+    e ``close`` é o documento Markdown completo.
+    
+    O Markdown de cada bloco fica retido até o bloco seguinte ser concluído,
+    para que os espaços no final do documento possam ser removidos. O
+    resultado é igual ao da conversão do documento inteiro, exceto por
+    espaços em linhas vazias entre blocos, que o html2text às vezes mantém.
+
+    Com um FragmentCache, os grupos de blocos são cortados pelo conteúdo, no
+    tamanho definido pelo cache, e o Markdown de cada grupo já visto é
+    reaproveitado em vez de convertido.
+    """
+    
+    def __init__(self, emitter: str = 'html2text', backend: str = 'html.parser',
+                 block_size: int = DEFAULT_BLOCK_SIZE, fragment_cache=None, rules=None,
+                 parse_filter=None):
+        """
+        Args:
+            emitter (str): Emissor de Markdown ('html2text' ou 'native')
+            backend (str): Backend de parsing usado em cada bloco
+                ('html.parser', 'lxml', 'html5lib' ou 'auto')
+            block_size (int): Tamanho mínimo, em caracteres, de cada grupo
+                de blocos convertido de uma vez; ignorado com fragment_cache
+            fragment_cache (FragmentCache, optional): Cache de fragmentos
+            rules (RuleSet, optional): Tabela de transformações; as regras
+                padrão quando omitida
+            parse_filter (ParseFilter, optional): Elementos descartados já
+                no parsing; None monta a árvore completa
+
+        Raises:
+            ValueError: Se o emissor ou o backend forem inválidos
+        """
+        if emitter not in EMITTERS:
+            raise ValueError(f"Emissor desconhecido: {emitter!r}. Use um de {EMITTERS}")
+        self.emitter = emitter
+        self.backend = resolve_backend(backend)
+        self.fragment_cache = fragment_cache
+        self.rules = rules
+        self.parse_filter = parse_filter
+        self._splitter = new_splitter(block_size, fragment_cache)
+        self._pending = None
+    
+    def feed(self, html: str) -> List[str]:
+        """
+        Alimenta o conversor com mais um pedaço de HTML.
+        
+        Args:
+            html (str): Pedaço de HTML
+            
+        Returns:
+            List[str]: Trechos de Markdown dos blocos concluídos
+        """
+        return self._convert_blocks(self._splitter.feed(html))
+    
+    def close(self) -> List[str]:
+        """
+        Finaliza a conversão.
+        
+        Returns:
+            List[str]: Trechos de Markdown dos últimos blocos
+        """
+        pieces = self._convert_blocks(self._splitter.close())
+        if self._pending is not None:
+            pieces.append(self._pending.rstrip())
+            self._pending = None
+        return pieces
+    
+    @property
+    def options(self) -> Optional[dict]:
+        """
+        Opções efetivas da conversão, usadas como chave do cache de
+        fragmentos; None quando a tabela de regras não tem chave estável.
+        """
+        options = {'pipeline': 'fragment', 'emitter': self.emitter, 'backend': self.backend}
+        if self.rules is not None:
+            if self.rules.key is None:
+                return None
+            options['rules'] = self.rules.key
+        if self.parse_filter is not None:
+            options['parse_filter'] = self.parse_filter.key
+        return options
+
+    def convert_block(self, block: str, budget=None) -> str:
+        """
+        Converte um bloco de HTML aplicando todas as transformações.
+        
+        Args:
+            block (str): Bloco de HTML autossuficiente
+            budget (Budget, optional): Orçamento verificado no parsing; os
+                contêineres reabertos no início do bloco também contam
+            
+        Returns:
+            str: Markdown do bloco, sem as quebras de linha das bordas
+        """
+        options = self.options
+        if self.fragment_cache is not None and options is not None:
+            return self.fragment_cache.get_or_convert(
+                block, options, lambda: self._convert_block(block, budget))
+        return self._convert_block(block, budget)
+
+    def _convert_block(self, block: str, budget=None) -> str:
+        soup = parse_html(block, self.backend, budget, self.parse_filter)
+        soup = apply_transforms(soup, self.rules)
+        markdown = clean_markdown(render_markdown(soup, self.emitter), strip=False)
+        return markdown.strip('\n')
+    
+    def _convert_blocks(self, blocks: List[str]) -> List[str]:
+        pieces = []
+        for block in blocks:
+            markdown = self.convert_block(block)
+            if not markdown.strip():
+                continue
+            if self._pending is None:
+                # Início do documento
+                self._pending = markdown.lstrip()
+                continue
+            # Blocos são separados por uma linha em branco
+            pieces.append(self._pending)
+            self._pending = '\n\n' + markdown
+        return pieces
+
+def new_splitter(block_size: int = DEFAULT_BLOCK_SIZE, fragment_cache=None) -> BlockSplitter:
+    """
+    Cria o divisor de blocos adequado ao cache de fragmentos.
+
+    Args:
+        block_size (int): Tamanho mínimo de cada grupo sem cache
+        fragment_cache (FragmentCache, optional): Cache de fragmentos; com
+            ele, os grupos têm o tamanho do cache e são cortados pelo conteúdo
+
+    Returns:
+        BlockSplitter: Divisor pronto para receber o documento
+    """
+    if fragment_cache is None:
+        return BlockSplitter(min_size=block_size)
+    return BlockSplitter(min_size=fragment_cache.block_size, anchor_divisor=FRAGMENT_ANCHOR_DIVISOR)
+
+def iter_chunks(source: Union[TextIO, Iterable[str]], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Lê a entrada em pedaços.
+    
+    Args:
+        source: Arquivo de texto (com ``read``) ou iterável de strings
+        chunk_size (int): Tamanho de cada leitura em caracteres
+        
+    Yields:
+        str: Pedaços da entrada
+    """
+    if hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        yield from source
+
+def convert_stream(source: Union[TextIO, Iterable[str]], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   emitter: str = 'html2text', backend: str = 'html.parser') -> Iterator[str]:
+    """
+    Converte HTML para Markdown em fluxo.
+    
+    Args:
+        source: Arquivo de texto (com ``read``) ou iterável de strings
+        chunk_size (int): Tamanho de cada leitura em caracteres
+        emitter (str): Emissor de Markdown ('html2text' ou 'native')
+        backend (str): Backend de parsing usado em cada bloco
+        
+    Yields:
+        str: Trechos de Markdown, na ordem do documento
+    """
+    converter = StreamingConverter(emitter=emitter, backend=backend)
+    for chunk in iter_chunks(source, chunk_size):
+        yield from converter.feed(chunk)
+    yield from converter.close()
+
+def convert_file_stream(input_file: str, output_file: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        emitter: str = 'html2text', backend: str = 'html.parser') -> None:
+    """
+    Converte um arquivo HTML para Markdown sem carregá-lo inteiro na memória.
+    
+    O arquivo de saída só é substituído quando a conversão termina.
+    
+    Args:
+        input_file (str): Caminho do arquivo HTML de entrada
+        output_file (str): Caminho do arquivo Markdown de saída
+        chunk_size (int): Tamanho de cada leitura em caracteres
+        emitter (str): Emissor de Markdown ('html2text' ou 'native')
+        backend (str): Backend de parsing usado em cada bloco
+    """
+    with open(input_file, 'r', encoding='utf-8') as source, atomic_writer(output_file) as target:
+        for piece in convert_stream(source, chunk_size, emitter, backend):
+            target.write(piece)
@@ -0,0 +1,125 @@
+"""
+Detecção da codificação de documentos HTML
+
+Este módulo descobre a codificação de um HTML recebido em bytes sem
+tentativas de decodificação: primeiro pelo BOM, depois pela declaração
+``<meta charset>`` nos primeiros kilobytes e, por fim, verificando se o
+trecho em torno do primeiro byte não ASCII é UTF-8 válido, com
+Windows-1252 como alternativa para as exportações antigas. O documento é
+então decodificado uma única vez.
+
+Não depende do BeautifulSoup, para poder ser usado pela linha de comando e
+pelos scripts sem o custo de importação do parser.
+"""
+
+import codecs
+import re
+from typing import Optional, Union
+
+# Bytes inspecionados em busca da declaração <meta charset>
+SNIFF_SIZE = 4096
+
+# Bytes verificados como UTF-8 a partir do primeiro byte não ASCII
+UTF8_CHECK_SIZE = 4096
+
+# Codificação usada quando nada é declarado e o conteúdo não é UTF-8
+FALLBACK_ENCODING = 'windows-1252'
+
+# Marcas de ordem de bytes; UTF-32 antes de UTF-16, que é seu prefixo
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# <meta charset="x"> e <meta http-equiv="Content-Type" content="...; charset=x">
+META_CHARSET = re.compile(rb'<meta\b[^>]*?charset\s*=\s*["\']?\s*([A-Za-z0-9_.:+-]+)', re.IGNORECASE)
+
+# Como no padrão de codificação do WHATWG, seguido pelos navegadores,
+# documentos declarados como Latin-1 ou ASCII são lidos como Windows-1252:
+# as exportações antigas declaram iso-8859-1 e usam aspas curvas e
+# travessões da faixa 0x80-0x9F
+WHATWG_ALIASES = {'iso8859-1': 'cp1252', 'ascii': 'cp1252'}
+
+NON_ASCII = re.compile(rb'[\x80-\xff]')
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+def _lookup(label: Union[bytes, str]) -> Optional[str]:
+    """Nome canônico da codificação, ou None se ela for desconhecida."""
+    if isinstance(label, bytes):
+        label = label.decode('ascii')
+    try:
+        name = codecs.lookup(label).name
+    except LookupError:
+        return None
+    # Uma declaração lida como ASCII não pode ser de UTF-16/32
+    if name.startswith(('utf-16', 'utf-32')):
+        return 'utf-8'
+    return WHATWG_ALIASES.get(name, name)
+
+def _is_utf8(data: Buffer) -> bool:
+    """Verifica se o trecho em torno do primeiro byte não ASCII é UTF-8."""
+    match = NON_ASCII.search(data)
+    if match is None:
+        return True
+    start = match.start()
+    window = memoryview(data)[start:start + UTF8_CHECK_SIZE]
+    try:
+        # Tolera uma sequência cortada no fim da janela, mas não no fim do documento
+        codecs.getincrementaldecoder('utf-8')().decode(window, final=start + len(window) >= len(data))
+    except UnicodeDecodeError:
+        return False
+    return True
+
+def sniff_encoding(data: Buffer, fallback: str = FALLBACK_ENCODING) -> str:
+    """
+    Detecta a codificação de um documento HTML.
+
+    Além da busca pelo primeiro byte não ASCII, que roda em C, só os
+    primeiros kilobytes do documento são inspecionados.
+
+    Args:
+        data (bytes): Documento ou seu início
+        fallback (str): Codificação usada quando nada é declarado e o
+            conteúdo não é UTF-8
+
+    Returns:
+        str: Nome da codificação, pronto para ``codecs``
+    """
+    head = bytes(memoryview(data)[:SNIFF_SIZE])
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+    match = META_CHARSET.search(head)
+    if match is not None:
+        encoding = _lookup(match.group(1))
+        if encoding is not None:
+            return encoding
+    return 'utf-8' if _is_utf8(data) else fallback
+
+def decode_html(data: Buffer, encoding: Optional[str] = None,
+                fallback: str = FALLBACK_ENCODING) -> str:
+    """
+    Decodifica um documento HTML em uma única passada.
+
+    Bytes inválidos para a codificação escolhida viram U+FFFD em vez de
+    provocar uma nova tentativa.
+
+    Args:
+        data (bytes): Documento; bytearray e memoryview são lidos sem cópia
+        encoding (str, optional): Codificação conhecida; detectada com
+            sniff_encoding() quando omitida
+        fallback (str): Codificação usada quando nada é declarado e o
+            conteúdo não é UTF-8
+
+    Returns:
+        str: Documento decodificado
+    """
+    if encoding is None:
+        encoding = sniff_encoding(data, fallback)
+    elif codecs.lookup(encoding).name == 'utf-8' and bytes(memoryview(data)[:3]) == codecs.BOM_UTF8:
+        encoding = 'utf-8-sig'
+    return codecs.decode(data, encoding, 'replace')
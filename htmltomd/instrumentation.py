@@ -0,0 +1,201 @@
+"""
+Instrumentação do pipeline de conversão
+
+Este módulo registra, para cada documento convertido, o tempo de relógio,
+o tempo de CPU, a quantidade de nós da árvore e, opcionalmente, o pico de
+memória alocada (via tracemalloc) de cada etapa do pipeline. Os registros
+podem ser exportados como dicionário ou JSON para planejamento de
+capacidade e para descobrir em que etapa um documento lento gasta tempo.
+
+Quando nenhum coletor é configurado, o pipeline não faz nenhuma medição.
+
+Uso:
+    instrumentation = Instrumentation(memory=True)
+    converter = Converter(instrumentation=instrumentation)
+    converter.convert(html)
+    print(instrumentation.to_json(indent=2))
+"""
+
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+def count_nodes(soup) -> int:
+    """
+    Conta os nós (tags, textos e comentários) de uma árvore BeautifulSoup.
+
+    Args:
+        soup (BeautifulSoup): Árvore a ser contada
+
+    Returns:
+        int: Quantidade de descendentes
+    """
+    return sum(1 for _ in soup.descendants)
+
+class Instrumentation:
+    """
+    Coletor de medições por documento e por etapa.
+
+    A mesma instância pode ser usada por várias threads; cada thread tem o
+    seu documento aberto. O tempo de CPU é o da thread que executou a etapa.
+    O tracemalloc é global ao processo, então os picos de memória só são
+    exatos quando um documento é convertido por vez.
+    """
+
+    def __init__(self, memory: bool = False,
+                 callback: Optional[Callable[[dict], None]] = None):
+        """
+        Args:
+            memory (bool): Mede o pico de memória de cada etapa com o
+                tracemalloc, que torna a conversão bem mais lenta
+            callback (Callable[[dict], None], optional): Chamado com o
+                registro de cada documento assim que ele termina
+        """
+        self.memory = memory
+        self.callback = callback
+        self.documents: List[dict] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._tracing = 0
+        self._owns_tracing = False
+
+    def _start_tracing(self) -> None:
+        """Liga o tracemalloc no primeiro documento aberto, se necessário."""
+        with self._lock:
+            if self._tracing == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owns_tracing = True
+            self._tracing += 1
+
+    def _stop_tracing(self) -> None:
+        """Desliga o tracemalloc ligado por este coletor no último documento."""
+        with self._lock:
+            self._tracing -= 1
+            if self._tracing == 0 and self._owns_tracing:
+                tracemalloc.stop()
+                self._owns_tracing = False
+
+    @contextmanager
+    def document(self, name: Optional[str] = None, size: Optional[int] = None) -> Iterator[dict]:
+        """
+        Abre o registro de um documento na thread atual.
+
+        Se um documento já estiver aberto na thread, o mesmo registro é
+        reaproveitado; assim quem chama o conversor pode nomear o documento
+        e agrupar etapas próprias, como a leitura do arquivo.
+
+        Args:
+            name (str, optional): Identificação do documento
+            size (int, optional): Tamanho da entrada
+
+        Yields:
+            dict: Registro do documento
+        """
+        record = getattr(self._local, 'record', None)
+        if record is not None:
+            if name is not None and record['name'] is None:
+                record['name'] = name
+            if size is not None and record['size'] is None:
+                record['size'] = size
+            yield record
+            return
+
+        record = self._local.record = {'name': name, 'size': size, 'stages': []}
+        if self.memory:
+            self._start_tracing()
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield record
+        finally:
+            record['wall'] = time.perf_counter() - wall
+            record['cpu'] = time.thread_time() - cpu
+            if self.memory:
+                self._stop_tracing()
+            self._local.record = None
+            with self._lock:
+                self.documents.append(record)
+            if self.callback is not None:
+                self.callback(record)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[dict]:
+        """
+        Mede uma etapa do documento aberto na thread atual.
+
+        Args:
+            name (str): Nome da etapa
+
+        Yields:
+            dict: Registro da etapa, onde quem chama pode incluir a
+                quantidade de nós ('nodes')
+        """
+        with self.document() as record:
+            stage = {'stage': name}
+            measure_memory = self.memory and tracemalloc.is_tracing()
+            if measure_memory:
+                # reset_peak só existe a partir do Python 3.9
+                reset_peak = getattr(tracemalloc, 'reset_peak', None)
+                if reset_peak is not None:
+                    reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+            wall, cpu = time.perf_counter(), time.thread_time()
+            try:
+                yield stage
+            finally:
+                stage['wall'] = time.perf_counter() - wall
+                stage['cpu'] = time.thread_time() - cpu
+                if measure_memory:
+                    stage['memory_peak'] = max(0, tracemalloc.get_traced_memory()[1] - base)
+                record['stages'].append(stage)
+
+    def summary(self) -> Dict[str, dict]:
+        """
+        Soma as medições de cada etapa em todos os documentos.
+
+        Returns:
+            Dict[str, dict]: Por etapa, a quantidade de execuções, os tempos
+                totais e o maior pico de memória
+        """
+        totals: Dict[str, dict] = {}
+        with self._lock:
+            documents = list(self.documents)
+        for record in documents:
+            for stage in record['stages']:
+                total = totals.setdefault(stage['stage'], {'count': 0, 'wall': 0.0, 'cpu': 0.0})
+                total['count'] += 1
+                total['wall'] += stage['wall']
+                total['cpu'] += stage['cpu']
+                if 'memory_peak' in stage:
+                    total['memory_peak'] = max(total.get('memory_peak', 0), stage['memory_peak'])
+        return totals
+
+    def to_dict(self) -> dict:
+        """
+        Exporta os registros.
+
+        Returns:
+            dict: {'documents': [...], 'summary': {...}}
+        """
+        with self._lock:
+            documents = list(self.documents)
+        return {'documents': documents, 'summary': self.summary()}
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        """
+        Exporta os registros como JSON.
+
+        Args:
+            indent (int, optional): Indentação do JSON
+
+        Returns:
+            str: Registros no formato de to_dict()
+        """
+        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+
+    def clear(self) -> None:
+        """Descarta os registros coletados."""
+        with self._lock:
+            self.documents.clear()
@@ -0,0 +1,252 @@
+"""
+Limites de recursos por conversão
+
+Este módulo define orçamentos de tamanho da entrada, quantidade de nós,
+profundidade de aninhamento e tempo de relógio para cada conversão. Os
+limites de nós e de profundidade são verificados durante o parsing, para
+que um documento hostil seja abandonado antes de a árvore inteira ser
+construída; o prazo é verificado periodicamente durante o parsing e entre
+as etapas do pipeline.
+
+Nos mesmos pontos em que o prazo é verificado, uma conversão executada
+dentro de ``cancellation(event)`` é interrompida quando o evento é ativado.
+
+Uso:
+    converter = Converter(limits=Limits(max_nodes=500_000, timeout=30))
+    try:
+        markdown = converter.convert(html)
+    except BudgetExceeded as e:
+        print(e.budget)  # 'max_input_bytes', 'max_nodes', 'max_depth' ou 'timeout'
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# Nós parseados entre duas verificações do prazo
+DEADLINE_CHECK_INTERVAL = 1024
+
+# Evento de cancelamento da conversão em andamento em cada thread
+_local = threading.local()
+
+class BudgetExceeded(RuntimeError):
+    """
+    Uma conversão ultrapassou um dos limites configurados.
+
+    Attributes:
+        budget (str): Limite atingido: 'max_input_bytes', 'max_nodes',
+            'max_depth' ou 'timeout'
+        limit: Valor configurado do limite
+        stage (str): Etapa do pipeline em que o limite foi atingido
+    """
+
+    MESSAGES = {
+        'max_input_bytes': "Entrada maior que {limit} bytes",
+        'max_nodes': "Documento com mais de {limit} nós",
+        'max_depth': "Documento com aninhamento maior que {limit} níveis",
+        'timeout': "Conversão excedeu o prazo de {limit} segundos",
+    }
+
+    def __init__(self, budget: str, limit, stage: Optional[str] = None):
+        message = self.MESSAGES[budget].format(limit=limit)
+        if stage is not None:
+            message += f" (etapa {stage})"
+        super().__init__(message)
+        self.budget = budget
+        self.limit = limit
+        self.stage = stage
+
+    def __reduce__(self):
+        # Preserva os atributos ao voltar de um pool de processos
+        return (type(self), (self.budget, self.limit, self.stage))
+
+class ConversionCancelled(RuntimeError):
+    """
+    Uma conversão foi cancelada por quem a pediu.
+
+    Attributes:
+        stage (str): Etapa do pipeline em que o cancelamento foi percebido
+    """
+
+    def __init__(self, stage: Optional[str] = None):
+        message = "Conversão cancelada"
+        if stage is not None:
+            message += f" (etapa {stage})"
+        super().__init__(message)
+        self.stage = stage
+
+    def __reduce__(self):
+        return (type(self), (self.stage,))
+
+@contextmanager
+def cancellation(event: threading.Event) -> Iterator[None]:
+    """
+    Associa um evento de cancelamento às conversões da thread atual.
+
+    Os orçamentos criados dentro do bloco passam a verificar o evento junto
+    com o prazo; só conversões com limites têm esses pontos de verificação.
+
+    Args:
+        event (threading.Event): Ativado para interromper a conversão
+    """
+    previous = getattr(_local, 'event', None)
+    _local.event = event
+    try:
+        yield
+    finally:
+        _local.event = previous
+
+class Limits:
+    """
+    Orçamentos de recursos aplicados a cada conversão.
+
+    Os limites omitidos não são verificados. A instância é imutável na
+    prática e pode ser compartilhada entre threads; o acompanhamento de
+    cada conversão é feito por um Budget criado com start().
+    """
+
+    def __init__(self, max_input_bytes: Optional[int] = None, max_nodes: Optional[int] = None,
+                 max_depth: Optional[int] = None, timeout: Optional[float] = None):
+        """
+        Args:
+            max_input_bytes (int, optional): Tamanho máximo da entrada; para
+                texto já decodificado, conta caracteres
+            max_nodes (int, optional): Quantidade máxima de nós parseados
+            max_depth (int, optional): Profundidade máxima de aninhamento
+            timeout (float, optional): Prazo de cada conversão, em segundos
+        """
+        self.max_input_bytes = max_input_bytes
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.timeout = timeout
+
+    def as_dict(self) -> dict:
+        """Limites configurados, para exibição e métricas."""
+        return {
+            'max_input_bytes': self.max_input_bytes, 'max_nodes': self.max_nodes,
+            'max_depth': self.max_depth, 'timeout': self.timeout,
+        }
+
+    def check_input(self, size: int) -> None:
+        """
+        Verifica o tamanho da entrada.
+
+        Args:
+            size (int): Tamanho da entrada
+
+        Raises:
+            BudgetExceeded: Se a entrada for maior que max_input_bytes
+        """
+        if self.max_input_bytes is not None and size > self.max_input_bytes:
+            raise BudgetExceeded('max_input_bytes', self.max_input_bytes, 'input')
+
+    def start(self) -> 'Budget':
+        """
+        Inicia o acompanhamento de uma conversão, disparando o prazo.
+
+        Returns:
+            Budget: Orçamento da conversão
+        """
+        return Budget(self)
+
+class Budget:
+    """Orçamento de uma única conversão em andamento."""
+
+    def __init__(self, limits: Limits):
+        self.limits = limits
+        self.deadline = None
+        if limits.timeout is not None:
+            self.deadline = time.monotonic() + limits.timeout
+        self.nodes = 0
+        self._next_deadline_check = DEADLINE_CHECK_INTERVAL
+        # Evento de cancelamento (veja cancellation)
+        self.cancelled: Optional[threading.Event] = getattr(_local, 'event', None)
+
+    def check_deadline(self, stage: Optional[str] = None) -> None:
+        """
+        Verifica o prazo e o cancelamento; chamado entre as etapas do pipeline.
+
+        Args:
+            stage (str, optional): Etapa em andamento, para a mensagem
+
+        Raises:
+            BudgetExceeded: Se o prazo tiver passado
+            ConversionCancelled: Se a conversão tiver sido cancelada
+        """
+        if self.cancelled is not None and self.cancelled.is_set():
+            raise ConversionCancelled(stage)
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise BudgetExceeded('timeout', self.limits.timeout, stage)
+
+    def add_node(self, depth: Optional[int] = None) -> None:
+        """
+        Contabiliza um nó parseado; chamado pelo parser.
+
+        Args:
+            depth (int, optional): Profundidade do nó, quando é uma tag
+
+        Raises:
+            BudgetExceeded: Se algum limite for ultrapassado
+        """
+        self.nodes += 1
+        limits = self.limits
+        if limits.max_nodes is not None and self.nodes > limits.max_nodes:
+            raise BudgetExceeded('max_nodes', limits.max_nodes, 'parse')
+        if depth is not None and limits.max_depth is not None and depth > limits.max_depth:
+            raise BudgetExceeded('max_depth', limits.max_depth, 'parse')
+        if self.nodes >= self._next_deadline_check:
+            self._next_deadline_check += DEADLINE_CHECK_INTERVAL
+            self.check_deadline('parse')
+
+    def check_tree(self, soup) -> None:
+        """
+        Verifica nós e profundidade de uma árvore já construída.
+
+        Usado com os backends que não passam pelos ganchos de parsing, como
+        o html5lib.
+
+        Args:
+            soup (BeautifulSoup): Árvore a verificar
+
+        Raises:
+            BudgetExceeded: Se algum limite for ultrapassado
+        """
+        stack = [(child, 1) for child in soup.contents]
+        while stack:
+            node, depth = stack.pop()
+            children = getattr(node, 'contents', None)
+            self.add_node(depth if children is not None else None)
+            if children:
+                stack.extend((child, depth + 1) for child in children)
+
+def add_limit_arguments(parser) -> None:
+    """
+    Inclui as opções de limites em um parser de linha de comando.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser a completar
+    """
+    parser.add_argument('--max-input-bytes', type=int, default=None,
+                        help="Tamanho máximo de cada entrada, em bytes")
+    parser.add_argument('--max-nodes', type=int, default=None,
+                        help="Quantidade máxima de nós parseados por documento")
+    parser.add_argument('--max-depth', type=int, default=None,
+                        help="Profundidade máxima de aninhamento")
+    parser.add_argument('--timeout', type=float, default=None,
+                        help="Prazo de cada conversão, em segundos")
+
+def limits_from_args(args) -> Optional[Limits]:
+    """
+    Monta os limites a partir das opções de add_limit_arguments().
+
+    Args:
+        args (argparse.Namespace): Argumentos processados
+
+    Returns:
+        Optional[Limits]: Limites, ou None se nenhum foi informado
+    """
+    limits = Limits(args.max_input_bytes, args.max_nodes, args.max_depth, args.timeout)
+    if all(value is None for value in limits.as_dict().values()):
+        return None
+    return limits
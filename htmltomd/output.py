@@ -0,0 +1,133 @@
+"""
+Gravação do Markdown em destinos arbitrários
+
+Este módulo grava o Markdown à medida que os blocos são concluídos, em
+qualquer destino de texto ou de bytes (arquivo, socket, io.BufferedWriter),
+sem montar o documento inteiro em uma única string. Para arquivos em disco,
+atomic_writer grava em um arquivo temporário no mesmo diretório e o renomeia
+só quando a gravação termina, de modo que uma conversão interrompida nunca
+deixa uma saída pela metade.
+
+Não depende do BeautifulSoup, para poder ser usado pela linha de comando e
+pelos scripts sem o custo de importação do parser.
+"""
+
+import codecs
+import io
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Iterable, Iterator, TextIO
+
+class _EncodedSink:
+    """Adapta um destino de bytes para receber texto."""
+
+    def __init__(self, target, encoding: str, errors: str):
+        # Sockets não têm write, só sendall
+        self._write = getattr(target, 'write', None) or target.sendall
+        self._flush = getattr(target, 'flush', None)
+        self._encoder = codecs.getincrementalencoder(encoding)(errors)
+
+    def write(self, text: str) -> int:
+        data = self._encoder.encode(text)
+        if data:
+            self._write(data)
+        return len(text)
+
+    def flush(self) -> None:
+        data = self._encoder.encode('', final=True)
+        if data:
+            self._write(data)
+        if self._flush is not None:
+            self._flush()
+
+def _is_text(target) -> bool:
+    return isinstance(target, io.TextIOBase) or hasattr(target, 'encoding')
+
+def open_sink(target, encoding: str = 'utf-8', errors: str = 'strict'):
+    """
+    Prepara um destino para receber o Markdown em pedaços de texto.
+
+    Destinos de texto são usados como estão; destinos de bytes (arquivos
+    binários, io.BufferedWriter, sockets) recebem o texto codificado de
+    forma incremental, sem que o destino seja fechado ou desanexado depois.
+
+    Args:
+        target: Objeto com ``write`` (texto ou bytes) ou socket com ``sendall``
+        encoding (str): Codificação usada em destinos de bytes
+        errors (str): Tratamento de caracteres que não podem ser codificados
+
+    Returns:
+        Objeto com ``write(str)`` e ``flush()``
+    """
+    if _is_text(target):
+        return target
+    return _EncodedSink(target, encoding, errors)
+
+def write_markdown(pieces: Iterable[str], target, encoding: str = 'utf-8') -> int:
+    """
+    Grava os trechos de Markdown no destino à medida que são produzidos.
+
+    Args:
+        pieces (Iterable[str]): Trechos de Markdown, na ordem do documento
+        target: Destino de texto ou de bytes (veja open_sink)
+        encoding (str): Codificação usada em destinos de bytes
+
+    Returns:
+        int: Quantidade de caracteres gravados
+    """
+    sink = open_sink(target, encoding)
+    written = 0
+    for piece in pieces:
+        sink.write(piece)
+        written += len(piece)
+    sink.flush()
+    return written
+
+@contextmanager
+def atomic_writer(path: str, encoding: str = 'utf-8', newline=None) -> Iterator[TextIO]:
+    """
+    Abre um arquivo de texto que só substitui o destino ao final da gravação.
+
+    O conteúdo é gravado em um arquivo temporário no mesmo diretório e
+    renomeado com os.replace quando o bloco termina sem erro; em caso de
+    erro, o temporário é removido e o destino anterior, se houver, fica
+    intacto.
+
+    Args:
+        path (str): Caminho final do arquivo
+        encoding (str): Codificação do arquivo
+        newline (str, optional): Tradução de quebras de linha, como em open()
+
+    Yields:
+        TextIO: Arquivo temporário aberto para escrita
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f'.{name}.', suffix='.tmp', dir=directory)
+    try:
+        with open(fd, 'w', encoding=encoding, newline=newline) as f:
+            yield f
+        # mkstemp cria o arquivo só com permissão para o dono
+        os.chmod(temp_path, _file_mode(path))
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+def _umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+# Lida uma única vez: trocar a umask não é seguro entre threads
+_UMASK = _umask()
+
+def _file_mode(path: str) -> int:
+    """Permissões do arquivo substituído, ou as que open() daria a um novo."""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except OSError:
+        return 0o666 & ~_UMASK
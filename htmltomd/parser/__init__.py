@@ -4,6 +4,18 @@ Módulo de parsing HTML
 Este módulo é responsável por analisar o HTML e aplicar transformações iniciais.
 """
 
-from .html_parser import parse_html, mark_page_breaks, remove_media, process_links
+from .html_parser import (
+    parse_html, mark_page_breaks, remove_media, process_links, process_headers,
+    apply_transforms, available_backends, resolve_backend, BACKENDS
+)
+from .filters import ParseFilter, FilteringSoup, DEFAULT_DROP_TAGS
+from .index import IndexedSoup, TagIndex
+from .rules import Rule, RuleSet, DEFAULT_RULES, PAGE_MARKER, DROP, TEXT, HEADER, UNWRAP
 
-__all__ = ['parse_html', 'mark_page_breaks', 'remove_media', 'process_links']
\ No newline at end of file
+__all__ = [
+    'parse_html', 'mark_page_breaks', 'remove_media', 'process_links',
+    'process_headers', 'apply_transforms', 'available_backends',
+    'resolve_backend', 'BACKENDS', 'Rule', 'RuleSet', 'DEFAULT_RULES',
+    'PAGE_MARKER', 'DROP', 'TEXT', 'HEADER', 'UNWRAP', 'IndexedSoup', 'TagIndex',
+    'ParseFilter', 'FilteringSoup', 'DEFAULT_DROP_TAGS'
+]
@@ -0,0 +1,270 @@
+"""
+Divisor de blocos HTML
+
+Este módulo tokeniza o HTML de forma incremental e o divide em blocos
+independentes, que podem ser convertidos um de cada vez sem manter o
+documento inteiro em memória.
+"""
+
+import zlib
+from html.parser import HTMLParser
+from typing import List, Optional
+
+# Contêineres que apenas agrupam blocos; o documento é cortado dentro deles
+CONTAINER_TAGS = frozenset([
+    'html', 'body', 'div', 'section', 'article', 'main', 'header', 'footer',
+    'nav', 'aside',
+])
+
+# Contêineres que o html2text trata como quebra de parágrafo
+BREAKING_CONTAINER_TAGS = frozenset(['html', 'body', 'div'])
+
+# Blocos que terminam com quebra de parágrafo no Markdown
+BLOCK_TAGS = frozenset([
+    'head', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre',
+    'ul', 'ol', 'dl', 'hr',
+])
+
+# Com cortes por conteúdo, um grupo nunca passa de min_size vezes este fator
+ANCHOR_MAX_FACTOR = 4
+
+# Tamanho, em caracteres, a partir do qual um bloco sem limite de bloco
+# (um <span> ou <p> que nunca fecha) é cortado mesmo assim
+MAX_BLOCK_SIZE = 1024 * 1024
+
+# Elementos sem tag de fechamento
+VOID_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr',
+])
+
+
+def _has_class(attrs: list, class_name: str) -> bool:
+    """Verifica se os atributos de uma tag incluem a classe informada."""
+    for name, value in attrs:
+        if name == 'class' and value and class_name in value.split():
+            return True
+    return False
+
+
+class BlockSplitter(HTMLParser):
+    """
+    Tokenizador incremental que entrega o HTML em blocos completos.
+
+    Cada bloco é um trecho de HTML autossuficiente: os contêineres abertos
+    no momento do corte (div, section, body...) são reabertos no início do
+    bloco e fechados no final, de modo que as transformações vejam os mesmos
+    ancestrais que veriam no documento inteiro. O consumo de memória depende
+    do maior bloco, não do tamanho do documento.
+    
+    Blocos consecutivos são agrupados até somarem ``min_size`` caracteres,
+    para reduzir o custo fixo de converter trechos muito pequenos. Com
+    ``anchor_divisor``, o grupo só é fechado depois de um bloco cujo hash
+    seja múltiplo do divisor (ou ao atingir ANCHOR_MAX_FACTOR vezes
+    ``min_size``): os cortes passam a depender do conteúdo e não da posição,
+    e trechos iguais em documentos diferentes geram os mesmos grupos.
+
+    Um trecho sem limite de bloco, como o conteúdo de uma tag inline aberta
+    no nível do documento e nunca fechada, é cortado na primeira tag depois
+    de ``max_size`` caracteres: as tags abertas são fechadas no fim do
+    bloco e reabertas no início do seguinte. Nesse corte o Markdown pode
+    ganhar uma quebra de parágrafo que o documento inteiro não teria; um
+    texto corrido sem nenhuma tag continua inteiro em um só bloco.
+
+    Uso:
+        splitter = BlockSplitter()
+        for chunk in chunks:
+            for block in splitter.feed(chunk):
+                ...
+        for block in splitter.close():
+            ...
+    """
+
+    def __init__(self, min_size: int = 0, atomic_class: str = 'p-Pagina',
+                 anchor_divisor: Optional[int] = None, max_size: int = MAX_BLOCK_SIZE):
+        """
+        Args:
+            min_size (int): Tamanho mínimo, em caracteres, de cada bloco entregue
+            atomic_class (str): Classe que impede um contêiner de ser cortado,
+                para que o texto do elemento continue inteiro
+            anchor_divisor (int, optional): Ativa os cortes definidos pelo
+                conteúdo; em média, um bloco a cada ``anchor_divisor`` é
+                ponto de corte
+            max_size (int): Tamanho a partir do qual um bloco é cortado
+                mesmo dentro de tags abertas; nunca menor que o maior grupo
+                dos cortes por conteúdo
+        """
+        super().__init__(convert_charrefs=False)
+        self.min_size = min_size
+        self.atomic_class = atomic_class
+        self.anchor_divisor = anchor_divisor
+        self.max_size = max(max_size, min_size * ANCHOR_MAX_FACTOR)
+        self._mark = 0
+        self._blocks: List[str] = []
+        self._buffer: List[str] = []
+        self._size = 0
+        self._context: List[tuple] = []
+        self._block_context: List[tuple] = []
+        # Tags abertas no bloco atual, com o texto da abertura
+        self._stack: List[tuple] = []
+        self._inline = False
+
+    def feed(self, data: str) -> List[str]:
+        """
+        Alimenta o tokenizador com mais um trecho de HTML.
+
+        Args:
+            data (str): Trecho de HTML
+
+        Returns:
+            List[str]: Blocos concluídos com este trecho
+        """
+        super().feed(data)
+        return self._take_blocks()
+
+    def close(self) -> List[str]:
+        """
+        Finaliza a tokenização e entrega o bloco restante.
+
+        Returns:
+            List[str]: Últimos blocos do documento
+        """
+        super().close()
+        self._flush(force=True)
+        return self._take_blocks()
+
+    def _take_blocks(self) -> List[str]:
+        blocks, self._blocks = self._blocks, []
+        return blocks
+
+    def _flush(self, force: bool = False) -> bool:
+        """
+        Fecha o bloco atual, envolvendo-o com os contêineres abertos.
+        
+        O bloco é reaberto com os contêineres vigentes quando ele começou e
+        fechado com os vigentes agora, já que ele pode conter a abertura ou o
+        fechamento de contêineres entre os blocos agrupados.
+        
+        Returns:
+            bool: True se o bloco foi fechado
+        """
+        if not force and not self._can_cut():
+            self._mark = len(self._buffer)
+            return False
+        if self._buffer:
+            opening = ''.join(raw for _, raw in self._block_context)
+            closing = ''.join(f'</{tag}>' for tag, _ in reversed(self._context))
+            self._blocks.append(opening + ''.join(self._buffer) + closing)
+        self._buffer = []
+        self._size = 0
+        self._mark = 0
+        self._inline = False
+        return True
+
+    def _can_cut(self) -> bool:
+        """Decide se o grupo atual pode ser fechado neste limite de bloco."""
+        if self._size < self.min_size:
+            return False
+        if self.anchor_divisor is None or self._size >= self.min_size * ANCHOR_MAX_FACTOR:
+            return True
+        # Hash só do último bloco, para que o corte não dependa do que veio antes
+        piece = ''.join(self._buffer[self._mark:]).encode('utf-8', 'surrogatepass')
+        return zlib.crc32(piece) % self.anchor_divisor == 0
+
+    def _cut_open(self) -> None:
+        """Corta o bloco dentro das tags abertas, se ele passou de max_size."""
+        if self._size < self.max_size:
+            return
+        stack = self._stack
+        self._buffer.append(''.join(f'</{tag}>' for tag, _ in reversed(stack)))
+        self._stack = []
+        self._flush(force=True)
+        for tag, raw in stack:
+            self._append(raw, inline=tag not in BLOCK_TAGS)
+        self._stack = stack
+
+    def _append(self, raw: str, inline: bool = True) -> None:
+        if not self._buffer:
+            self._block_context = list(self._context)
+        self._buffer.append(raw)
+        self._size += len(raw)
+        if inline and not self._stack:
+            self._inline = True
+
+    def _container_boundary(self, tag: str, raw: str) -> None:
+        # Só cortamos em contêineres que não quebram parágrafo quando o
+        # trecho anterior não termina em texto corrido; sem corte, a tag do
+        # contêiner fica dentro do bloco
+        if (tag in BREAKING_CONTAINER_TAGS or not self._inline) and self._flush():
+            return
+        if self._buffer:
+            self._buffer.append(raw)
+            self._size += len(raw)
+
+    def handle_starttag(self, tag, attrs):
+        raw = self.get_starttag_text()
+        # Um bloco aberto dentro de um <p> sem fechamento encerra o parágrafo
+        if ([name for name, _ in self._stack] == ['p']
+                and (tag in BLOCK_TAGS or tag in CONTAINER_TAGS)):
+            self._stack = []
+            self._flush()
+        if not self._stack:
+            if tag in CONTAINER_TAGS and not _has_class(attrs, self.atomic_class):
+                self._container_boundary(tag, raw)
+                self._context.append((tag, raw))
+                return
+            if tag in BLOCK_TAGS:
+                self._flush()
+        self._append(raw, inline=tag not in BLOCK_TAGS)
+        if tag in VOID_TAGS:
+            if not self._stack and tag in BLOCK_TAGS:
+                self._flush()
+        else:
+            self._stack.append((tag, raw))
+        self._cut_open()
+
+    def handle_startendtag(self, tag, attrs):
+        self._append(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if not self._stack:
+            if tag in CONTAINER_TAGS and any(name == tag for name, _ in self._context):
+                self._container_boundary(tag, f'</{tag}>')
+                while self._context:
+                    name, _ = self._context.pop()
+                    if name == tag:
+                        break
+                return
+            self._append(f'</{tag}>')
+            return
+
+        self._buffer.append(f'</{tag}>')
+        self._size += len(tag) + 3
+        if any(name == tag for name, _ in self._stack):
+            while self._stack.pop()[0] != tag:
+                pass
+            if not self._stack and tag in BLOCK_TAGS:
+                self._flush()
+                return
+        self._cut_open()
+
+    def handle_data(self, data):
+        self._append(data, inline=bool(data.strip()))
+
+    def handle_entityref(self, name):
+        self._append(f'&{name};')
+
+    def handle_charref(self, name):
+        self._append(f'&#{name};')
+
+    def handle_comment(self, data):
+        self._append(f'<!--{data}-->', inline=False)
+
+    def handle_decl(self, decl):
+        self._append(f'<!{decl}>', inline=False)
+
+    def handle_pi(self, data):
+        self._append(f'<?{data}>', inline=False)
+
+    def unknown_decl(self, data):
+        self._append(f'<![{data}]>', inline=False)
@@ -0,0 +1,187 @@
+"""
+Divisão de documentos por página
+
+Este módulo localiza, com uma varredura leve do HTML bruto, os elementos
+p-Pagina e corta o documento em trechos de tamanho equilibrado nesses
+pontos, reparando em cada corte os contêineres abertos, para que os trechos
+possam ser convertidos de forma independente.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from .block_splitter import BLOCK_TAGS, BREAKING_CONTAINER_TAGS, CONTAINER_TAGS, VOID_TAGS
+
+# Comentários, blocos de script/style e tags, com os atributos entre aspas
+TOKEN_PATTERN = re.compile(
+    r'<!--.*?-->'
+    r'|<(?P<close>/)?(?P<tag>[a-zA-Z][^\s/>]*)(?P<attrs>(?:[^>"\']|"[^"]*"|\'[^\']*\')*)>',
+    re.DOTALL,
+)
+
+# Elementos cujo conteúdo é texto bruto, sem tags
+RAW_TEXT_TAGS = ('script', 'style')
+
+def _has_class(attrs: str, class_name: str) -> bool:
+    """Verifica se o texto dos atributos de uma tag inclui a classe informada."""
+    match = re.search(r'class\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', attrs, re.IGNORECASE)
+    return bool(match) and class_name in (match.group(1) or match.group(2) or match.group(3)).split()
+
+def find_page_offsets(html: str, page_class: str = 'p-Pagina') -> List[int]:
+    """
+    Localiza o início de cada elemento de número de página.
+
+    Args:
+        html (str): Conteúdo HTML
+        page_class (str): Classe que identifica os elementos de página
+
+    Returns:
+        List[int]: Posições das tags de abertura, em ordem
+    """
+    pattern = re.compile(r'<[a-zA-Z][^>]*?class\s*=\s*["\']?[^"\'>]*\b' + re.escape(page_class) + r'\b')
+    return [match.start() for match in pattern.finditer(html)]
+
+def _thresholds(html: str, count: int, page_class: str) -> List[int]:
+    """
+    Posições a partir das quais cada corte pode ser feito.
+
+    Para cada ponto que divide o documento em partes iguais, escolhe o
+    primeiro elemento de página a partir dele; sem elementos de página, usa
+    o próprio ponto.
+    """
+    targets = [len(html) * i // count for i in range(1, count)]
+    pages = find_page_offsets(html, page_class)
+    if not pages:
+        return targets
+
+    thresholds = []
+    index = 0
+    for target in targets:
+        while index < len(pages) and pages[index] < target:
+            index += 1
+        if index == len(pages):
+            break
+        if not thresholds or pages[index] > thresholds[-1]:
+            thresholds.append(pages[index])
+    return thresholds
+
+def split_document(html: str, count: int, page_class: str = 'p-Pagina') -> List[str]:
+    """
+    Corta o documento em até ``count`` trechos autossuficientes.
+
+    Cada corte é feito no elemento de página escolhido ou, se ele estiver
+    no meio de texto corrido ou de outro elemento, no primeiro início de
+    bloco (p, h1-h6, ul, ...) seguinte que não esteja logo após texto
+    corrido.
+    Cada trecho é envolvido pelos contêineres (div, section, body...)
+    abertos no ponto de corte, como nos blocos do BlockSplitter, de modo que
+    a conversão de cada trecho veja os mesmos ancestrais que veria no
+    documento inteiro.
+
+    Args:
+        html (str): Conteúdo HTML
+        count (int): Quantidade desejada de trechos
+        page_class (str): Classe que identifica os elementos de página, que
+            também não são cortados quando são contêineres
+
+    Returns:
+        List[str]: Trechos de HTML, na ordem do documento
+    """
+    thresholds = _thresholds(html, count, page_class) if count > 1 else []
+    return _split(html, thresholds, page_class)
+
+def split_at_pages(html: str, page_class: str = 'p-Pagina') -> List[str]:
+    """
+    Corta o documento em um trecho por elemento de página.
+
+    Segue as regras de split_document, tentando cortar em todos os
+    elementos de página; páginas que começam no meio de texto corrido ficam
+    no mesmo trecho da anterior. O conteúdo antes do primeiro elemento de
+    página forma o primeiro trecho.
+
+    Args:
+        html (str): Conteúdo HTML
+        page_class (str): Classe que identifica os elementos de página
+
+    Returns:
+        List[str]: Trechos de HTML, na ordem do documento
+    """
+    return _split(html, find_page_offsets(html, page_class), page_class)
+
+def _split(html: str, thresholds: List[int], page_class: str) -> List[str]:
+    """Corta o documento no primeiro ponto seguro a partir de cada posição."""
+    cuts: List[Tuple[int, List[Tuple[str, str]]]] = [(0, [])]
+    context: List[Tuple[str, str]] = []
+    stack: List[str] = []
+    inline = False
+    index = 0
+    pos = 0
+
+    while index < len(thresholds):
+        match = TOKEN_PATTERN.search(html, pos)
+        if match is None:
+            break
+        if not stack and not inline and html[pos:match.start()].strip():
+            inline = True
+        pos = match.end()
+        tag = match.group('tag')
+        if tag is None:
+            continue
+        tag = tag.lower()
+
+        if match.group('close'):
+            if not stack and tag in CONTAINER_TAGS and any(name == tag for name, _ in context):
+                while context.pop()[0] != tag:
+                    pass
+                if tag in BREAKING_CONTAINER_TAGS:
+                    inline = False
+            elif tag in stack:
+                while stack.pop() != tag:
+                    pass
+                if not stack and tag in BLOCK_TAGS:
+                    inline = False
+            continue
+
+        # Um bloco aberto dentro de um <p> sem fechamento encerra o parágrafo;
+        # o texto do parágrafo conta como texto corrido
+        if stack == ['p'] and (tag in BLOCK_TAGS or tag in CONTAINER_TAGS):
+            stack = []
+            inline = True
+        if not stack:
+            attrs = match.group('attrs')
+            # O corte é feito antes de um bloco ou do próprio elemento de
+            # página, desde que o trecho anterior não termine em texto
+            # corrido (uma lista logo após texto, por exemplo, não é
+            # precedida de linha em branco)
+            if match.start() >= thresholds[index] and not inline and (
+                    tag in BLOCK_TAGS or _has_class(attrs, page_class)):
+                cuts.append((match.start(), list(context)))
+                while index < len(thresholds) and thresholds[index] <= match.start():
+                    index += 1
+            if tag in CONTAINER_TAGS and not _has_class(attrs, page_class):
+                context.append((tag, match.group()))
+                if tag in BREAKING_CONTAINER_TAGS:
+                    inline = False
+                continue
+            inline = tag not in BLOCK_TAGS
+        if tag in RAW_TEXT_TAGS:
+            end = _find_raw_end(html, tag, pos)
+            if end is not None:
+                pos = end
+            continue
+        if tag not in VOID_TAGS and not match.group('attrs').rstrip().endswith('/'):
+            stack.append(tag)
+
+    chunks = []
+    for (start, opening), (end, closing) in zip(cuts, cuts[1:] + [(len(html), [])]):
+        chunks.append(
+            ''.join(raw for _, raw in opening)
+            + html[start:end]
+            + ''.join(f'</{tag}>' for tag, _ in reversed(closing))
+        )
+    return chunks
+
+def _find_raw_end(html: str, tag: str, pos: int) -> Optional[int]:
+    """Posição logo após o fechamento de um elemento de texto bruto."""
+    match = re.compile(f'</{tag}\\s*>', re.IGNORECASE).search(html, pos)
+    return match.end() if match else None
@@ -0,0 +1,140 @@
+"""
+Filtragem durante o parsing
+
+Este módulo descarta elementos enquanto os tokens chegam do parser, antes
+que virem nós da árvore: as tags de uma lista configurável (por padrão
+script e style, que os emissores ignoram) e os comentários. O conteúdo
+descartado nunca é alocado. As regras de transformação continuam a cargo
+de apply_transforms.
+
+O filtro só estende os ganchos que os tree builders do bs4 chamam em
+qualquer documento (handle_starttag, handle_endtag, handle_data e
+object_was_parsed), sem reproduzir o estado interno do BeautifulSoup.
+Descartar tags e comentários pode mudar espaços em branco no Markdown, e
+por isso o filtro só é aplicado quando pedido.
+
+Uso:
+    soup = parse_html(html, parse_filter=ParseFilter(drop=['script', 'style', 'iframe']))
+"""
+
+from typing import Iterable, List, Optional
+
+from bs4 import BeautifulSoup
+from bs4.element import Comment
+
+from .index import IndexedSoup, is_decomposed
+
+# Tags descartadas por padrão: o conteúdo delas é ignorado pelos emissores
+DEFAULT_DROP_TAGS = frozenset(['script', 'style'])
+
+class ParseFilter:
+    """
+    O que descartar durante o parsing.
+
+    Uso:
+        ParseFilter()                                  # script, style e comentários
+        ParseFilter(drop=['script', 'style', 'iframe'], comments=False)
+    """
+
+    def __init__(self, drop: Iterable[str] = DEFAULT_DROP_TAGS, comments: bool = True):
+        """
+        Args:
+            drop (Iterable[str]): Tags descartadas com todo o conteúdo
+            comments (bool): Descartar os comentários
+        """
+        self.drop = frozenset(name.lower() for name in drop)
+        self.comments = comments
+
+    @property
+    def key(self) -> str:
+        """Descrição estável do filtro, usada nas chaves de cache."""
+        return f"drop={','.join(sorted(self.drop))};comments={self.comments}"
+
+    def apply(self, soup: BeautifulSoup) -> BeautifulSoup:
+        """
+        Descarta as tags e os comentários de uma árvore já montada.
+
+        Usado com o html5lib, que monta a árvore sem passar pelos ganchos de
+        parsing; as regras continuam a cargo de apply_transforms.
+
+        Args:
+            soup (BeautifulSoup): Objeto BeautifulSoup do documento HTML
+
+        Returns:
+            BeautifulSoup: Objeto BeautifulSoup modificado
+        """
+        if self.drop:
+            for node in soup.find_all(sorted(self.drop)):
+                if not is_decomposed(node):
+                    node.decompose()
+        if self.comments:
+            for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+                comment.extract()
+        return soup
+
+    def __repr__(self) -> str:
+        return f"ParseFilter(drop={sorted(self.drop)!r}, comments={self.comments!r})"
+
+class FilteringSoup(IndexedSoup):
+    """
+    IndexedSoup que descarta elementos à medida que os tokens chegam.
+
+    Os backends html.parser e lxml entregam cada tag e texto por
+    handle_starttag, handle_endtag e handle_data, e cada nó pronto por
+    object_was_parsed. Um elemento da lista é pulado até a sua tag de
+    fechamento, com todo o conteúdo; um comentário descartado não é ligado
+    à árvore.
+    """
+
+    def __init__(self, markup, features: str, parse_filter: Optional[ParseFilter] = None):
+        self.parse_filter = parse_filter
+        super().__init__(markup, features)
+
+    def reset(self):
+        # Chamado a cada tentativa de parsing; tags abertas dentro do
+        # elemento descartado, ou None fora dele
+        self._skipping: Optional[List[str]] = None
+        super().reset()
+
+    def _is_void(self, name: str) -> bool:
+        return self.builder.can_be_empty_element(name)
+
+    def _keeps(self, node) -> bool:
+        """Indica se um nó pronto entra na árvore."""
+        return not (isinstance(node, Comment) and self.parse_filter is not None
+                    and self.parse_filter.comments)
+
+    def handle_starttag(self, name, namespace, nsprefix, attrs, *args, **kwargs):
+        if self._skipping is not None:
+            if not self._is_void(name):
+                self._skipping.append(name)
+            return None
+        if self.parse_filter is not None and name in self.parse_filter.drop:
+            self.endData()
+            if not self._is_void(name):
+                self._skipping = [name]
+            return None
+        return super().handle_starttag(name, namespace, nsprefix, attrs, *args, **kwargs)
+
+    def handle_endtag(self, name, nsprefix=None):
+        if self._skipping is not None:
+            stack = self._skipping
+            if name in stack:
+                del stack[len(stack) - 1 - stack[::-1].index(name):]
+                if not stack:
+                    self._skipping = None
+                return
+            if not any(tag.name == name for tag in self.tagStack):
+                # Fechamento sem abertura correspondente
+                return
+            # Fecha também o elemento descartado
+            self._skipping = None
+        super().handle_endtag(name, nsprefix)
+
+    def handle_data(self, data):
+        if self._skipping is None:
+            super().handle_data(data)
+
+    def object_was_parsed(self, o, parent=None, most_recent_element=None):
+        if self._keeps(o):
+            super().object_was_parsed(o, parent, most_recent_element)
@@ -5,19 +5,120 @@ Este módulo contém funções para parsear HTML e aplicar transformações inic
 """
 
 from bs4 import BeautifulSoup
-from typing import Union
+from bs4.builder import builder_registry
+from typing import Optional
 
-def parse_html(html: str) -> BeautifulSoup:
+from .filters import FilteringSoup, ParseFilter
+from .index import IndexedSoup
+from .rules import (
+    DEFAULT_RULES, DROP, HEADER, HEADER_LEVELS, MEDIA_TAGS, PAGE_CLASS, PAGE_MARKER, TEXT,
+    Rule, RuleSet,
+)
+
+# Backends de parsing suportados, além de 'auto'
+BACKENDS = ('html.parser', 'lxml', 'html5lib')
+
+# Ordem de preferência usada por 'auto' (do mais rápido para o mais lento)
+FASTEST_BACKENDS = ('lxml', 'html.parser')
+
+def available_backends() -> list:
+    """
+    Lista os backends de parsing instalados no ambiente.
+    
+    Returns:
+        list: Nomes dos backends disponíveis, na ordem de BACKENDS
+    """
+    return [name for name in BACKENDS if builder_registry.lookup(name) is not None]
+
+def resolve_backend(backend: str = 'html.parser') -> str:
+    """
+    Resolve o nome do backend de parsing a ser usado.
+    
+    Args:
+        backend (str): 'html.parser', 'lxml', 'html5lib' ou 'auto' para o
+            mais rápido disponível
+        
+    Returns:
+        str: Nome do backend resolvido
+        
+    Raises:
+        ValueError: Se o backend for desconhecido ou não estiver instalado
+    """
+    if backend == 'auto':
+        for name in FASTEST_BACKENDS:
+            if builder_registry.lookup(name) is not None:
+                return name
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {backend!r}. Use um de {BACKENDS} ou 'auto'")
+    if builder_registry.lookup(backend) is None:
+        raise ValueError(f"O backend {backend!r} não está instalado")
+    return backend
+
+class BudgetedSoup(FilteringSoup):
+    """
+    FilteringSoup que contabiliza cada nó no orçamento da conversão.
+
+    Os backends html.parser e lxml passam por pushTag e object_was_parsed,
+    então os limites de nós, profundidade e prazo interrompem o parsing
+    assim que são ultrapassados. Elementos filtrados não contam.
+    """
+
+    def __init__(self, markup, features: str, budget, parse_filter: Optional[ParseFilter] = None):
+        self._budget = budget
+        super().__init__(markup, features, parse_filter)
+
+    def pushTag(self, tag):
+        super().pushTag(tag)
+        if tag is not self:
+            self._budget.add_node(len(self.tagStack) - 1)
+
+    def object_was_parsed(self, o, parent=None, most_recent_element=None):
+        super().object_was_parsed(o, parent, most_recent_element)
+        if self._keeps(o):
+            self._budget.add_node()
+
+def parse_html(html: str, backend: str = 'html.parser', budget=None,
+               parse_filter: Optional[ParseFilter] = None) -> BeautifulSoup:
     """
     Parseia o conteúdo HTML e retorna um objeto BeautifulSoup.
     
     Args:
         html (str): Conteúdo HTML a ser parseado
+        backend (str): Backend de parsing ('html.parser', 'lxml', 'html5lib'
+            ou 'auto' para o mais rápido disponível)
+        budget (Budget, optional): Orçamento da conversão; os limites de nós
+            e de profundidade são verificados durante o parsing
+        parse_filter (ParseFilter, optional): Elementos descartados durante o
+            parsing (veja htmltomd.parser.filters)
         
     Returns:
-        BeautifulSoup: Objeto BeautifulSoup do documento HTML
+        BeautifulSoup: Objeto BeautifulSoup do documento HTML; com html.parser
+            e lxml, um IndexedSoup, cujo índice de tags e classes é usado
+            pelas transformações
+        
+    Raises:
+        BudgetExceeded: Se o documento ultrapassar o orçamento
     """
-    return BeautifulSoup(html, 'html.parser')
+    backend = resolve_backend(backend)
+    if backend == 'html5lib':
+        # O html5lib monta a árvore sem passar pelos ganchos de parsing
+        soup = BeautifulSoup(html, backend)
+        if parse_filter is not None:
+            parse_filter.apply(soup)
+        if budget is not None:
+            budget.check_tree(soup)
+        return soup
+    if budget is not None:
+        return BudgetedSoup(html, backend, budget, parse_filter)
+    if parse_filter is not None:
+        return FilteringSoup(html, backend, parse_filter)
+    return IndexedSoup(html, backend)
+
+# Cada transformação isolada é uma tabela de uma regra só
+_PAGE_BREAK_RULES = RuleSet([Rule(f'.{PAGE_CLASS}', PAGE_MARKER)])
+_MEDIA_RULES = RuleSet([Rule(', '.join(sorted(MEDIA_TAGS)), DROP)])
+_LINK_RULES = RuleSet([Rule('a', TEXT)])
+_HEADER_RULES = RuleSet([Rule(name, HEADER, level) for name, level in HEADER_LEVELS.items()])
 
 def mark_page_breaks(soup: BeautifulSoup) -> BeautifulSoup:
     """
@@ -29,15 +130,7 @@ def mark_page_breaks(soup: BeautifulSoup) -> BeautifulSoup:
     Returns:
         BeautifulSoup: Objeto BeautifulSoup modificado
     """
-    page_elements = soup.find_all(class_=lambda c: c and 'p-Pagina' in c.split())
-    
-    for element in page_elements:
-        page_number = element.get_text().strip()
-        # Inserir comentário de página antes do elemento
-        comment = soup.new_string(f'<!-- Página {page_number} -->')
-        element.insert_before(comment)
-    
-    return soup
+    return _PAGE_BREAK_RULES.apply(soup)
 
 def remove_media(soup: BeautifulSoup) -> BeautifulSoup:
     """
@@ -49,19 +142,7 @@ def remove_media(soup: BeautifulSoup) -> BeautifulSoup:
     Returns:
         BeautifulSoup: Objeto BeautifulSoup modificado
     """
-    # Remover imagens
-    for img in soup.find_all('img'):
-        img.decompose()
-    
-    # Remover vídeos
-    for video in soup.find_all('video'):
-        video.decompose()
-    
-    # Remover áudios
-    for audio in soup.find_all('audio'):
-        audio.decompose()
-    
-    return soup
+    return _MEDIA_RULES.apply(soup)
 
 def process_links(soup: BeautifulSoup) -> BeautifulSoup:
     """
@@ -73,41 +154,36 @@ def process_links(soup: BeautifulSoup) -> BeautifulSoup:
     Returns:
         BeautifulSoup: Objeto BeautifulSoup modificado
     """
-    for link in soup.find_all('a'):
-        link.replace_with(link.get_text())
-    
-    return soup
+    return _LINK_RULES.apply(soup)
 
 def process_headers(soup: BeautifulSoup) -> BeautifulSoup:
     """
     Processa cabeçalhos diretamente no HTML para garantir formatação correta no Markdown.
     
+    h1 vira "# texto", h2 vira "## texto" e h3-h6 viram "### texto".
+    
     Args:
         soup (BeautifulSoup): Objeto BeautifulSoup do documento HTML
         
     Returns:
         BeautifulSoup: Objeto BeautifulSoup modificado
     """
-    # Substituir h1 por texto simples com prefixo Markdown
-    for h1 in soup.find_all('h1'):
-        text = h1.get_text().strip()
-        new_tag = soup.new_tag('p')
-        new_tag.string = f"# {text}"
-        h1.replace_with(new_tag)
-    
-    # Substituir h2 por texto simples com prefixo Markdown
-    for h2 in soup.find_all('h2'):
-        text = h2.get_text().strip()
-        new_tag = soup.new_tag('p')
-        new_tag.string = f"## {text}"
-        h2.replace_with(new_tag)
+    return _HEADER_RULES.apply(soup)
+
+def apply_transforms(soup: BeautifulSoup, rules: Optional[RuleSet] = None) -> BeautifulSoup:
+    """
+    Aplica todas as transformações em uma única travessia da árvore.
     
-    # Substituir h3-h6 por texto simples com prefixo Markdown
-    for i in range(3, 7):
-        for h in soup.find_all(f'h{i}'):
-            text = h.get_text().strip()
-            new_tag = soup.new_tag('p')
-            new_tag.string = f"### {text}"
-            h.replace_with(new_tag)
+    Equivale a executar mark_page_breaks, remove_media, process_links e
+    process_headers em sequência, mas percorre o documento uma só vez (veja
+    RuleSet). Regras adicionais, como remover <script> e <style>, são
+    aplicadas na mesma travessia.
     
-    return soup
\ No newline at end of file
+    Args:
+        soup (BeautifulSoup): Objeto BeautifulSoup do documento HTML
+        rules (RuleSet, optional): Tabela de regras; DEFAULT_RULES quando omitida
+        
+    Returns:
+        BeautifulSoup: Objeto BeautifulSoup modificado
+    """
+    return (rules or DEFAULT_RULES).apply(soup)
@@ -0,0 +1,164 @@
+"""
+Índice de tags e classes
+
+Este módulo mantém, para uma árvore parseada, a lista dos elementos de cada
+tag e de cada classe em ordem do documento. O índice é montado durante o
+parsing (veja IndexedSoup), sem uma travessia extra, e as
+transformações consultam só os elementos que lhes interessam em vez de
+percorrer a árvore inteira.
+
+Elementos removidos ou desligados da árvore pelas transformações são
+descartados na consulta. Tags criadas depois do parsing não entram no índice: as tags e
+classes delas ficam marcadas como desatualizadas, e quem consulta o índice
+deve percorrer a árvore para encontrá-las.
+"""
+
+import heapq
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+class TagIndex:
+    """
+    Listas de elementos por nome de tag e por classe, em ordem do documento.
+
+    Uso:
+        soup = parse_html(html)
+        for node in soup.tag_index.lookup(['a', 'img'], ['p-Pagina']):
+            ...
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.stale_tags: Set[str] = set()
+        self.stale_classes: Set[str] = set()
+        self._tags: Dict[str, List[Tuple[int, Tag]]] = defaultdict(list)
+        self._classes: Dict[str, List[Tuple[int, Tag]]] = defaultdict(list)
+
+    def add(self, tag: Tag) -> None:
+        """
+        Registra um elemento parseado; chamado na ordem do documento.
+
+        Args:
+            tag (Tag): Elemento recém-aberto pelo parser
+        """
+        entry = (self.size, tag)
+        self.size += 1
+        self._tags[tag.name].append(entry)
+        classes = tag.attrs.get('class')
+        if classes:
+            if isinstance(classes, str):
+                classes = classes.split()
+            for class_name in classes:
+                self._classes[class_name].append(entry)
+
+    def created(self, name: str, attrs: Optional[dict] = None) -> None:
+        """
+        Marca como desatualizadas a tag e as classes de um elemento criado
+        fora do parsing.
+
+        Args:
+            name (str): Nome da tag criada
+            attrs (dict, optional): Atributos da tag criada
+        """
+        self.stale_tags.add(name)
+        classes = (attrs or {}).get('class')
+        if classes:
+            self.stale_classes.update(classes.split() if isinstance(classes, str) else classes)
+
+    def is_complete(self, names: Iterable[str], classes: Iterable[str]) -> bool:
+        """
+        Verifica se o índice ainda encontra todos os elementos procurados.
+
+        Args:
+            names (Iterable[str]): Nomes de tag procurados
+            classes (Iterable[str]): Classes procuradas
+
+        Returns:
+            bool: False se algum deles pode ter sido criado depois do parsing
+        """
+        return self.stale_tags.isdisjoint(names) and self.stale_classes.isdisjoint(classes)
+
+    def count(self, names: Iterable[str], classes: Iterable[str]) -> int:
+        """Quantidade de entradas, inclusive as já removidas, das tags e classes."""
+        return (sum(len(self._tags.get(name, ())) for name in names)
+                + sum(len(self._classes.get(class_name, ())) for class_name in classes))
+
+    def lookup(self, names: Iterable[str] = (), classes: Iterable[str] = (),
+               root: Optional[Tag] = None) -> List[Tag]:
+        """
+        Elementos com alguma das tags ou classes, em ordem do documento.
+
+        Args:
+            names (Iterable[str]): Nomes de tag
+            classes (Iterable[str]): Classes
+            root (Tag, optional): Raiz da árvore; com ela, elementos que
+                foram desligados da árvore (extract, replace_with), e não só
+                destruídos, também são descartados
+
+        Returns:
+            List[Tag]: Elementos ainda presentes, sem repetições
+        """
+        lists = [self._tags[name] for name in names if name in self._tags]
+        class_lists = [self._classes[name] for name in classes if name in self._classes]
+        found = []
+        seen = set()
+        for position, node in heapq.merge(*lists, *class_lists, key=_position):
+            if position in seen or is_decomposed(node):
+                continue
+            seen.add(position)
+            if root is not None and not _is_attached(node, root):
+                continue
+            found.append(node)
+        return found
+
+def is_decomposed(node: Tag) -> bool:
+    """
+    Verifica se o elemento foi destruído com decompose().
+
+    Em um elemento intacto, Tag.decomposed cai no __getattr__ do Tag, que
+    faz uma busca em toda a subárvore; decompose() apaga o nome da tag, e
+    conferir o nome é imediato.
+    """
+    return not node.name
+
+def _position(entry: Tuple[int, Tag]) -> int:
+    return entry[0]
+
+def _is_attached(node: Tag, root: Tag) -> bool:
+    """Verifica se o elemento ainda está ligado à raiz."""
+    parent = node.parent
+    while parent is not None:
+        if parent is root:
+            return True
+        parent = parent.parent
+    return False
+
+class IndexedSoup(BeautifulSoup):
+    """
+    BeautifulSoup que monta o TagIndex durante o parsing.
+
+    Os backends html.parser e lxml abrem cada tag com pushTag, na ordem do
+    documento; o índice é preenchido ali mesmo, sem travessia extra.
+    """
+
+    def __init__(self, markup, features: str):
+        self.tag_index = TagIndex()
+        super().__init__(markup, features)
+
+    def reset(self):
+        # Chamado a cada tentativa de parsing
+        self.tag_index = TagIndex()
+        super().reset()
+
+    def pushTag(self, tag):
+        super().pushTag(tag)
+        if tag is not self:
+            self.tag_index.add(tag)
+
+    def new_tag(self, name, *args, **kwargs):
+        tag = super().new_tag(name, *args, **kwargs)
+        self.tag_index.created(tag.name, tag.attrs)
+        return tag
@@ -0,0 +1,352 @@
+"""
+Tabela de regras de transformação
+
+Este módulo descreve as transformações do documento como uma tabela
+declarativa de regras (seletor → ação). A tabela é compilada uma única vez
+em mapas indexados pelo nome da tag e pela classe, e todas as regras são
+aplicadas em uma só travessia da árvore: acrescentar uma regra não
+acrescenta uma passada.
+
+Uso:
+    rules = DEFAULT_RULES.extend([
+        Rule('script, style', DROP),
+        Rule('figure', UNWRAP),
+    ])
+    soup = rules.apply(soup)
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+from .index import IndexedSoup, is_decomposed
+
+# Classe que identifica os elementos de número de página
+PAGE_CLASS = 'p-Pagina'
+
+# Tags de mídia removidas do documento
+MEDIA_TAGS = frozenset(['img', 'video', 'audio'])
+
+# Nível de cada cabeçalho (h3-h6 compartilham o prefixo ###)
+HEADER_LEVELS = {f'h{i}': i for i in range(1, 7)}
+
+# Ações disponíveis
+PAGE_MARKER = 'page_marker'  # insere o marcador de página antes do elemento
+DROP = 'drop'                # remove o elemento com todo o conteúdo
+TEXT = 'text'                # substitui o elemento pelo seu texto
+HEADER = 'header'            # substitui o cabeçalho por um parágrafo "# texto"
+UNWRAP = 'unwrap'            # remove a tag, mantendo o conteúdo
+ACTIONS = (PAGE_MARKER, DROP, TEXT, HEADER, UNWRAP)
+
+# Marcador inserido por PAGE_MARKER quando a regra não informa outro
+PAGE_MARKER_TEMPLATE = '<!-- Página {} -->'
+
+# Fase de cada ação: marcadores e remoções na entrada do elemento, as
+# demais na saída, depois que os descendentes foram processados
+_ENTER_PHASES = {PAGE_MARKER: 0, DROP: 1}
+_LEAVE_PHASE = 2
+
+# Acima de um candidato a cada INDEX_DENSITY elementos do documento, a
+# travessia completa é mais barata que a consulta ao índice
+INDEX_DENSITY = 2
+
+Action = Union[str, Callable[[Tag, BeautifulSoup], None]]
+
+def _first(item: tuple):
+    return item[0]
+
+def _header_prefix(level: int) -> str:
+    """Retorna o prefixo Markdown para o nível de cabeçalho."""
+    return '#' * min(level, 3)
+
+def _parse_selector(selector: str) -> List[Tuple[Optional[str], Optional[str]]]:
+    """Separa um seletor como 'img, span.p-Pagina, .nota' em pares (tag, classe)."""
+    parts = []
+    for item in selector.split(','):
+        item = item.strip()
+        tag, _, class_name = item.partition('.')
+        if not item or (not tag and not class_name) or '.' in class_name or ' ' in item:
+            raise ValueError(f"Seletor inválido: {selector!r}. Use 'tag', '.classe' ou 'tag.classe'")
+        parts.append((tag.lower() or None, class_name or None))
+    return parts
+
+class Rule:
+    """
+    Uma regra da tabela: um seletor e a ação aplicada aos elementos que ele casa.
+
+    O seletor aceita 'tag', '.classe' e 'tag.classe', separados por vírgula.
+    A ação é uma das constantes do módulo ou uma função ``(elemento, soup)``,
+    chamada na saída do elemento, que pode alterá-lo ou substituí-lo.
+
+    O código de uma função não entra na chave de cache: sem um ``key``
+    estável, que deve mudar sempre que a função mudar, a tabela não tem
+    chave e as conversões com ela não usam caches.
+
+    Uso:
+        Rule('img, video, audio', DROP)
+        Rule('h2', HEADER, 2)
+        Rule('figure', lambda node, soup: node.unwrap(), key='figure-unwrap-v1')
+    """
+
+    def __init__(self, selector: str, action: Action, argument=None, key: Optional[str] = None):
+        """
+        Args:
+            selector (str): Tags e classes casadas pela regra
+            action: Ação (PAGE_MARKER, DROP, TEXT, HEADER, UNWRAP) ou função
+            argument: Nível do cabeçalho para HEADER ou modelo do marcador
+                para PAGE_MARKER
+            key (str, optional): Identificador estável da função, usado na
+                chave de cache
+
+        Raises:
+            ValueError: Se o seletor ou a ação forem inválidos
+        """
+        if not callable(action) and action not in ACTIONS:
+            raise ValueError(f"Ação desconhecida: {action!r}. Use uma de {ACTIONS} ou uma função")
+        if action == HEADER and not isinstance(argument, int):
+            raise ValueError("Regras HEADER exigem o nível do cabeçalho como argumento")
+        self.selector = selector
+        self.action = action
+        self.argument = argument
+        self._function_key = key
+        self.targets = _parse_selector(selector)
+
+    @property
+    def phase(self) -> int:
+        return _ENTER_PHASES.get(self.action, _LEAVE_PHASE) if isinstance(self.action, str) else _LEAVE_PHASE
+
+    @property
+    def key(self) -> Optional[str]:
+        """
+        Descrição estável da regra, usada nas chaves de cache; None para
+        uma função sem ``key``.
+        """
+        action = self.action
+        if callable(action):
+            if self._function_key is None:
+                return None
+            action = f"function={self._function_key}"
+        return f"{self.selector}:{action}:{self.argument}"
+
+    def __repr__(self) -> str:
+        return f"Rule({self.selector!r}, {self.action!r}, {self.argument!r})"
+
+class RuleSet:
+    """
+    Tabela de regras compilada em mapas de despacho.
+
+    Cada elemento consulta só as regras da sua tag e das suas classes, em
+    tempo constante em relação ao tamanho da tabela. Nas ações de saída,
+    a primeira regra da tabela que casar com o elemento é a que vale.
+
+    As regras que removem o conteúdo (TEXT) fazem com que os cabeçalhos
+    internos não sejam transformados, e um cabeçalho só é transformado se
+    nenhum ancestral de nível menor ou igual já o tiver absorvido, como na
+    aplicação das transformações uma de cada vez.
+    """
+
+    def __init__(self, rules: Iterable[Rule]):
+        """
+        Args:
+            rules (Iterable[Rule]): Regras, em ordem de prioridade
+        """
+        self.rules = tuple(rules)
+        # Pares (ordem de aplicação, regra), por tag e por classe
+        tags: Dict[str, List[Tuple[tuple, Rule]]] = {}
+        self._classes: Dict[str, List[Tuple[Optional[str], tuple, Rule]]] = {}
+        for index, rule in enumerate(self.rules):
+            order = (rule.phase, index)
+            for tag, class_name in rule.targets:
+                if class_name is None:
+                    tags.setdefault(tag, []).append((order, rule))
+                else:
+                    self._classes.setdefault(class_name, []).append((tag, order, rule))
+        self._tags: Dict[str, Tuple[Tuple[tuple, Rule], ...]] = {
+            tag: tuple(sorted(items, key=_first)) for tag, items in tags.items()}
+        # Funções podem alterar a árvore fora do elemento, o que só a
+        # travessia na ordem original reproduz
+        self._builtin = all(isinstance(rule.action, str) for rule in self.rules)
+
+    def extend(self, rules: Iterable[Rule]) -> 'RuleSet':
+        """
+        Cria uma tabela com as regras desta seguidas das novas.
+
+        Args:
+            rules (Iterable[Rule]): Regras a acrescentar
+
+        Returns:
+            RuleSet: Nova tabela compilada
+        """
+        return RuleSet(self.rules + tuple(rules))
+
+    @property
+    def key(self) -> Optional[str]:
+        """
+        Descrição estável da tabela, usada nas chaves de cache; None se
+        alguma regra não tiver chave, e então a tabela não pode ser cacheada.
+        """
+        keys = [rule.key for rule in self.rules]
+        if None in keys:
+            return None
+        return ';'.join(keys)
+
+    def _match(self, node: Tag) -> Tuple[Tuple[tuple, Rule], ...]:
+        """Pares (ordem, regra) que casam com o elemento, em ordem de aplicação."""
+        return self._match_name(node.name, node.attrs.get('class'))
+
+    def _match_name(self, name: str, classes) -> Tuple[Tuple[tuple, Rule], ...]:
+        """Pares (ordem, regra) que casam com a tag e as classes."""
+        rules = self._tags.get(name, ())
+        if not self._classes or not classes:
+            return rules
+        if isinstance(classes, str):
+            classes = classes.split()
+        extra = [(order, rule) for class_name in classes
+                 for tag, order, rule in self._classes.get(class_name, ())
+                 if tag is None or tag == name]
+        if not extra:
+            return rules
+        # Uma classe repetida no elemento não aplica a regra duas vezes
+        return tuple(sorted(set(extra).union(rules), key=_first))
+
+    def apply(self, soup: BeautifulSoup) -> BeautifulSoup:
+        """
+        Aplica todas as regras em uma única passada.
+
+        Marcadores de página e remoções são aplicados na entrada de cada
+        elemento; as demais ações na saída, depois que todos os seus
+        descendentes já foram processados. Em um IndexedSoup com poucos
+        elementos casados pela tabela, só esses elementos são visitados,
+        consultados no índice montado durante o parsing; nos demais casos a
+        árvore inteira é percorrida.
+
+        Args:
+            soup (BeautifulSoup): Objeto BeautifulSoup do documento HTML
+
+        Returns:
+            BeautifulSoup: Objeto BeautifulSoup modificado
+        """
+        if self._builtin and isinstance(soup, IndexedSoup):
+            index = soup.tag_index
+            if (index.is_complete(self._tags, self._classes)
+                    and index.count(self._tags, self._classes) * INDEX_DENSITY < index.size):
+                return self._apply_indexed(soup)
+        return self._walk(soup)
+
+    def _walk(self, soup: BeautifulSoup) -> BeautifulSoup:
+        """Aplica as regras percorrendo a árvore inteira."""
+        # Cada item: (nó, dentro de TEXT, menor nível de cabeçalho ancestral, regra de saída)
+        stack = [(child, False, 7, None) for child in reversed(soup.contents)]
+
+        while stack:
+            node, in_text, header_ceiling, leaving = stack.pop()
+
+            if leaving is not None:
+                _leave(leaving, node, soup)
+                continue
+
+            if not isinstance(node, Tag):
+                continue
+
+            child_ceiling = header_ceiling
+            child_in_text = in_text
+            dropped = False
+            decided = False
+            leave_rule = None
+            for _, rule in self._match(node):
+                action = rule.action
+                if action == PAGE_MARKER:
+                    # Marcadores de página usam o texto original do elemento
+                    template = rule.argument or PAGE_MARKER_TEMPLATE
+                    node.insert_before(soup.new_string(template.format(node.get_text().strip())))
+                elif action == DROP:
+                    node.decompose()
+                    dropped = True
+                    break
+                elif not decided:
+                    decided = True
+                    if action == HEADER:
+                        # Cabeçalhos dentro de TEXT viram texto junto com o
+                        # elemento, e cabeçalhos internos a outro de nível
+                        # menor ou igual são absorvidos por ele
+                        level = rule.argument
+                        if not in_text and level < header_ceiling:
+                            leave_rule = rule
+                        child_ceiling = min(level, header_ceiling)
+                    else:
+                        leave_rule = rule
+                        if action == TEXT:
+                            child_in_text = True
+            if dropped:
+                continue
+            if leave_rule is not None:
+                stack.append((node, in_text, header_ceiling, leave_rule))
+
+            for child in reversed(node.contents):
+                stack.append((child, child_in_text, child_ceiling, None))
+
+        return soup
+
+    def _apply_indexed(self, soup: IndexedSoup) -> BeautifulSoup:
+        """Aplica as regras só aos elementos encontrados no índice."""
+        leaving = []
+        for node in soup.tag_index.lookup(self._tags, self._classes, soup):
+            # Descendentes de um elemento removido foram destruídos junto
+            if is_decomposed(node):
+                continue
+            leave_rule = None
+            dropped = False
+            for _, rule in self._match(node):
+                action = rule.action
+                if action == PAGE_MARKER:
+                    template = rule.argument or PAGE_MARKER_TEMPLATE
+                    node.insert_before(soup.new_string(template.format(node.get_text().strip())))
+                elif action == DROP:
+                    node.decompose()
+                    dropped = True
+                    break
+                elif leave_rule is None:
+                    leave_rule = rule
+            if dropped or leave_rule is None:
+                continue
+            if leave_rule.action == HEADER and not self._header_applies(node, leave_rule.argument):
+                continue
+            leaving.append((node, leave_rule))
+
+        # Em ordem inversa, os descendentes saem antes dos ancestrais
+        for node, rule in reversed(leaving):
+            _leave(rule, node, soup)
+        return soup
+
+    def _header_applies(self, node: Tag, level: int) -> bool:
+        """Verifica se nenhum ancestral absorve o cabeçalho, como na travessia."""
+        for parent in node.parents:
+            for _, rule in self._match(parent):
+                if rule.phase != _LEAVE_PHASE:
+                    continue
+                if rule.action == TEXT or (rule.action == HEADER and rule.argument <= level):
+                    return False
+                break
+        return True
+
+def _leave(rule: Rule, node: Tag, soup: BeautifulSoup) -> None:
+    """Aplica uma ação de saída."""
+    action = rule.action
+    if action == TEXT:
+        node.replace_with(node.get_text())
+    elif action == HEADER:
+        new_tag = soup.new_tag('p')
+        new_tag.string = f"{_header_prefix(rule.argument)} {node.get_text().strip()}"
+        node.replace_with(new_tag)
+    elif action == UNWRAP:
+        node.unwrap()
+    else:
+        action(node, soup)
+
+# Regras padrão: marcadores de página, remoção de mídia, links como texto
+# e cabeçalhos com prefixo Markdown
+DEFAULT_RULES = RuleSet(
+    [Rule(f'.{PAGE_CLASS}', PAGE_MARKER), Rule(', '.join(sorted(MEDIA_TAGS)), DROP), Rule('a', TEXT)]
+    + [Rule(name, HEADER, level) for name, level in HEADER_LEVELS.items()]
+)
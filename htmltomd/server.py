@@ -0,0 +1,567 @@
+"""
+Serviço HTTP de conversão
+
+Este módulo expõe o conversor como um serviço HTTP assíncrono, para ser
+chamado por outros sistemas. As conversões rodam em um pool limitado de
+threads ou processos; quando o pool e a fila estão ocupados, novas
+requisições são recusadas com 429 em vez de se acumularem na memória.
+
+Rotas:
+    POST /convert   Corpo em HTML (inclusive com Transfer-Encoding: chunked);
+                    parâmetros opcionais emitter, backend e stream=1
+    GET  /health    Estado do serviço em JSON
+    GET  /metrics   Contadores no formato texto do Prometheus (ou JSON com
+                    format=json)
+
+Requer o extra 'server' (starlette e uvicorn):
+    pip install htmltomd[server]
+    python -m htmltomd.server --port 8000
+"""
+
+import argparse
+import asyncio
+import codecs
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from htmltomd.converter import Converter, StreamingConverter, EMITTERS
+from htmltomd.encoding import SNIFF_SIZE, decode_html, sniff_encoding
+from htmltomd.limits import Budget, BudgetExceeded, Limits, add_limit_arguments, limits_from_args
+from htmltomd.parser import resolve_backend
+
+try:
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, PlainTextResponse
+    from starlette.routing import Route
+except ImportError:  # pragma: no cover - depende do extra 'server'
+    Starlette = None
+
+# Tamanho máximo do corpo de uma requisição sem stream
+DEFAULT_MAX_BODY_SIZE = 64 * 1024 * 1024
+
+# Tamanho máximo do corpo de uma requisição em stream
+DEFAULT_MAX_STREAM_SIZE = 1024 * 1024 * 1024
+
+# Requisições que podem aguardar na fila para cada processo ou thread
+DEFAULT_QUEUE_PER_WORKER = 4
+
+EXECUTORS = ('thread', 'process')
+
+MARKDOWN_TYPE = 'text/markdown; charset=utf-8'
+
+# Conversores reaproveitados em cada thread ou processo de trabalho
+_converters = {}
+
+def _convert(html: str, emitter: str, backend: str, limits: Optional[Limits] = None) -> str:
+    """Converte um documento no pool de trabalho."""
+    key = (emitter, backend, None if limits is None else tuple(limits.as_dict().values()))
+    converter = _converters.get(key)
+    if converter is None:
+        converter = _converters[key] = Converter(emitter=emitter, backend=backend, limits=limits)
+    return converter.convert(html)
+
+class QueueFullError(RuntimeError):
+    """O pool e a fila de conversões estão ocupados."""
+
+class ClientDisconnect(ConnectionError):
+    """O cliente encerrou a conexão antes de enviar todo o corpo."""
+
+class ConversionService:
+    """
+    Pool limitado de conversões com contadores de uso.
+
+    Cada requisição precisa reservar uma vaga com ``acquire`` antes de
+    converter e devolvê-la com ``release``. Há vagas para ``workers``
+    conversões simultâneas mais ``queue_size`` aguardando; além disso,
+    ``acquire`` lança QueueFullError. Todos os métodos devem ser chamados a
+    partir do loop de eventos.
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_size: Optional[int] = None,
+                 executor: str = 'thread', max_body_size: int = DEFAULT_MAX_BODY_SIZE,
+                 limits: Optional[Limits] = None, max_stream_size: int = DEFAULT_MAX_STREAM_SIZE):
+        """
+        Args:
+            workers (int, optional): Conversões simultâneas; usa a quantidade
+                de CPUs quando omitido
+            queue_size (int, optional): Requisições que podem aguardar por
+                um worker livre
+            executor (str): 'thread' ou 'process'
+            max_body_size (int): Tamanho máximo do corpo sem stream, em bytes
+            limits (Limits, optional): Orçamento de cada conversão; em
+                stream, valem o tamanho da entrada e o prazo
+            max_stream_size (int): Tamanho máximo do corpo em stream, em bytes
+
+        Raises:
+            ValueError: Se o tipo de executor for desconhecido
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"Executor desconhecido: {executor!r}. Use um de {EXECUTORS}")
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = self.workers * DEFAULT_QUEUE_PER_WORKER if queue_size is None else queue_size
+        self.executor = executor
+        self.max_body_size = max_body_size
+        self.max_stream_size = max_stream_size
+        self.limits = limits
+        self._threads = ThreadPoolExecutor(self.workers, thread_name_prefix='htmltomd')
+        # Conversões em stream mantêm estado entre os pedaços e rodam sempre
+        # em threads; as demais usam processos quando configurado
+        self._pool = ProcessPoolExecutor(self.workers) if executor == 'process' else self._threads
+        self.pending = 0
+        self.started = time.time()
+        self.counters = {
+            'requests': 0,
+            'conversions': 0,
+            'errors': 0,
+            'rejected': 0,
+            'budget_exceeded': 0,
+            'bytes_in': 0,
+            'bytes_out': 0,
+            'conversion_seconds': 0.0,
+        }
+
+    @property
+    def capacity(self) -> int:
+        """Quantidade máxima de requisições admitidas ao mesmo tempo."""
+        return self.workers + self.queue_size
+
+    def acquire(self) -> None:
+        """
+        Reserva uma vaga para uma conversão.
+
+        Raises:
+            QueueFullError: Se todas as vagas estiverem ocupadas
+        """
+        self.counters['requests'] += 1
+        if self.pending >= self.capacity:
+            self.counters['rejected'] += 1
+            raise QueueFullError("Fila de conversões cheia")
+        self.pending += 1
+
+    def release(self) -> None:
+        """Devolve a vaga reservada por ``acquire``."""
+        self.pending -= 1
+
+    async def convert(self, html: str, emitter: str = 'html2text', backend: str = 'html.parser') -> str:
+        """
+        Converte um documento no pool.
+
+        Args:
+            html (str): Conteúdo HTML a ser convertido
+            emitter (str): Emissor de Markdown
+            backend (str): Backend de parsing já resolvido
+
+        Returns:
+            str: Conteúdo convertido para Markdown
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            markdown = await loop.run_in_executor(self._pool, _convert, html, emitter, backend,
+                                                  self.limits)
+        except BudgetExceeded:
+            self.counters['budget_exceeded'] += 1
+            raise
+        except Exception:
+            self.counters['errors'] += 1
+            raise
+        finally:
+            self.counters['conversion_seconds'] += time.perf_counter() - start
+        self.counters['conversions'] += 1
+        self.counters['bytes_in'] += len(html.encode('utf-8'))
+        self.counters['bytes_out'] += len(markdown.encode('utf-8'))
+        return markdown
+
+    async def limit_body(self, chunks: AsyncIterator[bytes],
+                         budget: Optional[Budget] = None) -> AsyncIterator[bytes]:
+        """
+        Repassa o corpo de uma requisição em stream verificando os limites.
+
+        Args:
+            chunks (AsyncIterator[bytes]): Pedaços do corpo, como recebidos
+            budget (Budget, optional): Orçamento da conversão, para o prazo
+
+        Yields:
+            bytes: Os mesmos pedaços
+
+        Raises:
+            BudgetExceeded: Se o corpo ultrapassar max_stream_size ou
+                limits.max_input_bytes, ou se o prazo passar
+        """
+        size = 0
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > self.max_stream_size:
+                raise BudgetExceeded('max_input_bytes', self.max_stream_size, 'stream')
+            if self.limits is not None:
+                self.limits.check_input(size)
+            if budget is not None:
+                budget.check_deadline('stream')
+            yield chunk
+
+    async def convert_stream(self, chunks: AsyncIterator[str], emitter: str = 'html2text',
+                             backend: str = 'html.parser',
+                             budget: Optional[Budget] = None) -> AsyncIterator[str]:
+        """
+        Converte o HTML à medida que os pedaços chegam.
+
+        Args:
+            chunks (AsyncIterator[str]): Pedaços de HTML, na ordem
+            emitter (str): Emissor de Markdown
+            backend (str): Backend de parsing já resolvido
+            budget (Budget, optional): Orçamento verificado a cada pedaço
+                convertido; o tamanho do corpo é verificado por limit_body
+
+        Yields:
+            str: Trechos de Markdown, na ordem do documento
+
+        Raises:
+            BudgetExceeded: Se o prazo passar
+            ClientDisconnect: Se o cliente desconectar antes do fim do corpo
+            UnicodeDecodeError: Se o corpo não for válido no charset informado
+        """
+        loop = asyncio.get_running_loop()
+        converter = StreamingConverter(emitter=emitter, backend=backend)
+        start = time.perf_counter()
+        try:
+            async for chunk in chunks:
+                self.counters['bytes_in'] += len(chunk.encode('utf-8'))
+                for piece in await loop.run_in_executor(self._threads, converter.feed, chunk):
+                    self.counters['bytes_out'] += len(piece.encode('utf-8'))
+                    yield piece
+                if budget is not None:
+                    budget.check_deadline('stream')
+            for piece in await loop.run_in_executor(self._threads, converter.close):
+                self.counters['bytes_out'] += len(piece.encode('utf-8'))
+                yield piece
+        except BudgetExceeded:
+            self.counters['budget_exceeded'] += 1
+            raise
+        except (ClientDisconnect, UnicodeDecodeError):
+            # Corpo incompleto ou inválido: falha do cliente, não da conversão
+            raise
+        except Exception:
+            self.counters['errors'] += 1
+            raise
+        finally:
+            self.counters['conversion_seconds'] += time.perf_counter() - start
+        self.counters['conversions'] += 1
+
+    def metrics(self) -> dict:
+        """
+        Retorna os contadores e o estado atual do serviço.
+
+        Returns:
+            dict: Contadores acumulados, vagas ocupadas e capacidade
+        """
+        return dict(self.counters, pending=self.pending, capacity=self.capacity,
+                    workers=self.workers, uptime_seconds=time.time() - self.started)
+
+    def close(self) -> None:
+        """Encerra os pools de trabalho."""
+        self._threads.shutdown(wait=False)
+        if self._pool is not self._threads:
+            self._pool.shutdown(wait=False)
+
+# Nome, tipo e descrição das métricas no formato do Prometheus
+METRICS = (
+    ('requests', 'counter', 'Requisições de conversão recebidas'),
+    ('conversions', 'counter', 'Conversões concluídas'),
+    ('errors', 'counter', 'Conversões com erro'),
+    ('rejected', 'counter', 'Requisições recusadas com a fila cheia'),
+    ('budget_exceeded', 'counter', 'Conversões interrompidas por limite de recursos'),
+    ('bytes_in', 'counter', 'Bytes de HTML convertidos'),
+    ('bytes_out', 'counter', 'Bytes de Markdown gerados'),
+    ('conversion_seconds', 'counter', 'Tempo total de conversão'),
+    ('pending', 'gauge', 'Conversões em andamento ou na fila'),
+    ('capacity', 'gauge', 'Conversões admitidas ao mesmo tempo'),
+    ('uptime_seconds', 'gauge', 'Tempo desde o início do serviço'),
+)
+
+def format_metrics(metrics: dict) -> str:
+    """
+    Formata as métricas no formato texto do Prometheus.
+
+    Args:
+        metrics (dict): Resultado de ConversionService.metrics()
+
+    Returns:
+        str: Métricas, uma por linha, com prefixo htmltomd_
+    """
+    lines = []
+    for name, kind, description in METRICS:
+        suffix = '_total' if kind == 'counter' and not name.endswith('_seconds') else ''
+        metric = f'htmltomd_{name}{suffix}'
+        lines.append(f'# HELP {metric} {description}')
+        lines.append(f'# TYPE {metric} {kind}')
+        lines.append(f'{metric} {metrics[name]}')
+    return '\n'.join(lines) + '\n'
+
+def _charset(content_type: Optional[str]) -> Optional[str]:
+    """Extrai o charset do cabeçalho Content-Type, ou None se ausente."""
+    for param in (content_type or '').split(';')[1:]:
+        name, _, value = param.strip().partition('=')
+        if name.lower() == 'charset' and value:
+            return value.strip('"\'')
+    return None
+
+async def _decode(chunks: AsyncIterator[bytes], charset: Optional[str]) -> AsyncIterator[str]:
+    """
+    Decodifica o corpo recebido em pedaços.
+
+    Sem charset no cabeçalho, a codificação é detectada nos primeiros
+    SNIFF_SIZE bytes e bytes inválidos viram U+FFFD.
+    """
+    decoder = None
+    if charset is not None:
+        decoder = codecs.getincrementaldecoder(charset)()
+    head = bytearray()
+    async for chunk in chunks:
+        if decoder is None:
+            head += chunk
+            if len(head) < SNIFF_SIZE:
+                continue
+            decoder = codecs.getincrementaldecoder(sniff_encoding(head))('replace')
+            chunk = bytes(head)
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    if decoder is None:
+        decoder = codecs.getincrementaldecoder(sniff_encoding(head))('replace')
+        text = decoder.decode(bytes(head), final=True)
+    else:
+        text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+async def _receive_body(receive) -> AsyncIterator[bytes]:
+    """
+    Lê o corpo da requisição diretamente do canal ASGI.
+
+    Raises:
+        ClientDisconnect: Se o cliente desconectar antes do fim do corpo,
+            para que um corpo truncado não seja convertido como completo
+    """
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ClientDisconnect("Cliente desconectado antes do fim do corpo")
+        if message.get('body'):
+            yield message['body']
+        if not message.get('more_body', False):
+            return
+
+class _StreamingConversion:
+    """
+    Resposta ASGI que converte o corpo enquanto ele ainda está chegando.
+
+    O StreamingResponse do Starlette consome o canal de recepção para
+    detectar a desconexão do cliente, o que impediria a leitura do corpo
+    durante a resposta; aqui a mesma corrotina lê o corpo e envia o Markdown.
+
+    O tamanho do corpo e o prazo são verificados a cada pedaço. O status só
+    é enviado com o primeiro trecho de Markdown: um limite ultrapassado
+    antes disso vira uma resposta 413 ou 422, e um corpo inválido para o
+    charset informado, 400; depois, a conexão é encerrada sem concluir a
+    resposta. Se o cliente desconectar, a conversão é abandonada.
+    """
+
+    def __init__(self, service: ConversionService, emitter: str, backend: str,
+                 charset: Optional[str]):
+        self.service = service
+        self.emitter = emitter
+        self.backend = backend
+        self.charset = charset
+
+    async def __call__(self, scope, receive, send):
+        service = self.service
+        started = False
+
+        async def start():
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [(b'content-type', MARKDOWN_TYPE.encode('latin-1'))],
+            })
+
+        try:
+            budget = service.limits.start() if service.limits is not None else None
+            body = service.limit_body(_receive_body(receive), budget)
+            chunks = _decode(body, self.charset)
+            async for piece in service.convert_stream(chunks, self.emitter, self.backend, budget):
+                if not started:
+                    await start()
+                    started = True
+                await send({'type': 'http.response.body', 'body': piece.encode('utf-8'), 'more_body': True})
+            if not started:
+                await start()
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        except BudgetExceeded as e:
+            if started:
+                raise
+            response = _error(str(e), 413 if e.budget == 'max_input_bytes' else 422)
+            await response(scope, receive, send)
+        except UnicodeDecodeError as e:
+            if started:
+                raise
+            response = _error(f"Corpo inválido para o charset {self.charset}: {e}", 400)
+            await response(scope, receive, send)
+        except ClientDisconnect:
+            # Não há a quem responder
+            pass
+        finally:
+            service.release()
+
+def _error(message: str, status: int, **headers) -> 'PlainTextResponse':
+    return PlainTextResponse(message + '\n', status_code=status, headers=headers or None)
+
+async def _convert_endpoint(request):
+    service: ConversionService = request.app.state.service
+    emitter = request.query_params.get('emitter', 'html2text')
+    stream = request.query_params.get('stream', '').lower() in ('1', 'true', 'yes')
+    if emitter not in EMITTERS:
+        return _error(f"Emissor desconhecido: {emitter!r}. Use um de {EMITTERS}", 400)
+    try:
+        backend = resolve_backend(request.query_params.get('backend', 'html.parser'))
+        charset = _charset(request.headers.get('content-type'))
+        if charset is not None:
+            charset = codecs.lookup(charset).name
+    except (ValueError, LookupError) as e:
+        return _error(str(e), 400)
+
+    # A vaga é reservada antes de receber o corpo, para recusar cedo
+    try:
+        service.acquire()
+    except QueueFullError as e:
+        return _error(str(e), 429, **{'Retry-After': '1'})
+
+    if stream:
+        # Um corpo declarado grande demais é recusado antes de ser lido
+        length = request.headers.get('content-length', '')
+        limit = service.max_stream_size
+        if service.limits is not None and service.limits.max_input_bytes is not None:
+            limit = min(limit, service.limits.max_input_bytes)
+        if length.isdigit() and int(length) > limit:
+            service.release()
+            return _error(f"Corpo maior que {limit} bytes", 413)
+        return _StreamingConversion(service, emitter, backend, charset)
+
+    try:
+        data = bytearray()
+        async for chunk in request.stream():
+            data += chunk
+            if len(data) > service.max_body_size:
+                return _error(f"Corpo maior que {service.max_body_size} bytes", 413)
+        if charset is None:
+            html = decode_html(data)
+        else:
+            try:
+                html = data.decode(charset)
+            except UnicodeDecodeError as e:
+                return _error(f"Corpo inválido para o charset {charset}: {e}", 400)
+        try:
+            markdown = await service.convert(html, emitter, backend)
+        except BudgetExceeded as e:
+            return _error(str(e), 413 if e.budget == 'max_input_bytes' else 422)
+        except Exception as e:
+            return _error(f"Erro ao converter o HTML: {e}", 500)
+        return PlainTextResponse(markdown, media_type=MARKDOWN_TYPE)
+    finally:
+        service.release()
+
+async def _health_endpoint(request):
+    service: ConversionService = request.app.state.service
+    return JSONResponse({
+        'status': 'ok',
+        'executor': service.executor,
+        'workers': service.workers,
+        'pending': service.pending,
+        'capacity': service.capacity,
+    })
+
+async def _metrics_endpoint(request):
+    metrics = request.app.state.service.metrics()
+    if request.query_params.get('format') == 'json':
+        return JSONResponse(metrics)
+    return PlainTextResponse(format_metrics(metrics), media_type='text/plain; version=0.0.4')
+
+def create_app(service: Optional[ConversionService] = None, **options):
+    """
+    Cria a aplicação ASGI do serviço.
+
+    Args:
+        service (ConversionService, optional): Serviço já configurado; quando
+            omitido, um serviço é criado com ``options`` e encerrado junto
+            com a aplicação
+        **options: Argumentos de ConversionService
+
+    Returns:
+        Starlette: Aplicação ASGI
+
+    Raises:
+        ImportError: Se o extra 'server' não estiver instalado
+    """
+    if Starlette is None:
+        raise ImportError("O serviço HTTP requer o extra 'server': pip install htmltomd[server]")
+    owned = service is None
+    service = service or ConversionService(**options)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        if owned:
+            service.close()
+
+    app = Starlette(
+        routes=[
+            Route('/convert', _convert_endpoint, methods=['POST']),
+            Route('/health', _health_endpoint, methods=['GET']),
+            Route('/metrics', _metrics_endpoint, methods=['GET']),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.service = service
+    return app
+
+def serve(host: str = '127.0.0.1', port: int = 8000, **options) -> None:
+    """
+    Executa o serviço com o uvicorn até ser interrompido.
+
+    Args:
+        host (str): Endereço de escuta
+        port (int): Porta de escuta
+        **options: Argumentos de ConversionService
+    """
+    try:
+        import uvicorn
+    except ImportError:
+        raise ImportError("O serviço HTTP requer o extra 'server': pip install htmltomd[server]")
+    uvicorn.run(create_app(**options), host=host, port=port)
+
+def main():
+    """Processa os argumentos da linha de comando e inicia o serviço."""
+    parser = argparse.ArgumentParser(description="Serviço HTTP de conversão de HTML para Markdown")
+    parser.add_argument('--host', default='127.0.0.1', help="Endereço de escuta (padrão: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8000, help="Porta de escuta (padrão: 8000)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Conversões simultâneas (padrão: número de CPUs)")
+    parser.add_argument('--queue-size', type=int, default=None,
+                        help=f"Requisições na fila por vez (padrão: {DEFAULT_QUEUE_PER_WORKER} por worker)")
+    parser.add_argument('--executor', choices=EXECUTORS, default='thread',
+                        help="Pool de threads ou de processos (padrão: thread)")
+    parser.add_argument('--max-body-size', type=int, default=DEFAULT_MAX_BODY_SIZE,
+                        help="Tamanho máximo do corpo sem stream, em bytes")
+    parser.add_argument('--max-stream-size', type=int, default=DEFAULT_MAX_STREAM_SIZE,
+                        help="Tamanho máximo do corpo em stream, em bytes")
+    add_limit_arguments(parser)
+    args = parser.parse_args()
+
+    serve(args.host, args.port, workers=args.workers, queue_size=args.queue_size,
+          executor=args.executor, max_body_size=args.max_body_size,
+          max_stream_size=args.max_stream_size, limits=limits_from_args(args))
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,6 @@ Interface web para converter HTML para Markdown
 """
 
 import streamlit as st
-import io
-import traceback
 
 def main():
     """Função principal da aplicação Streamlit"""
@@ -28,40 +26,31 @@ def main():
         help="Cole o código HTML que deseja converter para Markdown"
     )
     
+    # Importar aqui para evitar problemas de importação circular
+    from htmltomd.converter import Converter
+    from htmltomd.ui.components import start_conversion, show_conversion
+    from htmltomd.ui.jobs import UPLOAD_LIMITS
+    
     if html_content and st.button("Converter"):
-        try:
-            # Importar aqui para evitar problemas de importação circular
-            from htmltomd.parser import parse_html
-            from htmltomd.parser.html_parser import process_headers, mark_page_breaks, remove_media, process_links
-            from htmltomd.converter import convert_to_markdown
-            
-            # Parsear o HTML
-            soup = parse_html(html_content)
-            
-            # Aplicar transformações
-            soup = mark_page_breaks(soup)
-            soup = remove_media(soup)
-            soup = process_links(soup)
-            soup = process_headers(soup)
-            
-            # Converter para Markdown
-            markdown_content = convert_to_markdown(soup)
-            
-            # Exibir prévia do Markdown
-            with st.expander("Prévia do Markdown", expanded=True):
-                st.text_area("", markdown_content, height=300)
-            
-            # Botão para download do arquivo Markdown
-            st.download_button(
-                label="Baixar arquivo Markdown",
-                data=markdown_content,
-                file_name="convertido.md",
-                mime="text/markdown",
-            )
-                
-        except Exception as e:
-            st.error(f"Erro ao converter o HTML: {str(e)}")
-            st.error(traceback.format_exc())
+        # A conversão roda no pool compartilhado; resultados iguais vêm do cache
+        converter = Converter(limits=UPLOAD_LIMITS)
+        start_conversion(html_content, converter.convert, converter.options)
+    
+    result = show_conversion()
+    if result is not None:
+        markdown_content, filename = result
+        
+        # Exibir prévia do Markdown
+        with st.expander("Prévia do Markdown", expanded=True):
+            st.text_area("", markdown_content, height=300)
+        
+        # Botão para download do arquivo Markdown
+        st.download_button(
+            label="Baixar arquivo Markdown",
+            data=markdown_content,
+            file_name=filename,
+            mime="text/markdown",
+        )
 
 if __name__ == "__main__":
     # Quando executado diretamente, não como módulo
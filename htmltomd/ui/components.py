@@ -0,0 +1,166 @@
+"""
+Componentes Streamlit compartilhados pelas interfaces
+
+Este módulo liga as interfaces ao pool de conversões em segundo plano: a
+conversão é submetida ao pool, a página acompanha o andamento sem bloquear
+as outras sessões e o usuário pode cancelar o job.
+"""
+
+from typing import BinaryIO, Callable, Optional, Tuple
+
+import streamlit as st
+
+from .jobs import get_job_manager, spool_upload
+
+# Intervalo entre as atualizações da página enquanto a conversão roda
+POLL_INTERVAL = 0.5
+
+# Caracteres do Markdown exibidos na prévia dos resultados em disco
+PREVIEW_CHARS = 20_000
+
+# Descrição de cada etapa das conversões de arquivos
+STAGE_LABELS = {
+    'pending': "Aguardando um worker livre...",
+    'decode': "Detectando a codificação...",
+    'convert': "Convertendo...",
+    'done': "Concluído",
+}
+
+try:
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    # Versões recentes leem os dados do download só quando o botão é clicado
+    DEFERRED_DOWNLOADS = hasattr(MediaFileManager, 'add_deferred')
+except ImportError:
+    DEFERRED_DOWNLOADS = False
+
+def start_conversion(html: str, convert: Callable[[str], str], options: dict,
+                     filename: str = "convertido.md", state_key: str = "conversion") -> None:
+    """
+    Submete uma conversão e a associa à sessão atual.
+
+    Uma conversão anterior da mesma sessão que ainda não terminou é
+    abandonada.
+
+    Args:
+        html (str): Conteúdo HTML a ser convertido
+        convert (Callable[[str], str]): Função de conversão
+        options (dict): Opções que identificam a conversão no cache
+        filename (str): Nome sugerido para o download
+        state_key (str): Chave da conversão no estado da sessão
+    """
+    manager = get_job_manager()
+    previous = st.session_state.get(state_key)
+    if previous is not None and not previous['job'].done():
+        manager.cancel(previous['job'])
+    st.session_state[state_key] = {
+        'job': manager.submit(html, convert, options),
+        'filename': filename,
+    }
+
+def start_file_conversion(uploaded: BinaryIO, converter, filename: str = "convertido.md",
+                          state_key: str = "conversion") -> None:
+    """
+    Grava um envio em disco e submete a sua conversão em fluxo.
+
+    Nem o HTML decodificado nem o Markdown passam pela memória da sessão;
+    show_conversion retorna o caminho do arquivo Markdown (veja
+    show_markdown_file).
+
+    Args:
+        uploaded (BinaryIO): Arquivo enviado pelo st.file_uploader
+        converter (Converter): Conversor com as opções e os limites
+        filename (str): Nome sugerido para o download
+        state_key (str): Chave da conversão no estado da sessão
+    """
+    manager = get_job_manager()
+    previous = st.session_state.get(state_key)
+    if previous is not None and not previous['job'].done():
+        manager.cancel(previous['job'])
+    st.session_state[state_key] = {
+        'job': manager.submit_file(spool_upload(uploaded), converter),
+        'filename': filename,
+    }
+
+def show_conversion(state_key: str = "conversion") -> Optional[Tuple[str, str]]:
+    """
+    Exibe o andamento da conversão da sessão e retorna o resultado.
+
+    Enquanto a conversão roda, mostra a etapa atual com uma barra de
+    progresso e um botão de cancelamento, e atualiza a página
+    periodicamente.
+
+    Args:
+        state_key (str): Chave da conversão no estado da sessão
+
+    Returns:
+        Optional[Tuple[str, str]]: Markdown (nas conversões de
+            start_file_conversion, o caminho do arquivo Markdown) e nome do
+            arquivo, ou None se não houver conversão concluída com sucesso
+    """
+    entry = st.session_state.get(state_key)
+    if entry is None:
+        return None
+    job = entry['job']
+
+    if not job.done():
+        stage, fraction = job.progress
+        if stage == 'pending' and job.future.running():
+            # Conversões de texto não informam etapas
+            st.info("Convertendo...")
+        else:
+            st.progress(fraction, text=STAGE_LABELS.get(stage, stage))
+        if st.button("Cancelar", key=f"{state_key}-cancel"):
+            get_job_manager().cancel(job)
+            del st.session_state[state_key]
+            st.warning("Conversão cancelada.")
+            return None
+        try:
+            job.result(timeout=POLL_INTERVAL)
+        except Exception:
+            # Tempo esgotado ou erro da conversão, tratado na próxima execução
+            pass
+        st.rerun()
+
+    if job.status == 'cancelled':
+        del st.session_state[state_key]
+        st.warning("Conversão cancelada.")
+        return None
+    if job.status == 'error':
+        st.error(f"Erro na conversão: {job.future.exception()}")
+        return None
+    return job.result(), entry['filename']
+
+def show_markdown_file(path: str, filename: str, label: str = "Baixar arquivo Markdown") -> None:
+    """
+    Exibe a prévia de um Markdown em disco e o botão de download.
+
+    Só o início do arquivo é lido para a prévia; o arquivo inteiro é lido
+    quando o download é pedido.
+
+    Args:
+        path (str): Arquivo Markdown, resultado de start_file_conversion
+        filename (str): Nome sugerido para o download
+        label (str): Texto do botão de download
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            preview = f.read(PREVIEW_CHARS)
+            truncated = bool(f.read(1))
+    except FileNotFoundError:
+        st.warning("O resultado não está mais disponível. Converta o arquivo novamente.")
+        return
+
+    with st.expander("Prévia do Markdown", expanded=True):
+        st.text_area("", preview, height=300)
+        if truncated:
+            st.caption(f"Prévia dos primeiros {PREVIEW_CHARS} caracteres; "
+                       "o download contém o arquivo completo.")
+
+    if DEFERRED_DOWNLOADS:
+        def data() -> bytes:
+            with open(path, 'rb') as f:
+                return f.read()
+    else:
+        with open(path, 'rb') as f:
+            data = f.read()
+    st.download_button(label=label, data=data, file_name=filename, mime="text/markdown")
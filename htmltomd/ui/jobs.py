@@ -0,0 +1,437 @@
+"""
+Conversões em segundo plano para as interfaces
+
+Este módulo mantém um pool de threads compartilhado por todas as sessões de
+uma instância da interface, com cache dos resultados pelo hash do conteúdo
+e das opções. Conversões idênticas pedidas ao mesmo tempo por sessões
+diferentes são executadas uma única vez.
+
+Envios grandes não passam pela memória da sessão: o arquivo é gravado em
+disco (spool_upload), convertido em fluxo por um worker, que informa o
+andamento de cada etapa, e o Markdown fica em disco até o download.
+"""
+
+import io
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+import weakref
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Dict, Iterator, Optional, Tuple
+
+from htmltomd.cache import ConversionCache
+from htmltomd.encoding import sniff_encoding
+from htmltomd.limits import ConversionCancelled, Limits, cancellation
+from htmltomd.output import atomic_writer
+
+# Conversões simultâneas do pool compartilhado
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+# Limites das conversões das interfaces, para que um envio patológico não
+# ocupe um worker do pool compartilhado por minutos
+UPLOAD_LIMITS = Limits(max_input_bytes=50 * 1024 * 1024, max_nodes=5_000_000,
+                       max_depth=5_000, timeout=120)
+
+# Tamanho de cada leitura ao gravar envios em disco e ao convertê-los
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+# Espaço em disco ocupado pelos resultados das conversões de arquivos
+DEFAULT_RESULT_BYTES = 1024 * 1024 * 1024
+
+# Etapas informadas pelas conversões de arquivos
+STAGES = ('pending', 'decode', 'convert', 'done')
+
+def spool_upload(source: BinaryIO, directory: Optional[str] = None) -> str:
+    """
+    Grava um envio em um arquivo temporário, em pedaços.
+
+    Args:
+        source (BinaryIO): Arquivo enviado, lido desde o início
+        directory (str, optional): Diretório do temporário
+
+    Returns:
+        str: Caminho do arquivo gravado; quem o recebe deve removê-lo (veja
+            JobManager.submit_file)
+    """
+    fd, path = tempfile.mkstemp(prefix='htmltomd-upload-', suffix='.html', dir=directory)
+    try:
+        with open(fd, 'wb') as f:
+            source.seek(0)
+            shutil.copyfileobj(source, f, SPOOL_CHUNK_SIZE)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+def _file_key(path: str, options: dict) -> str:
+    """Chave de cache do conteúdo de um arquivo, sem lê-lo para a memória."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ConversionCache.make_key(b'', options)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return ConversionCache.make_key(data, options)
+
+def _discard(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+class _CountingReader(io.RawIOBase):
+    """Leitor que conta os bytes já lidos do arquivo, para o andamento."""
+
+    def __init__(self, raw: BinaryIO):
+        self._raw = raw
+        self.count = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> Optional[int]:
+        size = self._raw.readinto(buffer)
+        if size:
+            self.count += size
+        return size
+
+def convert_file(converter, source_path: str, target_path: str,
+                 report: Callable[[str, float], None],
+                 cancelled: Optional[threading.Event] = None) -> None:
+    """
+    Converte um arquivo HTML em disco, em fluxo, gravando o Markdown em disco.
+
+    Args:
+        converter (Converter): Conversor com as opções e os limites
+        source_path (str): Arquivo HTML
+        target_path (str): Arquivo Markdown, substituído só ao final
+        report (Callable[[str, float], None]): Recebe a etapa e a fração
+            concluída dela
+        cancelled (threading.Event, optional): Interrompe a conversão
+            quando ativado, verificado a cada pedaço lido
+
+    Raises:
+        BudgetExceeded: Se o arquivo ou o prazo ultrapassarem os limites
+        ConversionCancelled: Se a conversão for cancelada
+    """
+    size = os.path.getsize(source_path)
+    report('decode', 0.0)
+    with open(source_path, 'rb') as raw:
+        if size == 0:
+            encoding = 'utf-8'
+        else:
+            # Detectada no arquivo mapeado, sem lê-lo para a memória
+            with mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                encoding = sniff_encoding(data)
+
+        def chunks() -> Iterator[str]:
+            # O andamento vem dos bytes entregues ao decodificador
+            counter = _CountingReader(raw)
+            with io.TextIOWrapper(io.BufferedReader(counter, SPOOL_CHUNK_SIZE),
+                                  encoding=encoding, errors='replace') as text:
+                while True:
+                    if cancelled is not None and cancelled.is_set():
+                        raise ConversionCancelled('convert')
+                    chunk = text.read(SPOOL_CHUNK_SIZE)
+                    if not chunk:
+                        return
+                    report('convert', min(counter.count / size, 1.0))
+                    yield chunk
+
+        report('convert', 0.0)
+        with atomic_writer(target_path) as target:
+            converter.convert_to(chunks(), target)
+    report('done', 1.0)
+
+class ConversionJob:
+    """
+    Conversão submetida ao pool.
+
+    Várias sessões podem acompanhar o mesmo job; ele só é cancelado quando
+    todas desistem dele. Um job em execução é interrompido no próximo ponto
+    de verificação do orçamento da conversão (veja htmltomd.limits).
+    """
+
+    def __init__(self, key: str, future: Optional[Future]):
+        self.key = key
+        self.future = future
+        self.watchers = 1
+        # Ativado quando a última sessão desiste do job
+        self.cancelled = threading.Event()
+        # Etapa e fração concluída, nas conversões de arquivos
+        self.progress: Tuple[str, float] = ('pending', 0.0)
+
+    def report(self, stage: str, fraction: float) -> None:
+        """
+        Registra o andamento; chamado pelo worker.
+
+        Args:
+            stage (str): Uma das etapas de STAGES
+            fraction (float): Fração concluída da etapa, entre 0 e 1
+        """
+        self.progress = (stage, fraction)
+
+    @property
+    def status(self) -> str:
+        """Estado do job: 'pending', 'running', 'done', 'cancelled' ou 'error'."""
+        if self.future.cancelled():
+            return 'cancelled'
+        if self.future.done():
+            error = self.future.exception()
+            if error is None:
+                return 'done'
+            return 'cancelled' if isinstance(error, ConversionCancelled) else 'error'
+        return 'running' if self.future.running() else 'pending'
+
+    def done(self) -> bool:
+        """Indica se o job terminou, com sucesso, erro ou cancelamento."""
+        return self.future.done()
+
+    def result(self, timeout: Optional[float] = None) -> str:
+        """
+        Retorna o Markdown convertido, aguardando se necessário.
+
+        Args:
+            timeout (float, optional): Tempo máximo de espera em segundos
+
+        Returns:
+            str: Conteúdo convertido para Markdown, ou o caminho do arquivo
+                Markdown nos jobs de submit_file
+        """
+        return self.future.result(timeout)
+
+class JobManager:
+    """
+    Pool de conversões compartilhado, com cache de resultados.
+
+    Uso:
+        manager = get_job_manager()
+        job = manager.submit(html, convert, options)
+        ...
+        if job.done():
+            markdown = job.result()
+
+        job = manager.submit_file(spool_upload(uploaded), converter)
+        stage, fraction = job.progress
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, cache: Optional[ConversionCache] = None,
+                 max_result_bytes: int = DEFAULT_RESULT_BYTES):
+        """
+        Args:
+            workers (int): Conversões simultâneas
+            cache (ConversionCache, optional): Cache dos resultados; usa o
+                cache em disco padrão quando omitido
+            max_result_bytes (int): Espaço em disco dos arquivos Markdown
+                das conversões de arquivos; os menos usados são removidos,
+                exceto os ainda devolvidos por algum job existente
+        """
+        self.cache = cache if cache is not None else ConversionCache()
+        self.max_result_bytes = max_result_bytes
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix='htmltomd-ui')
+        self._jobs: Dict[str, ConversionJob] = {}
+        # Reentrante: a liberação de um job coletado pode ocorrer com o lock tomado
+        self._lock = threading.RLock()
+        self._results_dir = tempfile.mkdtemp(prefix='htmltomd-results-')
+        # Tamanho de cada resultado em disco, do menos para o mais usado
+        self._results: 'OrderedDict[str, int]' = OrderedDict()
+        self._results_size = 0
+        # Jobs de arquivos existentes por chave; os resultados deles não são removidos
+        self._pins: Counter = Counter()
+
+    def submit(self, html: str, convert: Callable[[str], str],
+               options: Optional[dict]) -> ConversionJob:
+        """
+        Submete uma conversão, reaproveitando o cache e jobs em andamento.
+
+        Args:
+            html (str): Conteúdo HTML a ser convertido
+            convert (Callable[[str], str]): Função de conversão
+            options (dict, optional): Opções que identificam a conversão no
+                cache; None (regras sem chave estável) não usa o cache
+
+        Returns:
+            ConversionJob: Job da conversão, já concluído em caso de acerto
+                no cache
+        """
+        if options is None:
+            key = uuid.uuid4().hex
+            with self._lock:
+                job = self._jobs[key] = ConversionJob(key, None)
+                job.future = self._executor.submit(self._run, job, html, convert, False)
+                return job
+        key = ConversionCache.make_key(html, options)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                job.watchers += 1
+                return job
+
+        markdown = self.cache.get(key)
+        if markdown is not None:
+            future = Future()
+            future.set_result(markdown)
+            return ConversionJob(key, future)
+
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                job.watchers += 1
+                return job
+            job = self._jobs[key] = ConversionJob(key, None)
+            job.future = self._executor.submit(self._run, job, html, convert)
+            return job
+
+    def _forget(self, job: ConversionJob) -> None:
+        # Um job cancelado pode já ter sido substituído por outro com a mesma chave
+        with self._lock:
+            if self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
+
+    def _run(self, job: ConversionJob, html: str, convert: Callable[[str], str],
+             store: bool = True) -> str:
+        try:
+            with cancellation(job.cancelled):
+                markdown = convert(html)
+            if store:
+                self.cache.put(job.key, markdown)
+            return markdown
+        finally:
+            self._forget(job)
+
+    def submit_file(self, path: str, converter) -> ConversionJob:
+        """
+        Submete a conversão de um arquivo em disco, em fluxo.
+
+        O arquivo passa a pertencer ao pool e é removido depois da conversão.
+        O resultado do job é o caminho de um arquivo Markdown, mantido
+        enquanto o job existir, ou seja, enquanto alguma sessão o guardar, e
+        depois enquanto houver espaço (veja max_result_bytes); o mesmo
+        conteúdo enviado de novo, por qualquer sessão, reaproveita esse
+        arquivo.
+
+        Args:
+            path (str): Arquivo HTML, por exemplo gravado por spool_upload
+            converter (Converter): Conversor com as opções e os limites
+
+        Returns:
+            ConversionJob: Job da conversão, com o andamento em ``progress``
+        """
+        options = converter.options
+        if options is None:
+            # Regras sem chave estável: o resultado não é compartilhado
+            key = uuid.uuid4().hex
+        else:
+            key = _file_key(path, dict(options, mode='file'))
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                job.watchers += 1
+            elif key in self._results:
+                self._results.move_to_end(key)
+                future = Future()
+                future.set_result(self._result_path(key))
+                job = self._pin(ConversionJob(key, future))
+                job.report('done', 1.0)
+            else:
+                job = self._jobs[key] = self._pin(ConversionJob(key, None))
+                job.future = self._executor.submit(self._run_file, job, path, converter)
+
+                def discard_cancelled(future: Future) -> None:
+                    # Cancelado antes de começar, o worker não chega a remover o arquivo
+                    if future.cancelled():
+                        _discard(path)
+
+                job.future.add_done_callback(discard_cancelled)
+                return job
+        _discard(path)
+        return job
+
+    def _result_path(self, key: str) -> str:
+        return os.path.join(self._results_dir, f'{key}.md')
+
+    def _pin(self, job: ConversionJob) -> ConversionJob:
+        # O resultado fica protegido até o job ser coletado
+        self._pins[job.key] += 1
+        weakref.finalize(job, self._unpin, job.key)
+        return job
+
+    def _unpin(self, key: str) -> None:
+        with self._lock:
+            self._pins[key] -= 1
+            if self._pins[key] <= 0:
+                del self._pins[key]
+
+    def _run_file(self, job: ConversionJob, path: str, converter) -> str:
+        target = self._result_path(job.key)
+        try:
+            with cancellation(job.cancelled):
+                convert_file(converter, path, target, job.report, job.cancelled)
+            size = os.path.getsize(target)
+            with self._lock:
+                # Um job cancelado tarde pode ter gravado a mesma chave
+                self._results_size += size - self._results.pop(job.key, 0)
+                self._results[job.key] = size
+                # O resultado recém-gravado e os de jobs ainda guardados por
+                # alguma sessão ficam mesmo acima do limite
+                for evicted in [key for key in self._results if not self._pins.get(key)]:
+                    if self._results_size <= self.max_result_bytes:
+                        break
+                    if evicted == job.key:
+                        continue
+                    self._results_size -= self._results.pop(evicted)
+                    _discard(self._result_path(evicted))
+            return target
+        finally:
+            _discard(path)
+            self._forget(job)
+
+    def cancel(self, job: ConversionJob) -> bool:
+        """
+        Desiste de um job.
+
+        O job é cancelado quando nenhuma outra sessão o acompanha: se ainda
+        não começou, não chega a executar; em execução, é interrompido no
+        próximo ponto de verificação e termina com ConversionCancelled, sem
+        guardar resultado. Pedidos seguintes do mesmo conteúdo começam um
+        job novo.
+
+        Args:
+            job (ConversionJob): Job a abandonar
+
+        Returns:
+            bool: True se o job foi cancelado; False se outra sessão ainda o
+                acompanha ou se ele já terminou
+        """
+        with self._lock:
+            job.watchers -= 1
+            if job.watchers > 0 or job.future.done():
+                return False
+            job.cancelled.set()
+            job.future.cancel()
+            if self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
+            return True
+
+    def shutdown(self) -> None:
+        """Encerra o pool sem aguardar os jobs em andamento e remove os resultados em disco."""
+        self._executor.shutdown(wait=False)
+        shutil.rmtree(self._results_dir, ignore_errors=True)
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+def get_job_manager() -> JobManager:
+    """
+    Retorna o JobManager compartilhado pelo processo.
+
+    Returns:
+        JobManager: Instância única, criada no primeiro uso
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
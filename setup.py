@@ -21,8 +21,13 @@ setup(
     install_requires=[
         "beautifulsoup4>=4.11.1",
         "html2text>=2020.1.16",
-        "streamlit>=1.22.0",
     ],
+    extras_require={
+        "ui": ["streamlit>=1.22.0"],
+        "lxml": ["lxml>=4.9.0"],
+        "html5lib": ["html5lib>=1.1"],
+        "server": ["starlette>=0.27.0", "uvicorn>=0.22.0"],
+    },
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",
@@ -36,7 +41,7 @@ setup(
     python_requires=">=3.7",
     entry_points={
         "console_scripts": [
-            "htmltomd=htmltomd.ui.app:main",
+            "htmltomd=htmltomd.cli:main",
         ],
     },
 )
\ No newline at end of file
@@ -6,7 +6,8 @@ Testes para o conversor de HTML para Markdown
 import unittest
 import tempfile
 import os
-from html_to_md_converter import convert_headers, remove_media_and_links, mark_page_breaks, remove_page_number_spans, process_file
+import io
+from html_to_md_converter import SinglePassConverter, convert_headers, remove_media_and_links, mark_page_breaks, remove_page_number_spans, process_file, process_batch, convert_html
 
 class TestHTMLToMarkdownConverter(unittest.TestCase):
     """Testes para o conversor de HTML para Markdown"""
@@ -110,6 +111,34 @@ class TestHTMLToMarkdownConverter(unittest.TestCase):
         """
         self.assertEqual(remove_media_and_links(html), expected)
     
+    def test_convert_html_single_pass(self):
+        """Testa se a varredura única equivale à aplicação das regras em sequência"""
+        def sequential(html):
+            html = mark_page_breaks(html)
+            html = remove_media_and_links(html)
+            html = remove_page_number_spans(html)
+            return convert_headers(html)
+        
+        example = os.path.join(os.path.dirname(__file__), 'examples', 'example.html')
+        with open(example, 'r', encoding='utf-8') as f:
+            documents = [f.read()]
+        documents += [
+            '<h2>Capítulo <a href="#x">um</a></h2><span class="p-Pagina"> 12 e 13 </span><p>Texto</p>',
+            '<H1 class="titulo">Título</H1><VIDEO><source src="v.mp4"><h2>oculto</h2></VIDEO>',
+            '<p class="numero p-Pagina">7</p><h3 class="p-Pagina">8</h3><img src="a.png">',
+            '<p><a name="sem-fechamento">texto</p><video>sem fechamento<h4>Fim</h4>',
+            '<a href="1">um</a> e <a href="2"><strong>dois</strong></a><h5>A</h5><h6>B</h6>',
+        ]
+        for html in documents:
+            self.assertEqual(convert_html(html), sequential(html))
+        
+        # Gravação em pedaços, com mais trechos que FLUSH_PIECES
+        html = '<h2>Título <a href="#">link</a></h2><img src="a.png">' * 2000
+        self.assertGreater(len(list(SinglePassConverter(html).iter_chunks())), 1)
+        target = io.BytesIO()
+        SinglePassConverter(html).write(target)
+        self.assertEqual(target.getvalue().decode('utf-8'), sequential(html))
+    
     def test_process_file(self):
         """Testa o processamento de arquivo"""
         # Criar arquivo temporário para teste
@@ -140,5 +169,70 @@ class TestHTMLToMarkdownConverter(unittest.TestCase):
             if os.path.exists(temp_md_path):
                 os.unlink(temp_md_path)
 
+    def test_process_file_legacy_encoding(self):
+        """Testa a detecção da codificação de arquivos legados"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = os.path.join(temp_dir, 'legado.html')
+            output_path = os.path.join(temp_dir, 'legado.md')
+            with open(input_path, 'wb') as f:
+                f.write("<h1>Introdução</h1><p>Ação</p>".encode('cp1252'))
+            
+            self.assertTrue(process_file(input_path, output_path))
+            with open(output_path, 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), "# Introdução<p>Ação</p>")
+    
+    def test_process_batch(self):
+        """Testa a conversão em lote de uma árvore de diretórios"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_dir = os.path.join(temp_dir, 'entrada')
+            output_dir = os.path.join(temp_dir, 'saida')
+            os.makedirs(os.path.join(input_dir, 'cap1'))
+            
+            with open(os.path.join(input_dir, 'index.html'), 'w', encoding='utf-8') as f:
+                f.write("<h1>Livro</h1>")
+            with open(os.path.join(input_dir, 'cap1', 'pagina.htm'), 'w', encoding='utf-8') as f:
+                f.write("<h2>Capítulo</h2><a href='x.html'>Link</a>")
+            # Arquivo ilegível deve falhar sem interromper o lote
+            os.symlink(os.path.join(temp_dir, 'inexistente.html'),
+                       os.path.join(input_dir, 'cap1', 'invalido.html'))
+            with open(os.path.join(input_dir, 'notas.txt'), 'w', encoding='utf-8') as f:
+                f.write("ignorado")
+            
+            summary = process_batch([input_dir], output_dir, workers=2, batch_size=1)
+            
+            self.assertEqual(summary['total'], 3)
+            self.assertEqual(summary['converted'], 2)
+            self.assertEqual(summary['failed'], 1)
+            self.assertTrue(summary['errors'][0][0].endswith('invalido.html'))
+            
+            with open(os.path.join(output_dir, 'index.md'), 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), "# Livro")
+            with open(os.path.join(output_dir, 'cap1', 'pagina.md'), 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), "## CapítuloLink")
+            
+            # Padrões glob também são aceitos
+            glob_output = os.path.join(temp_dir, 'saida_glob')
+            summary = process_batch([os.path.join(input_dir, '**', 'pagina.htm')], glob_output, workers=1)
+            self.assertEqual(summary['converted'], 1)
+            self.assertTrue(os.path.exists(os.path.join(glob_output, 'cap1', 'pagina.md')))
+            
+            # Entradas com a mesma saída não sobrescrevem uma à outra
+            other = os.path.join(temp_dir, 'outro', 'index.html')
+            os.makedirs(os.path.dirname(other))
+            with open(other, 'w', encoding='utf-8') as f:
+                f.write("<h1>Outro</h1>")
+            same_output = os.path.join(temp_dir, 'saida_repetida')
+            summary = process_batch([os.path.join(input_dir, 'index.html'), other], same_output)
+            self.assertEqual((summary['total'], summary['converted'], summary['failed']), (2, 1, 1))
+            self.assertEqual(summary['errors'][0][0], os.path.normpath(other))
+            with open(os.path.join(same_output, 'index.md'), 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), "# Livro")
+            
+            with self.assertRaises(ValueError):
+                process_batch([input_dir], output_dir, batch_size=0)
+            for workers in (0, -2):
+                with self.assertRaises(ValueError):
+                    process_batch([input_dir], output_dir, workers=workers)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
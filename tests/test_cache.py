@@ -0,0 +1,105 @@
+"""
+Testes para o módulo cache
+"""
+
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from htmltomd.cache import ConversionCache, FragmentCache
+from htmltomd.converter import Converter, convert_to_markdown
+
+def _put_entries(path, prefix):
+    """Grava entradas a partir de outro processo."""
+    with ConversionCache(path) as cache:
+        for i in range(20):
+            cache.put(cache.make_key(f"{prefix}{i}"), f"md {prefix}{i}")
+    return True
+
+class TestCache(unittest.TestCase):
+    """Testes para o cache de conversões"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'cache.sqlite3')
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_make_key(self):
+        """Testa se a chave depende do conteúdo e das opções"""
+        key = ConversionCache.make_key("<p>x</p>", {'emitter': 'native'})
+        self.assertEqual(key, ConversionCache.make_key(b"<p>x</p>", {'emitter': 'native'}))
+        self.assertNotEqual(key, ConversionCache.make_key("<p>y</p>", {'emitter': 'native'}))
+        self.assertNotEqual(key, ConversionCache.make_key("<p>x</p>", {'emitter': 'html2text'}))
+    
+    def test_hits_and_misses(self):
+        """Testa os contadores de acertos e falhas"""
+        with ConversionCache(self.path) as cache:
+            html = "<h1>Título</h1><p>Texto</p>"
+            first = convert_to_markdown(html, cache=cache)
+            second = convert_to_markdown(html, cache=cache)
+            self.assertEqual(first, second)
+            self.assertEqual(first, convert_to_markdown(html))
+            
+            stats = cache.stats()
+            self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 1, 1))
+            
+            # Opções diferentes geram outra entrada
+            convert_to_markdown(html, emitter='native', cache=cache)
+            self.assertEqual(cache.stats()['entries'], 2)
+    
+    def test_lru_eviction(self):
+        """Testa o descarte das entradas usadas há mais tempo"""
+        with ConversionCache(self.path, max_bytes=30) as cache:
+            cache.put('a', 'x' * 10)
+            cache.put('b', 'y' * 10)
+            cache.put('c', 'z' * 10)
+            # Usar 'a' faz com que 'b' seja a entrada mais antiga
+            self.assertEqual(cache.get('a'), 'x' * 10)
+            cache.put('d', 'w' * 10)
+            
+            self.assertIsNone(cache.get('b'))
+            self.assertIsNotNone(cache.get('a'))
+            self.assertIsNotNone(cache.get('d'))
+            self.assertLessEqual(cache.stats()['bytes'], 30)
+    
+    def test_concurrent_processes(self):
+        """Testa a escrita simultânea por vários processos"""
+        with ProcessPoolExecutor(max_workers=3) as executor:
+            results = list(executor.map(_put_entries, [self.path] * 3, ['a', 'b', 'c']))
+        self.assertEqual(results, [True] * 3)
+        with ConversionCache(self.path) as cache:
+            self.assertEqual(cache.stats()['entries'], 60)
+
+    def test_fragment_cache(self):
+        """Testa o reaproveitamento de fragmentos entre documentos"""
+        cache = FragmentCache(max_size=30)
+        cache.put('a', 'x' * 10)
+        cache.put('b', 'y' * 10)
+        cache.put('c', 'z' * 10)
+        self.assertEqual(cache.get('a'), 'x' * 10)
+        cache.put('d', 'w' * 10)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['size'], 30)
+
+        sections = [f'<section><h2>Seção {n}</h2><p>Texto da seção {n} com <a href="#">link</a> '
+                    f'e <img src="x.png">.</p><ul><li>Item {n}</li></ul></section>' for n in range(60)]
+        html = '<html><body><div class="livro">' + ''.join(sections) + '</div></body></html>'
+        edited = html.replace('Seção 30', 'Seção revisada')
+        for emitter in ('html2text', 'native'):
+            cache = FragmentCache(block_size=256)
+            converter = Converter(emitter=emitter, fragment_cache=cache)
+            self.assertEqual(converter.convert(html), Converter(emitter=emitter).convert(html))
+            misses = cache.misses
+            self.assertGreater(misses, 4)
+            self.assertEqual(cache.hits, 0)
+
+            # Só os fragmentos em volta da seção editada são convertidos de novo
+            self.assertEqual(converter.convert(edited), Converter(emitter=emitter).convert(edited))
+            self.assertLessEqual(cache.misses - misses, 2)
+            self.assertGreaterEqual(cache.hits, misses - 2)
+
+if __name__ == "__main__":
+    unittest.main()
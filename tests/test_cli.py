@@ -0,0 +1,87 @@
+"""
+Testes para a interface de linha de comando
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from htmltomd import cli
+from htmltomd.converter import Converter
+
+HTML = '<h1>Título</h1><p>Texto com <a href="#">link</a>.</p><img src="x.png">'
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_module(*args, input=None):
+    """Executa ``python -m htmltomd`` em um processo separado."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run([sys.executable, '-m', 'htmltomd', *args], input=input,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+
+class TestCli(unittest.TestCase):
+    """Testes para o comando htmltomd"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_input(self, name, content=HTML):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def test_convert_files(self):
+        """Testa a conversão de arquivos para arquivo e para diretório"""
+        first = self.write_input('a.html')
+        second = self.write_input('b.htm', '<p>Outro</p>')
+        output = os.path.join(self.temp_dir.name, 'a.md')
+
+        self.assertEqual(cli.main(['convert', first, '-o', output, '--emitter', 'native']), 0)
+        with open(output, encoding='utf-8') as f:
+            self.assertEqual(f.read(), Converter(emitter='native').convert(HTML))
+
+        output_dir = os.path.join(self.temp_dir.name, 'saida')
+        self.assertEqual(cli.main(['convert', first, second, '-d', output_dir, '--stream']), 0)
+        self.assertEqual(sorted(os.listdir(output_dir)), ['a.md', 'b.md'])
+        with open(os.path.join(output_dir, 'b.md'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), Converter().convert('<p>Outro</p>'))
+
+        # Várias entradas sem diretório de saída e entradas inexistentes
+        self.assertEqual(cli.main(['convert', first, second]), 2)
+        self.assertEqual(cli.main(['convert', first, 'inexistente.html', '-d', output_dir]), 1)
+
+        # Entradas de diretórios diferentes com o mesmo nome gerariam a mesma saída
+        os.makedirs(os.path.join(self.temp_dir.name, 'outro'))
+        third = self.write_input(os.path.join('outro', 'a.html'), '<p>Terceiro</p>')
+        self.assertEqual(cli.main(['convert', first, third, '-d', output_dir]), 2)
+        with open(os.path.join(output_dir, 'a.md'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), Converter().convert(HTML))
+
+        # A conversão incremental não usa limites, cache de fragmentos nem medições
+        for option in (['--timeout', '5'], ['--fragment-cache'], ['--stats', '-']):
+            self.assertEqual(cli.main(['convert', first, '-o', output, '--incremental'] + option), 2)
+
+    def test_stdin_without_streamlit(self):
+        """Testa a leitura da entrada padrão sem carregar o Streamlit"""
+        result = run_module('convert', input=HTML.encode('utf-8'))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.decode('utf-8'), Converter().convert(HTML))
+
+        # Entrada legada em Windows-1252, detectada sem --encoding
+        for args in (('convert',), ('convert', '--stream')):
+            result = run_module(*args, input=HTML.encode('cp1252'))
+            self.assertEqual(result.stdout.decode('utf-8'), Converter().convert(HTML))
+
+        code = ("import sys; from htmltomd import cli; cli.main(['--version']); "
+                "assert 'streamlit' not in sys.modules and 'bs4' not in sys.modules")
+        result = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, env=dict(os.environ, PYTHONPATH=ROOT))
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+if __name__ == "__main__":
+    unittest.main()
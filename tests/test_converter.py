@@ -71,6 +71,238 @@ class TestConverter(unittest.TestCase):
         self.assertNotIn('<img', markdown)
         self.assertNotIn('<video', markdown)
         self.assertNotIn('<a href', markdown)
+    
+    def test_native_emitter(self):
+        """Testa se o emissor nativo gera o mesmo Markdown que o html2text"""
+        from htmltomd.parser import apply_transforms
+        
+        documents = [
+            "<p>Texto simples</p>",
+            """
+            <h1>Título Principal</h1>
+            <p>Texto com <img src="imagem.jpg"> e <a href="link.html">link</a>.</p>
+            <span class="p-Pagina">42</span>
+            <h2>Subtítulo</h2>
+            <video controls><source src="video.mp4"></video>
+            <p>Mais <a href="outro.html">outro link</a> aqui.</p>
+            <h3>Seção</h3>
+            """,
+            """
+            <ul><li>Item <b>negrito</b></li><li>Item <em>ênfase</em></li></ul>
+            <ol><li>1. Primeiro</li><li>- Segundo &amp; terceiro</li></ol>
+            <blockquote><p>Citação<br>em duas linhas</p></blockquote>
+            <pre>código
+  recuado</pre>
+            <table><tr><th>a</th><th>b</th></tr><tr><td>1</td><td>2</td></tr></table>
+            """,
+        ]
+        
+        for html in documents:
+            expected = convert_to_markdown(apply_transforms(parse_html(html)))
+            result = convert_to_markdown(apply_transforms(parse_html(html)), emitter='native')
+            self.assertEqual(result, expected)
+        
+        with self.assertRaises(ValueError):
+            convert_to_markdown("<p>x</p>", emitter='desconhecido')
+    
+    def test_converter_class(self):
+        """Testa o conversor reutilizável, inclusive entre threads"""
+        from concurrent.futures import ThreadPoolExecutor
+        from htmltomd.converter import Converter
+        from htmltomd.parser import apply_transforms
+        
+        html = """
+        <h1>Título</h1>
+        <p>Texto com <img src="imagem.jpg"> e <a href="link.html">link</a>.</p>
+        <span class="p-Pagina">42</span>
+        <ul><li>Item</li></ul>
+        """
+        expected = convert_to_markdown(apply_transforms(parse_html(html)))
+        
+        for emitter in ('html2text', 'native'):
+            converter = Converter(emitter=emitter, backend='auto')
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(converter.convert, [html] * 20))
+            self.assertEqual(results, [expected] * 20)
+            self.assertEqual(''.join(converter.convert_stream([html])), expected)
+        
+        with self.assertRaises(ValueError):
+            Converter(emitter='desconhecido')
+    
+    def test_convert_stream(self):
+        """Testa a conversão em fluxo com pedaços pequenos"""
+        from htmltomd.parser import apply_transforms
+        from htmltomd.converter import Converter
+        from htmltomd.converter.streaming import convert_stream, StreamingConverter
+        
+        html = """
+        <html><body><div class="livro">
+        <h1>Título Principal</h1>
+        <p>Texto com <img src="imagem.jpg"> e <a href="link.html">link</a>.</p>
+        <span class="p-Pagina">42</span>
+        <section><h2>Subtítulo</h2><ul><li>Item 1</li><li>Item 2</li></ul></section>
+        <video controls><source src="video.mp4"></video>
+        <p>Mais <a href="outro.html">outro link</a> aqui.</p>
+        <h3>Seção</h3>
+        </div></body></html>
+        """
+        expected = convert_to_markdown(apply_transforms(parse_html(html)))
+        chunks = [html[i:i + 16] for i in range(0, len(html), 16)]
+        
+        for emitter in ('html2text', 'native'):
+            self.assertEqual(''.join(convert_stream(chunks, emitter=emitter)), expected)
+        
+        # Blocos convertidos um a um, sem agrupamento
+        converter = StreamingConverter(block_size=0)
+        pieces = []
+        for chunk in chunks:
+            pieces.extend(converter.feed(chunk))
+        pieces.extend(converter.close())
+        self.assertGreater(len(pieces), 1)
+        
+        # 'auto' é resolvido antes de entrar nas opções e nas chaves de cache
+        converter = StreamingConverter(backend='auto')
+        self.assertEqual(converter.backend, Converter(backend='auto').backend)
+        self.assertEqual(''.join(converter.feed(html) + converter.close()), expected)
+        self.assertEqual(''.join(pieces), expected)
+    
+    def test_markdown_cleaner(self):
+        """Testa a limpeza incremental e o custo linear da remoção de spans"""
+        from htmltomd.converter import MarkdownCleaner
+        
+        markdown = (
+            "\n\n\nTítulo\n\n\n\n`<span class=\"numero p-Pagina\">12 e 13</span>`\n"
+            "Texto <span>comum</span> e <span\nclass=\"p-Pagina\">14</span> fim\n\n\n \n"
+        )
+        for strip in (True, False):
+            expected = clean_markdown(markdown, strip=strip)
+            for size in (1, 3, 7, len(markdown)):
+                cleaner = MarkdownCleaner(strip=strip)
+                pieces = [cleaner.feed(markdown[i:i + size]) for i in range(0, len(markdown), size)]
+                pieces.append(cleaner.close())
+                self.assertEqual(''.join(pieces), expected)
+        self.assertEqual(clean_markdown(markdown), "Título\n\n\nTexto <span>comum</span> e  fim")
+        
+        # Spans sem fechamento não tornam a limpeza quadrática
+        markdown = '<span class="p-Pagina">x' * 50000
+        self.assertEqual(clean_markdown(markdown), markdown)
+    
+    def test_pages(self):
+        """Testa a divisão do Markdown por página e o manifesto"""
+        import json
+        import os
+        import tempfile
+        from htmltomd.converter import (
+            iter_pages, split_pages, write_pages, convert_file_pages, PageSplitter, Converter
+        )
+        
+        html = """
+        <h1>Livro</h1><p>Apresentação</p>
+        <span class="p-Pagina">11</span><p>Primeira página</p>
+        <span class="p-Pagina">12 e 13</span><p>Página dupla</p>
+        """
+        pages = list(iter_pages([html[i:i + 10] for i in range(0, len(html), 10)]))
+        self.assertEqual([label for label, _ in pages], [None, '11', '12 e 13'])
+        self.assertIn('Página dupla', pages[2][1])
+        self.assertEqual(''.join(markdown for _, markdown in pages), Converter().convert(html))
+        
+        # Marcador dividido entre dois pedaços
+        splitter = PageSplitter()
+        pieces = splitter.feed('Texto <!-- Pági') + splitter.feed('na 7 -->7 fim') + splitter.close()
+        self.assertEqual(pieces, [(None, 'Texto '), ('7', '<!-- Página 7 -->7 fim')])
+        self.assertEqual(split_pages('Texto <!-- Página 7 -->7 fim'), pieces)
+        
+        with tempfile.TemporaryDirectory() as output_dir:
+            manifest = write_pages(pages, output_dir)
+            self.assertEqual(manifest['pages'][2], {'label': '12 e 13', 'numbers': [12, 13],
+                                                    'file': 'pagina-0003.md'})
+            with open(os.path.join(output_dir, 'manifest.json'), encoding='utf-8') as f:
+                self.assertEqual(json.load(f), manifest)
+            with open(os.path.join(output_dir, 'pagina-0002.md'), encoding='utf-8') as f:
+                self.assertIn('Primeira página', f.read())
+            
+            # Entrada legada: a codificação é detectada, e só os arquivos
+            # finais ficam no diretório
+            input_file = os.path.join(output_dir, 'livro.html')
+            with open(input_file, 'wb') as f:
+                f.write(html.encode('cp1252'))
+            pages_dir = os.path.join(output_dir, 'paginas')
+            manifest = convert_file_pages(input_file, pages_dir, chunk_size=16)
+            self.assertEqual(sorted(os.listdir(pages_dir)),
+                             ['manifest.json', 'pagina-0001.md', 'pagina-0002.md', 'pagina-0003.md'])
+            with open(os.path.join(pages_dir, 'pagina-0002.md'), encoding='utf-8') as f:
+                self.assertIn('Primeira página', f.read())
+    
+    def test_convert_parallel(self):
+        """Testa a conversão paralela cortando o documento nas páginas"""
+        from htmltomd.converter import Converter, convert_parallel
+        from htmltomd.parser.chunker import split_document
+        
+        pages = []
+        for number in range(1, 41):
+            pages.append(f"""
+            <section><span class="p-Pagina">{number}</span>
+            <h2>Seção {number}</h2>
+            <p>Texto da página {number} com <a href="#">link</a> e <img src="x.png"></p>
+            <ul><li>Item {number}</li></ul>
+            <div class="p-Pagina"><p>{number} e {number + 1}</p></div>
+            </section>""")
+        html = '<html><body><div class="livro">' + ''.join(pages) + '</div></body></html>'
+        
+        chunks = split_document(html, 4)
+        self.assertEqual(len(chunks), 4)
+        self.assertTrue(all(chunk.startswith('<html><body><div class="livro">') for chunk in chunks[1:]))
+        self.assertTrue(all('<span class="p-Pagina">' in chunk for chunk in chunks[1:]))
+        
+        for emitter in ('html2text', 'native'):
+            expected = Converter(emitter=emitter).convert(html)
+            self.assertEqual(convert_parallel(html, workers=2, emitter=emitter, min_chunk_size=1000), expected)
+    
+    def test_convert_incremental(self):
+        """Testa a reconversão só das páginas alteradas"""
+        import os
+        import tempfile
+        from htmltomd.converter import Converter, convert_incremental, convert_file_incremental
+        from htmltomd.parser.chunker import split_at_pages
+        
+        def book(pages):
+            body = ''.join(f'<span class="p-Pagina">{n}</span><h2>Seção {n}</h2><p>{text}</p>'
+                           for n, text in pages)
+            return f'<html><body><div class="livro"><h1>Livro</h1>{body}</div></body></html>'
+        
+        pages = [(n, f'Texto da página {n} com <a href="#">link</a>') for n in range(1, 31)]
+        html = book(pages)
+        self.assertEqual(len(split_at_pages(html)), 31)
+        
+        markdown, sidecar = convert_incremental(html)
+        self.assertEqual(markdown, Converter().convert(html))
+        self.assertEqual((sidecar['converted'], sidecar['reused']), (31, 0))
+        self.assertEqual(sidecar['segments'][5]['label'], '5')
+        
+        # Uma página editada, uma removida e uma inserida
+        edited = list(pages)
+        edited[9] = (10, 'Texto corrigido')
+        del edited[20]
+        edited.insert(3, (99, 'Página nova'))
+        html2 = book(edited)
+        markdown2, sidecar2 = convert_incremental(html2, markdown, sidecar)
+        self.assertEqual(markdown2, Converter().convert(html2))
+        self.assertEqual(sidecar2['converted'], 2)
+        
+        # Saída alterada fora do conversor invalida o sidecar
+        _, sidecar3 = convert_incremental(html2, markdown2 + 'x', sidecar2)
+        self.assertEqual(sidecar3['reused'], 0)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, 'livro.html')
+            output_file = os.path.join(temp_dir, 'livro.md')
+            for content, converted in ((html, 31), (html2, 2)):
+                with open(input_file, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                self.assertEqual(convert_file_incremental(input_file, output_file)['converted'], converted)
+            with open(output_file, encoding='utf-8') as f:
+                self.assertEqual(f.read(), markdown2)
+            self.assertTrue(os.path.exists(output_file + '.pages.json'))
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
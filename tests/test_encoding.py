@@ -0,0 +1,61 @@
+"""
+Testes para a detecção de codificação
+"""
+
+import codecs
+import unittest
+
+from htmltomd.converter import Converter, convert_bytes
+from htmltomd.encoding import decode_html, sniff_encoding
+
+HTML = '<h1>Introdução</h1><p>Ação e reação, “aspas” e — travessão.</p>'
+
+class TestEncoding(unittest.TestCase):
+    """Testes para sniff_encoding e decode_html"""
+
+    def test_sniff_encoding(self):
+        """Testa a ordem BOM, <meta charset> e conteúdo"""
+        self.assertEqual(sniff_encoding(codecs.BOM_UTF8 + b'<meta charset="latin-1">'), 'utf-8-sig')
+        self.assertEqual(sniff_encoding(codecs.BOM_UTF16_LE + HTML.encode('utf-16-le')), 'utf-16')
+        self.assertEqual(sniff_encoding(b'<meta charset="ISO-8859-1"><p>\xe7</p>'), 'cp1252')
+        self.assertEqual(sniff_encoding(b'<meta charset="us-ascii"><p>\x93</p>'), 'cp1252')
+        self.assertEqual(sniff_encoding(b'<meta charset="iso-8859-15"><p>\xa4</p>'), 'iso8859-15')
+        self.assertEqual(sniff_encoding(
+            b'<meta http-equiv="Content-Type" content="text/html; charset=windows-1252">'), 'cp1252')
+
+        # Declarações inválidas ou impossíveis são ignoradas
+        self.assertEqual(sniff_encoding(b'<meta charset="utf-16"><p>a</p>'), 'utf-8')
+        self.assertEqual(sniff_encoding(b'<meta charset="desconhecido"><p>\xe7</p>'), 'windows-1252')
+
+        # Sem declaração: UTF-8 se válido, Windows-1252 caso contrário
+        self.assertEqual(sniff_encoding(b'<p>' * 5000 + HTML.encode('utf-8')), 'utf-8')
+        self.assertEqual(sniff_encoding(b'<p>' * 5000 + HTML.encode('cp1252')), 'windows-1252')
+        self.assertEqual(sniff_encoding(b'<p>ascii</p>'), 'utf-8')
+
+    def test_decode_html(self):
+        """Testa a decodificação em uma única passada"""
+        for encoding in ('utf-8', 'cp1252', 'latin-1'):
+            data = HTML.encode(encoding, 'replace')
+            with self.subTest(encoding=encoding):
+                self.assertEqual(decode_html(memoryview(data)), data.decode(encoding))
+
+        self.assertEqual(decode_html(bytearray(codecs.BOM_UTF8 + HTML.encode('utf-8'))), HTML)
+        self.assertEqual(decode_html(codecs.BOM_UTF8 + b'<p>x</p>', 'utf-8'), '<p>x</p>')
+
+        # Exportações do Windows declaradas como Latin-1 mantêm aspas e travessões
+        data = b'<meta charset="iso-8859-1"><p>\x93Ol\xe1\x94 \x96 \x85</p>'
+        self.assertEqual(decode_html(data), '<meta charset="iso-8859-1"><p>“Olá” – …</p>')
+
+        # Bytes inválidos não provocam nova tentativa
+        self.assertEqual(decode_html(b'<p>\xff</p>', 'utf-8'), '<p>�</p>')
+
+    def test_convert_bytes(self):
+        """Testa a conversão a partir de bytes"""
+        expected = Converter().convert(HTML)
+        self.assertEqual(convert_bytes(HTML.encode('cp1252')), expected)
+        self.assertEqual(Converter().convert_bytes(HTML.encode('utf-8')), expected)
+        self.assertEqual(Converter(emitter='native').convert_bytes(HTML.encode('utf-16')),
+                         Converter(emitter='native').convert(HTML))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Testes para a instrumentação do pipeline
+"""
+
+import json
+import threading
+import tracemalloc
+import unittest
+
+from htmltomd.converter import Converter
+from htmltomd.instrumentation import Instrumentation
+
+HTML = '<h1>Título</h1><p>Texto com <a href="#">link</a>.</p><img src="x.png">'
+
+class TestInstrumentation(unittest.TestCase):
+    """Testes para o coletor de medições"""
+
+    def test_stages(self):
+        """Testa o registro das etapas de cada documento"""
+        records = []
+        instrumentation = Instrumentation(callback=records.append)
+        # Sem o filtro de parsing, a mídia e os links saem na transformação
+        converter = Converter(instrumentation=instrumentation, parse_filter=None)
+        self.assertEqual(converter.convert(HTML), Converter().convert(HTML))
+
+        with instrumentation.document(name='livro.html'):
+            converter.convert_bytes(HTML.encode('utf-8'))
+
+        self.assertEqual(len(instrumentation.documents), 2)
+        self.assertEqual(records, instrumentation.documents)
+        first, second = instrumentation.documents
+        self.assertEqual([s['stage'] for s in first['stages']], ['parse', 'transform', 'emit', 'clean'])
+        self.assertEqual(first['size'], len(HTML))
+        self.assertGreater(first['stages'][0]['nodes'], first['stages'][1]['nodes'])
+        self.assertNotIn('memory_peak', first['stages'][0])
+        for stage in first['stages']:
+            self.assertGreaterEqual(stage['wall'], 0)
+            self.assertGreaterEqual(stage['cpu'], 0)
+
+        self.assertEqual(second['name'], 'livro.html')
+        self.assertEqual(second['size'], len(HTML.encode('utf-8')))
+        self.assertEqual(second['stages'][0]['stage'], 'decode')
+
+        exported = json.loads(instrumentation.to_json())
+        self.assertEqual(exported['summary']['parse']['count'], 2)
+        self.assertEqual(len(exported['documents']), 2)
+
+        instrumentation.clear()
+        self.assertEqual(instrumentation.to_dict()['summary'], {})
+
+    def test_memory_and_threads(self):
+        """Testa os picos de memória e o uso por várias threads"""
+        instrumentation = Instrumentation(memory=True)
+        converter = Converter(emitter='native', instrumentation=instrumentation)
+        threads = [threading.Thread(target=converter.convert, args=(HTML * 20,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(instrumentation.documents), 4)
+        for record in instrumentation.documents:
+            self.assertEqual(len(record['stages']), 4)
+            self.assertIn('memory_peak', record['stages'][0])
+        self.assertFalse(tracemalloc.is_tracing())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+Testes para o pool de conversões das interfaces
+"""
+
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from htmltomd.cache import ConversionCache
+from htmltomd.converter import Converter
+from htmltomd.limits import ConversionCancelled, Limits
+from htmltomd.ui.jobs import JobManager, convert_file, spool_upload
+
+HTML = "<h1>Título</h1><p>Texto</p>"
+OPTIONS = {'pipeline': 'teste'}
+
+class TestJobs(unittest.TestCase):
+    """Testes para o JobManager"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ConversionCache(os.path.join(self.temp_dir.name, 'cache.sqlite3'))
+        self.manager = JobManager(workers=1, cache=self.cache)
+
+    def tearDown(self):
+        self.manager.shutdown()
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def test_cache(self):
+        """Testa se uma conversão repetida vem do cache"""
+        calls = []
+
+        def convert(html):
+            calls.append(html)
+            return Converter().convert(html)
+
+        job = self.manager.submit(HTML, convert, OPTIONS)
+        markdown = job.result(timeout=10)
+        self.assertEqual(markdown, Converter().convert(HTML))
+        self.assertEqual(job.status, 'done')
+
+        job = self.manager.submit(HTML, convert, OPTIONS)
+        self.assertTrue(job.done())
+        self.assertEqual(job.result(), markdown)
+        self.assertEqual(len(calls), 1)
+
+        # Opções diferentes geram nova conversão
+        self.manager.submit(HTML, convert, {'pipeline': 'outro'}).result(timeout=10)
+        self.assertEqual(len(calls), 2)
+
+    def test_shared_and_cancel(self):
+        """Testa o compartilhamento de jobs em andamento e o cancelamento"""
+        blocker = threading.Event()
+        self.manager._executor.submit(blocker.wait)
+        try:
+            first = self.manager.submit(HTML, str.upper, OPTIONS)
+            second = self.manager.submit(HTML, str.upper, OPTIONS)
+            self.assertIs(first, second)
+            self.assertEqual(first.status, 'pending')
+
+            # Ainda acompanhado por outra sessão
+            self.assertFalse(self.manager.cancel(first))
+            self.assertTrue(self.manager.cancel(first))
+            self.assertEqual(first.status, 'cancelled')
+
+            # Um novo pedido não reaproveita o job cancelado
+            third = self.manager.submit(HTML, str.upper, OPTIONS)
+            self.assertIsNot(third, first)
+        finally:
+            blocker.set()
+        self.assertEqual(third.result(timeout=10), HTML.upper())
+
+    def test_cancel_running(self):
+        """Testa a interrupção de um job em execução nos pontos de verificação"""
+        started = threading.Event()
+
+        def convert(html):
+            started.set()
+            budget = Limits().start()
+            while True:
+                budget.check_deadline('teste')
+                time.sleep(0.01)
+
+        job = self.manager.submit(HTML, convert, OPTIONS)
+        self.assertTrue(started.wait(10))
+        self.assertTrue(self.manager.cancel(job))
+        with self.assertRaises(ConversionCancelled):
+            job.result(timeout=10)
+        self.assertEqual(job.status, 'cancelled')
+        self.assertIsNone(self.cache.get(job.key))
+
+        # A leitura do arquivo também verifica o cancelamento
+        source = os.path.join(self.temp_dir.name, 'entrada.html')
+        target = os.path.join(self.temp_dir.name, 'saida.md')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write(HTML)
+        cancelled = threading.Event()
+        cancelled.set()
+        with self.assertRaises(ConversionCancelled):
+            convert_file(Converter(), source, target, lambda stage, fraction: None, cancelled)
+        self.assertFalse(os.path.exists(target))
+
+    def test_error(self):
+        """Testa se erros da conversão ficam no job e não no cache"""
+        def convert(html):
+            raise ValueError("falhou")
+
+        job = self.manager.submit(HTML, convert, OPTIONS)
+        with self.assertRaises(ValueError):
+            job.result(timeout=10)
+        self.assertEqual(job.status, 'error')
+        self.assertIsNone(self.cache.get(job.key))
+
+    def test_submit_file(self):
+        """Testa a conversão de envios gravados em disco, com andamento e reaproveitamento"""
+        html = '<meta charset="iso-8859-1">' + ''.join(
+            f'<h2>Seção {n}</h2><p>Ação {n} com <a href="#">link</a>.</p>' for n in range(300))
+        upload = io.BytesIO(html.encode('latin-1'))
+        upload.read()
+        converter = Converter()
+        expected = io.StringIO()
+        converter.convert_to(html, expected)
+
+        path = spool_upload(upload, self.temp_dir.name)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), upload.getvalue())
+        job = self.manager.submit_file(path, converter)
+        markdown_path = job.result(timeout=30)
+        with open(markdown_path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), expected.getvalue())
+        self.assertEqual(job.progress, ('done', 1.0))
+
+        # O andamento acompanha os bytes lidos do arquivo
+        progress = []
+        source = os.path.join(self.temp_dir.name, 'andamento.html')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write('<p>Ação</p>' * 3000)
+        with mock.patch('htmltomd.ui.jobs.SPOOL_CHUNK_SIZE', 4096):
+            convert_file(converter, source, source + '.md', lambda *args: progress.append(args))
+        fractions = [fraction for stage, fraction in progress if stage == 'convert']
+        self.assertGreater(len(fractions), 3)
+        self.assertEqual(fractions, sorted(fractions))
+        self.assertEqual(fractions[-1], 1.0)
+        self.assertEqual(progress[-1], ('done', 1.0))
+        self.assertFalse(os.path.exists(path))
+
+        # O mesmo conteúdo reaproveita o arquivo convertido
+        path = spool_upload(upload, self.temp_dir.name)
+        again = self.manager.submit_file(path, converter)
+        self.assertTrue(again.done())
+        self.assertEqual(again.result(), markdown_path)
+        self.assertFalse(os.path.exists(path))
+
+        # Acima do limite de espaço, os resultados menos usados são removidos,
+        # exceto os de jobs que alguma sessão ainda guarda
+        self.manager.max_result_bytes = 1
+        del job
+
+        def submit(html):
+            path = spool_upload(io.BytesIO(html.encode()), self.temp_dir.name)
+            return self.manager.submit_file(path, converter)
+
+        other = submit(HTML)
+        self.assertTrue(os.path.exists(other.result(timeout=30)))
+        self.assertTrue(os.path.exists(markdown_path))
+        del again
+        self.assertTrue(os.path.exists(submit('<p>outro</p>').result(timeout=30)))
+        self.assertFalse(os.path.exists(markdown_path))
+        self.assertTrue(os.path.exists(other.result()))
+
+        # Gravar de novo a mesma chave não conta o resultado duas vezes
+        from htmltomd.ui.jobs import ConversionJob
+        self.manager.max_result_bytes = 10 ** 9
+        size = self.manager._results_size
+        for _ in range(2):
+            path = spool_upload(io.BytesIO(b'<p>repetido</p>'), self.temp_dir.name)
+            self.manager._run_file(ConversionJob('repetido', None), path, converter)
+        self.assertEqual(self.manager._results_size, size + self.manager._results['repetido'])
+        self.assertEqual(self.manager._results_size, sum(self.manager._results.values()))
+
+if __name__ == "__main__":
+    unittest.main()
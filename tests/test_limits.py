@@ -0,0 +1,64 @@
+"""
+Testes para os limites de recursos
+"""
+
+import io
+import pickle
+import unittest
+
+from htmltomd.converter import Converter
+from htmltomd.limits import BudgetExceeded, Limits
+from htmltomd.parser import available_backends, parse_html
+
+HTML = '<h1>Título</h1><p>Texto com <a href="#">link</a>.</p>'
+
+class TestLimits(unittest.TestCase):
+    """Testes para Limits, Budget e BudgetExceeded"""
+
+    def assertBudget(self, budget, converter, html):
+        with self.assertRaises(BudgetExceeded) as context:
+            converter.convert(html)
+        self.assertEqual(context.exception.budget, budget)
+        return context.exception
+
+    def test_budgets(self):
+        """Testa cada limite e a conversão dentro dos limites"""
+        limits = Limits(max_input_bytes=1000, max_nodes=50, max_depth=20, timeout=60)
+        converter = Converter(limits=limits)
+        self.assertEqual(converter.convert(HTML), Converter().convert(HTML))
+
+        self.assertBudget('max_input_bytes', converter, 'x' * 1001)
+        with self.assertRaises(BudgetExceeded):
+            converter.convert_bytes(b'x' * 1001)
+        self.assertBudget('max_nodes', converter, '<p>a</p>' * 30)
+        error = self.assertBudget('max_depth', converter, '<div>' * 21)
+        self.assertEqual(error.stage, 'parse')
+        self.assertEqual(error.limit, 20)
+
+        # Prazo já esgotado é detectado entre as etapas
+        self.assertBudget('timeout', Converter(limits=Limits(timeout=0)), HTML)
+        with self.assertRaises(BudgetExceeded):
+            list(Converter(limits=Limits(max_input_bytes=10)).convert_stream(io.StringIO(HTML)))
+
+    def test_parse_stops_early(self):
+        """Testa se o parsing é interrompido assim que o limite é atingido"""
+        for backend in available_backends():
+            with self.subTest(backend=backend):
+                budget = Limits(max_nodes=100).start()
+                with self.assertRaises(BudgetExceeded):
+                    parse_html('<p>a</p>' * 10000, backend, budget)
+                if backend != 'html5lib':
+                    self.assertEqual(budget.nodes, 101)
+
+                budget = Limits(max_depth=5).start()
+                soup = parse_html('<div><div><p>a</p></div></div>', backend, budget)
+                self.assertEqual(soup.get_text(), 'a')
+
+    def test_pickle(self):
+        """Testa se a exceção preserva os atributos entre processos"""
+        error = pickle.loads(pickle.dumps(BudgetExceeded('timeout', 5, 'emit')))
+        self.assertEqual((error.budget, error.limit, error.stage), ('timeout', 5, 'emit'))
+        self.assertIn('5 segundos', str(error))
+
+if __name__ == "__main__":
+    unittest.main()
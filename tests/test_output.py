@@ -0,0 +1,81 @@
+"""
+Testes para a gravação do Markdown em destinos arbitrários
+"""
+
+import io
+import os
+import socket
+import stat
+import tempfile
+import unittest
+
+from htmltomd.converter import Converter
+from htmltomd.output import atomic_writer, write_markdown
+
+HTML = ''.join(f'<h2>Seção {n}</h2><p>Ação {n} com <a href="#">link</a>.</p>' for n in range(200))
+
+class TestOutput(unittest.TestCase):
+    """Testes para write_markdown, atomic_writer e Converter.convert_to"""
+
+    def test_sinks(self):
+        """Testa destinos de texto, de bytes e sockets"""
+        pieces = ['Ação ', 'e ', 'reação']
+        text = io.StringIO()
+        self.assertEqual(write_markdown(pieces, text), len('Ação e reação'))
+        self.assertEqual(text.getvalue(), 'Ação e reação')
+
+        raw = io.BytesIO()
+        buffered = io.BufferedWriter(raw)
+        write_markdown(iter(pieces), buffered)
+        self.assertEqual(raw.getvalue(), 'Ação e reação'.encode('utf-8'))
+        buffered.detach()
+
+        # O BOM do UTF-16 é gravado uma única vez
+        raw = io.BytesIO()
+        write_markdown(pieces, raw, encoding='utf-16')
+        self.assertEqual(raw.getvalue().decode('utf-16'), 'Ação e reação')
+
+        left, right = socket.socketpair()
+        with left, right:
+            write_markdown(pieces, left)
+            left.shutdown(socket.SHUT_WR)
+            self.assertEqual(right.makefile('rb').read().decode('utf-8'), 'Ação e reação')
+
+    def test_atomic_writer(self):
+        """Testa a substituição só ao final e a preservação em caso de erro"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'saida.md')
+            with atomic_writer(path) as f:
+                f.write('primeira')
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(f.read(), 'primeira')
+            os.chmod(path, 0o640)
+
+            with self.assertRaises(RuntimeError):
+                with atomic_writer(path) as f:
+                    f.write('incompleta')
+                    raise RuntimeError
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(f.read(), 'primeira')
+            self.assertEqual(os.listdir(temp_dir), ['saida.md'])
+
+            with atomic_writer(path) as f:
+                f.write('segunda')
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o640)
+
+    def test_convert_to(self):
+        """Testa se a gravação em fluxo produz o mesmo Markdown"""
+        for emitter in ('html2text', 'native'):
+            converter = Converter(emitter=emitter)
+            expected = converter.convert(HTML)
+            raw = io.BytesIO()
+            written = converter.convert_to(HTML, raw, chunk_size=512)
+            self.assertEqual(raw.getvalue().decode('utf-8'), expected)
+            self.assertEqual(written, len(expected))
+
+            text = io.StringIO()
+            converter.convert_to(io.StringIO(HTML), text)
+            self.assertEqual(text.getvalue(), expected)
+
+if __name__ == "__main__":
+    unittest.main()
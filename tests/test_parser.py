@@ -4,7 +4,7 @@ Testes para o módulo parser
 
 import unittest
 from htmltomd.parser import parse_html, mark_page_breaks, remove_media, process_links
-from htmltomd.parser.html_parser import process_headers
+from htmltomd.parser.html_parser import process_headers, apply_transforms, available_backends, resolve_backend
 from bs4 import BeautifulSoup
 
 class TestParser(unittest.TestCase):
@@ -69,6 +69,216 @@ class TestParser(unittest.TestCase):
         soup = process_headers(soup)
         self.assertIsNone(soup.find('h3'))
         self.assertEqual(soup.p.string, "### Seção")
+    
+    def test_apply_transforms(self):
+        """Testa se a passagem única equivale às transformações em sequência"""
+        html = """
+        <h1>Título <a href="x.html">com link</a></h1>
+        <p>Texto com <img src="imagem.jpg"> e <a href="link.html"><b>link</b> <img src="i.png"></a>.</p>
+        <span class="numero p-Pagina">12 e 13</span>
+        <a href="sec.html"><h2>Cabeçalho em link</h2><span class="p-Pagina">14</span></a>
+        <h4>Externo <h3>Interno</h3></h4>
+        <h3>Externo <h4>Interno</h4></h3>
+        <video controls><source src="video.mp4"><span class="p-Pagina">15</span></video>
+        <img class="p-Pagina" src="pagina.png">
+        <h5>Fim</h5>
+        """
+        expected = process_headers(process_links(remove_media(mark_page_breaks(parse_html(html)))))
+        result = apply_transforms(parse_html(html))
+        self.assertEqual(str(result), str(expected))
+    
+    def test_rules(self):
+        """Testa regras adicionais aplicadas na mesma travessia"""
+        from htmltomd.converter import Converter
+        from htmltomd.parser import DEFAULT_RULES, DROP, Rule, RuleSet, UNWRAP
+        
+        def caption(node, soup):
+            node.replace_with(soup.new_string(f"Legenda: {node.get_text().strip()}"))
+        
+        rules = DEFAULT_RULES.extend([
+            Rule('script, style', DROP),
+            Rule('figure', UNWRAP),
+            Rule('figcaption', caption),
+            Rule('div.anuncio', DROP),
+        ])
+        html = """
+        <style>p { color: red; }</style><script>alert(1)</script>
+        <figure><img src="a.png"><figcaption>Mapa <a href="#">do Brasil</a></figcaption></figure>
+        <div class="anuncio">Compre</div><p class="anuncio">Fica</p>
+        <h2>Título</h2><span class="p-Pagina">3</span>
+        """
+        soup = apply_transforms(parse_html(html), rules)
+        for name in ('style', 'script', 'figure', 'figcaption', 'img', 'a', 'h2'):
+            self.assertIsNone(soup.find(name))
+        text = soup.get_text()
+        self.assertIn('Legenda: Mapa do Brasil', text)
+        self.assertNotIn('Compre', text)
+        self.assertIn('Fica', text)
+        self.assertIn('## Título', text)
+        self.assertIn('<!-- Página 3 -->', text)
+        
+        # Regras diferentes geram chaves de cache diferentes
+        self.assertNotEqual(Converter(rules=rules).options, Converter().options)
+        unwrap = DEFAULT_RULES.extend([Rule('figure', lambda node, soup: node.unwrap(), key='unwrap')])
+        drop = DEFAULT_RULES.extend([Rule('figure', lambda node, soup: node.decompose(), key='drop')])
+        self.assertNotEqual(unwrap.key, drop.key)
+        # Funções sem key não têm chave estável e não passam pelos caches
+        self.assertIsNone(rules.key)
+        self.assertIsNone(Converter(rules=rules).options)
+        self.assertNotIn('alert', Converter(emitter='native', rules=rules).convert(html))
+        self.assertEqual(str(RuleSet(DEFAULT_RULES.rules).apply(parse_html(html))),
+                         str(apply_transforms(parse_html(html))))
+        
+        with self.assertRaises(ValueError):
+            Rule('div p', DROP)
+        with self.assertRaises(ValueError):
+            Rule('div', 'desconhecida')
+
+    def test_tag_index(self):
+        """Testa o índice montado no parsing e as transformações que o consultam"""
+        from htmltomd.parser import DEFAULT_RULES
+        from htmltomd.parser.index import IndexedSoup
+
+        html = """
+        <h1>Título <a href="x.html">com link</a></h1>
+        <a href="sec.html"><h2>Cabeçalho em link</h2><span class="p-Pagina">14</span></a>
+        <h4>Externo <h3>Interno</h3></h4>
+        <video><span class="p-Pagina">15</span></video>
+        <span class="numero p-Pagina">12 e 13</span>
+        """ + '<p>Texto sem marcação nenhuma.</p>' * 50
+        soup = parse_html(html)
+        self.assertIsInstance(soup, IndexedSoup)
+        found = soup.tag_index.lookup(['h2', 'a'], ['p-Pagina'])
+        self.assertEqual([node.name for node in found], ['a', 'a', 'h2', 'span', 'span', 'span'])
+
+        # Com poucos candidatos, o índice produz a mesma árvore que a travessia
+        expected = str(DEFAULT_RULES._walk(parse_html(html)))
+        self.assertEqual(str(DEFAULT_RULES._apply_indexed(parse_html(html))), expected)
+        self.assertEqual(str(apply_transforms(parse_html(html))), expected)
+        sequential = process_headers(process_links(remove_media(mark_page_breaks(parse_html(html)))))
+        self.assertEqual(str(sequential), expected)
+
+        # Elementos removidos ou desligados da árvore saem da consulta
+        soup = parse_html(html)
+        soup.find('video').decompose()
+        soup.find('h1').extract()
+        self.assertEqual(len(soup.tag_index.lookup(['a', 'h1'], ['p-Pagina'], soup)), 3)
+
+        # Tags criadas depois do parsing tornam o índice incompleto para elas
+        self.assertTrue(soup.tag_index.is_complete(['p'], []))
+        soup.new_tag('p', attrs={'class': 'nota'})
+        self.assertFalse(soup.tag_index.is_complete(['p'], []))
+        self.assertFalse(soup.tag_index.is_complete([], ['nota']))
+        self.assertTrue(soup.tag_index.is_complete(['a'], ['p-Pagina']))
+
+    def test_parse_filter(self):
+        """Testa o descarte de elementos durante o parsing"""
+        from htmltomd.converter import Converter
+        from htmltomd.instrumentation import count_nodes
+        from htmltomd.parser import ParseFilter
+
+        # Descartar no parsing produz a mesma árvore que remover depois
+        html = """
+        <p>Texto <script>var a = '<p>';</script><!-- nota --> e <b>forte<style>p {}</b></style>.</p>
+        <div><script><script></script>fim</div><img src="i.png"></img><p>aberto <script>x
+        """
+        quirks = ['<p>a<script>x</p>b', '<b>a<style>c</b>d', '<p>a</script>b<!--c-->', '<script/>x']
+        parse_filter = ParseFilter()
+        for backend in available_backends():
+            if backend == 'html5lib':
+                continue
+            with self.subTest(backend=backend):
+                for markup in [html] + quirks:
+                    soup = parse_html(markup, backend, parse_filter=parse_filter)
+                    self.assertEqual(str(soup), str(parse_filter.apply(parse_html(markup, backend))))
+                soup = parse_html(html, backend, parse_filter=parse_filter)
+                self.assertLess(count_nodes(soup), count_nodes(parse_html(html, backend)))
+
+        html = '<style>p {}</style><p>Texto<script>alert(1)</script> <!-- oculto --><iframe>x</iframe></p>'
+        for backend in available_backends():
+            with self.subTest(backend=backend):
+                soup = parse_html(html, backend, parse_filter=ParseFilter(drop=['script', 'style', 'IFRAME']))
+                for name in ('style', 'script', 'iframe'):
+                    self.assertIsNone(soup.find(name))
+                self.assertNotIn('oculto', str(soup))
+
+        self.assertNotIn('alert', Converter(parse_filter=ParseFilter()).convert(html))
+        self.assertNotEqual(Converter(parse_filter=ParseFilter()).options, Converter().options)
+
+        # Sem filtro explícito, o texto é o mesmo de antes do filtro: descartar
+        # comentários junta os textos vizinhos
+        import converter
+        baseline = {
+            '<p><em>hello <!--x-->a&amp;b</em></p>': '_hello a&b_',
+            '<p>Texto<!-- nota --> seguinte</p><!-- fim -->': 'Texto seguinte',
+            '<h1>Título <!--a--></h1><p>um <!--b--> dois</p>': '# Título\n\num  dois',
+            '<ul><li>a<!--c--></li><li><!--d-->b</li></ul>': '* a\n  * b',
+            '<p>a<script>var x;</script> b</p><style>p{}</style><p>c</p>': 'a b\n\nc',
+        }
+        for html, expected in baseline.items():
+            with self.subTest(html=html):
+                self.assertEqual(converter.convert(html), expected)
+                self.assertEqual(Converter().convert(html), expected)
+
+    def test_backends(self):
+        """Testa se todos os backends produzem as mesmas transformações"""
+        from htmltomd.converter import convert_to_markdown
+        html = """
+        <h1>Título</h1>
+        <p>Texto com <img src="imagem.jpg"> e <a href="link.html">link</a>.</p>
+        <span class="numero p-Pagina">12 e 13</span>
+        <h4>Seção</h4>
+        """
+        expected = convert_to_markdown(apply_transforms(parse_html(html)))
+        for backend in available_backends() + ['auto']:
+            with self.subTest(backend=backend):
+                soup = apply_transforms(parse_html(html, backend))
+                self.assertEqual(convert_to_markdown(soup), expected)
+    
+    def test_block_splitter(self):
+        """Testa a divisão incremental do HTML em blocos"""
+        from htmltomd.parser.block_splitter import BlockSplitter
+        html = '<body><div class="cap"><h1>Título</h1><p>Um <b>dois</b></p><span class="p-Pagina">3</span></div></body>'
+        
+        splitter = BlockSplitter()
+        blocks = []
+        for i in range(0, len(html), 5):
+            blocks.extend(splitter.feed(html[i:i + 5]))
+        blocks.extend(splitter.close())
+        
+        # Cada bloco é reaberto e fechado com os contêineres ativos
+        self.assertEqual(blocks, [
+            '<body><div class="cap"><h1>Título</h1></div></body>',
+            '<body><div class="cap"><p>Um <b>dois</b></p></div></body>',
+            '<body><div class="cap"><span class="p-Pagina">3</span></div></body>',
+        ])
+        
+        # Com tamanho mínimo, blocos vizinhos são agrupados
+        splitter = BlockSplitter(min_size=1000)
+        blocks = splitter.feed(html) + splitter.close()
+        self.assertEqual(blocks, [html])
+
+        # Uma tag inline nunca fechada é cortada ao passar de max_size
+        html = '<div><span class="nota">' + '<b>palavra</b> ' * 500
+        splitter = BlockSplitter(max_size=1000)
+        blocks = []
+        for i in range(0, len(html), 100):
+            blocks.extend(splitter.feed(html[i:i + 100]))
+        blocks.extend(splitter.close())
+        self.assertGreater(len(blocks), 5)
+        for block in blocks:
+            self.assertLess(len(block), 1100)
+            self.assertTrue(block.startswith('<div><span class="nota">'))
+        for block in blocks[:-1]:
+            self.assertTrue(block.endswith('</span></div>'))
+        self.assertEqual(sum(block.count('palavra') for block in blocks), 500)
+    
+    def test_resolve_backend(self):
+        """Testa a resolução do nome do backend"""
+        self.assertEqual(resolve_backend('html.parser'), 'html.parser')
+        self.assertIn(resolve_backend('auto'), available_backends())
+        with self.assertRaises(ValueError):
+            resolve_backend('inexistente')
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""
+Testes para o serviço HTTP
+"""
+
+import asyncio
+import json
+import threading
+import unittest
+
+try:
+    import starlette
+except ImportError:
+    starlette = None
+
+from htmltomd.converter import Converter
+
+HTML = '<h1>Título</h1><p>Texto com <a href="#">link</a>.</p><span class="p-Pagina">7</span>'
+
+async def request(app, method, path, body_chunks=(), headers=()):
+    """Envia uma requisição diretamente à aplicação ASGI."""
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': query.encode(), 'root_path': '', 'server': ('test', 80),
+        'client': ('test', 1234), 'headers': [(k.encode(), v.encode()) for k, v in headers],
+        'app': app,
+    }
+    messages = [{'type': 'http.request', 'body': chunk, 'more_body': True} for chunk in body_chunks]
+    messages.append({'type': 'http.request', 'body': b'', 'more_body': False})
+    response = {'body': b'', 'chunks': 0}
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+            response['headers'] = {k.decode(): v.decode() for k, v in message['headers']}
+        elif message['type'] == 'http.response.body':
+            if message.get('body'):
+                response['chunks'] += 1
+            response['body'] += message.get('body', b'')
+
+    await app(scope, receive, send)
+    return response
+
+@unittest.skipIf(starlette is None, "starlette não instalado")
+class TestServer(unittest.TestCase):
+    """Testes para o serviço HTTP de conversão"""
+
+    def setUp(self):
+        from htmltomd.server import ConversionService, create_app
+        self.service = ConversionService(workers=1, queue_size=0)
+        self.app = create_app(self.service)
+
+    def tearDown(self):
+        self.service.close()
+
+    def test_convert(self):
+        """Testa a conversão com corpo enviado em pedaços"""
+        body = HTML.encode('utf-8')
+        chunks = [body[i:i + 7] for i in range(0, len(body), 7)]
+        response = asyncio.run(request(self.app, 'POST', '/convert?emitter=native', chunks))
+        self.assertEqual(response['status'], 200)
+        self.assertTrue(response['headers']['content-type'].startswith('text/markdown'))
+        self.assertEqual(response['body'].decode('utf-8'), Converter(emitter='native').convert(HTML))
+
+        # Charset informado no Content-Type
+        response = asyncio.run(request(self.app, 'POST', '/convert', [HTML.encode('latin-1', 'ignore')],
+                                       [('content-type', 'text/html; charset=latin-1')]))
+        self.assertEqual(response['status'], 200)
+        self.assertIn('Título', response['body'].decode('utf-8'))
+
+        # Sem charset no cabeçalho, a codificação é detectada
+        legacy = HTML.encode('cp1252')
+        for query in ('', '?stream=1'):
+            response = asyncio.run(request(self.app, 'POST', '/convert' + query, [legacy]))
+            self.assertEqual(response['body'].decode('utf-8'), Converter().convert(HTML))
+
+        response = asyncio.run(request(self.app, 'POST', '/convert?backend=desconhecido', [body]))
+        self.assertEqual(response['status'], 400)
+
+    def test_convert_stream(self):
+        """Testa a resposta em stream"""
+        html = ''.join(f'<p>Parágrafo {i}</p>' for i in range(3000))
+        body = html.encode('utf-8')
+        chunks = [body[i:i + 1000] for i in range(0, len(body), 1000)]
+        response = asyncio.run(request(self.app, 'POST', '/convert?stream=1', chunks))
+        self.assertEqual(response['status'], 200)
+        self.assertGreater(response['chunks'], 1)
+        self.assertEqual(response['body'].decode('utf-8'), Converter().convert(html))
+        self.assertEqual(self.service.pending, 0)
+
+    def test_queue_full(self):
+        """Testa a recusa com 429 quando o pool e a fila estão ocupados"""
+        blocker = threading.Event()
+
+        async def scenario():
+            # Ocupa o único worker; a primeira requisição fica aguardando
+            self.service._pool.submit(blocker.wait)
+            first = asyncio.ensure_future(request(self.app, 'POST', '/convert', [b'<p>um</p>']))
+            await asyncio.sleep(0.05)
+            second = await request(self.app, 'POST', '/convert', [b'<p>dois</p>'])
+            blocker.set()
+            return await first, second
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual(first['status'], 200)
+        self.assertEqual(second['status'], 429)
+        self.assertEqual(second['headers']['retry-after'], '1')
+        self.assertEqual(self.service.counters['rejected'], 1)
+
+    def test_limits(self):
+        """Testa a recusa de documentos acima dos limites"""
+        from htmltomd.limits import Limits
+        from htmltomd.server import ConversionService, create_app
+        service = ConversionService(workers=1, limits=Limits(max_depth=10))
+        try:
+            app = create_app(service)
+            response = asyncio.run(request(app, 'POST', '/convert', [b'<div>' * 50]))
+            self.assertEqual(response['status'], 422)
+            self.assertIn('aninhamento', response['body'].decode('utf-8'))
+            self.assertEqual(service.counters['budget_exceeded'], 1)
+        finally:
+            service.close()
+
+        # Em stream, valem o tamanho máximo do corpo e o limite de entrada
+        chunks = [b'<p>texto</p>' * 100] * 10
+        for options in ({'max_stream_size': 5000}, {'limits': Limits(max_input_bytes=5000)}):
+            service = ConversionService(workers=1, **options)
+            try:
+                app = create_app(service)
+                with self.subTest(**{name: repr(value) for name, value in options.items()}):
+                    response = asyncio.run(request(app, 'POST', '/convert?stream=1', chunks))
+                    self.assertEqual(response['status'], 413)
+                    self.assertEqual(service.counters['budget_exceeded'], 1)
+                    # Um Content-Length grande demais é recusado antes da leitura
+                    response = asyncio.run(request(app, 'POST', '/convert?stream=1', [b'<p>x</p>'],
+                                                   headers=[('content-length', '6000')]))
+                    self.assertEqual(response['status'], 413)
+                    self.assertEqual(service.pending, 0)
+            finally:
+                service.close()
+
+    def test_stream_client_errors(self):
+        """Testa o corpo inválido e a desconexão do cliente em stream"""
+        body = 'Título'.encode('latin-1')
+        response = asyncio.run(request(self.app, 'POST', '/convert?stream=1', [b'<p>', body],
+                                       [('content-type', 'text/html; charset=utf-8')]))
+        self.assertEqual(response['status'], 400)
+        self.assertIn('utf-8', response['body'].decode('utf-8'))
+
+        # Um corpo truncado pela desconexão não é convertido como completo
+        html = ''.join(f'<p>Parágrafo {i}</p>' for i in range(3000)).encode('utf-8')
+        messages = [{'type': 'http.request', 'body': html, 'more_body': True},
+                    {'type': 'http.disconnect'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': 'POST', 'path': '/convert', 'query_string': b'stream=1',
+                 'headers': [], 'app': self.app}
+        asyncio.run(self.app(scope, receive, send))
+        self.assertFalse(any(message['type'] == 'http.response.body' and not message.get('more_body')
+                             for message in sent))
+        self.assertEqual(self.service.pending, 0)
+        self.assertEqual(self.service.counters['conversions'], 0)
+        self.assertEqual(self.service.counters['errors'], 0)
+
+    def test_health_and_metrics(self):
+        """Testa as rotas de saúde e de métricas"""
+        asyncio.run(request(self.app, 'POST', '/convert', [HTML.encode('utf-8')]))
+
+        response = asyncio.run(request(self.app, 'GET', '/health'))
+        self.assertEqual(response['status'], 200)
+        self.assertEqual(json.loads(response['body'])['status'], 'ok')
+
+        response = asyncio.run(request(self.app, 'GET', '/metrics'))
+        self.assertIn('htmltomd_conversions_total 1', response['body'].decode('utf-8'))
+
+        response = asyncio.run(request(self.app, 'GET', '/metrics?format=json'))
+        metrics = json.loads(response['body'])
+        self.assertEqual(metrics['conversions'], 1)
+        self.assertEqual(metrics['pending'], 0)
+
+if __name__ == "__main__":
+    unittest.main()